@@ -0,0 +1,184 @@
+""" Fake ACS for the tests: a local SIP2 server with canned responses
+
+Answers login (93), SC Status (99), patron status and information (23, 63),
+item information (17), checkout (11), checkin (09), fee paid (37) and end
+session (35) like a small library would. Tests change its attributes to
+misbehave: split or drop responses, append bytes, terminate with CRLF.
+
+    acs     = FakeAcs()
+    wrapper = Sip2Wrapper(acs.params(), True)
+    ...
+    acs.close()
+"""
+import re
+import socketserver
+import tempfile
+import threading
+import time
+from decimal import Decimal
+
+
+TIMESTAMP = '20240101    120000'
+# @var string  Transaction date of all responses
+
+
+def checksum(message):
+    """ SIP2 checksum of a message up to and including AZ (@see Sip2._crc_calc) """
+    return '%04X' % (-sum(message.encode('utf-8')) & 0xFFFF)
+
+
+def field(message, fieldId):
+    """ Value of a variable field of a message, '' if missing """
+    match = re.search(fieldId + r'([^|]*)\|', message)
+    return match.group(1) if match else ''
+
+
+class FakeAcs:
+    """ Threaded SIP2 server on 127.0.0.1, one thread per connection """
+
+    def __init__(self):
+        self.requests       = []
+        # @var list        Messages received, oldest first
+        self.items          = {'I%d' % number: 'Title I%d' % number for number in range(1, 100)}
+        # @var dict        Item id => title
+        self.charged        = ['I%d' % number for number in range(1, 24)]
+        # @var list        Items charged to every patron
+        self.balance        = Decimal('4.00')
+        # @var Decimal     Fee balance of every patron (BV)
+        self.offlineOk      = 'Y'
+        # @var string      OfflineOk of the SC Status response
+        self.crlf           = False
+        # @var boolean     Terminate responses with CR LF
+        self.extra          = b''
+        # @var bytes       Sent after each response
+        self.split          = None
+        # @var tuple       (code, bytes, seconds): send that many bytes of the response to code, pause, send the rest
+        self.dropBefore     = set()
+        # @var set         Codes answered by closing the connection
+        self.dropAfter      = set()
+        # @var set         Codes processed, then answered by closing the connection
+        self.logPath        = tempfile.mkdtemp(prefix = 'sip2-tests-')
+        # @var string      Directory for sip2.log
+
+        self._lock          = threading.Lock()
+        # @var Lock        Guards requests and balance
+        self._server        = _Server(('127.0.0.1', 0), _Handler)
+        self._server.acs    = self
+        self.port           = self._server.server_address[1]
+        # @var int         Port the server listens on
+        threading.Thread(target = self._server.serve_forever, daemon = True).start()
+
+
+    def params(self, **overrides):
+        """ sip2Params for a wrapper connecting to this ACS
+        @param  dict overrides     Parameters to change
+        @return dict
+        """
+        params = {'hostName': '127.0.0.1', 'hostPort': self.port, 'tlsEnable': False, 'institutionId': 'Inst',
+                  'logfile_path': self.logPath, 'loglevel': 'CRITICAL'}
+        params.update(overrides)
+        return params
+
+
+    def codes(self):
+        """ Message codes received, oldest first
+        @return list
+        """
+        with self._lock:
+            return [message[:2] for message in self.requests]
+
+
+    def close(self):
+        """ Stop the server """
+        self._server.shutdown()
+        self._server.server_close()
+
+
+    def respond(self, message):
+        """ The response to a request, without AY/AZ and terminator
+        @param  string message     Request without terminator
+        @return string
+        """
+        code   = message[:2]
+        item   = field(message, 'AB')
+        if (code == '93'):
+            return '941'
+        if (code == '99'):
+            return '98YYYYN%s010003%s2.00AOInst|AMLibrary|BXYYYYYYYYYYYYYYYY|' % (self.offlineOk, TIMESTAMP)
+        if (code == '17'):
+            if (item in self.items):
+                return '18030001%sAB%s|AJ%s|AQMAIN|' % (TIMESTAMP, item, self.items[item])
+            return '18010001%sAB%s|AJ|AFItem not found|' % (TIMESTAMP, item)
+        if (code == '11'):
+            return '121NNY%sAOInst|AA%s|AB%s|AJ%s|AH20240201|' % (TIMESTAMP, field(message, 'AA'), item, self.items.get(item, ''))
+        if (code == '09'):
+            return '101YNN%sAOInst|AB%s|AQMAIN|AJ%s|' % (TIMESTAMP, item, self.items.get(item, ''))
+        if (code == '35'):
+            return '36Y%sAOInst|AA%s|' % (TIMESTAMP, field(message, 'AA'))
+        if (code == '37'):
+            with self._lock:
+                self.balance -= Decimal(field(message, 'BV'))
+            return '38Y%sAOInst|AA%s|' % (TIMESTAMP, field(message, 'AA'))
+        if (code in ('23', '63')):
+            with self._lock:
+                balance = self.balance
+            variable = 'AOInst|AA%s|AEJane Doe|BLY|CQY|BV%s|' % (field(message, 'AA'), balance)
+            if (code == '23'):
+                return '24%s000%s%s' % (' ' * 14, TIMESTAMP, variable)
+            summary = message[23:33]
+            start   = int(field(message, 'BP') or 1)
+            end     = int(field(message, 'BQ') or 5)
+            if (summary[2:3] == 'Y'):
+                variable += ''.join('AU%s|' % charged for charged in self.charged[start - 1:end])
+            counts = '0000' * 2 + '%04d' % len(self.charged) + '0000' * 3
+            return '64%s000%s%s%s' % (' ' * 14, TIMESTAMP, counts, variable)
+        return '96'
+
+
+    def frame(self, body, message):
+        """ Add sequence number, checksum and terminator to a response
+        @param  string body        Response of respond()
+        @param  string message     The request
+        @return bytes
+        """
+        sequence = re.search(r'AY(\d)AZ', message)
+        body    += 'AY%sAZ' % (sequence.group(1) if sequence else '0')
+        body    += checksum(body)
+        return (body + ('\r\n' if self.crlf else '\r')).encode('utf-8') + self.extra
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    allow_reuse_address = True
+    daemon_threads      = True
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    """ One connection: read requests up to CR, answer each """
+
+    def handle(self):
+        acs      = self.server.acs
+        received = b''
+        while True:
+            data = self.request.recv(4096)
+            if not data:
+                return
+            received += data
+            while (b'\r' in received):
+                line, received = received.split(b'\r', 1)
+                message = line.decode('utf-8').lstrip('\n')
+                code    = message[:2]
+                with acs._lock:
+                    acs.requests.append(message)
+                if (code in acs.dropBefore):
+                    return
+                response = acs.frame(acs.respond(message), message)
+                if (code in acs.dropAfter):
+                    return
+                if (acs.split != None and acs.split[0] == code):
+                    self.request.sendall(response[:acs.split[1]])
+                    time.sleep(acs.split[2])
+                    response = response[acs.split[1]:]
+                try:
+                    self.request.sendall(response)
+                except OSError:
+                    return
@@ -0,0 +1,53 @@
+""" Memory benchmark: bytes per idle session (Sip2Wrapper with its Sip2 object)
+
+Creates many unconnected wrappers with the same terminal configuration, like
+a gateway holding thousands of logical sessions, and reports the memory
+they use (tracemalloc). Run it before and after changes to the client
+classes to track the footprint.
+
+    python -m Sip2.Tests.memory_benchmark [sessions]
+"""
+import sys
+import tracemalloc
+
+from Sip2.wrapper import Sip2Wrapper
+
+
+SAMPLE = '64              00320240101    120000000000000000        0000AOLibrary|AA1234567890|AEJane Doe|BLY|CQY|BHEUR|BV0.00|AY6AZ0000'
+# @var string  Patron Information response parsed by each session (a "used" session)
+
+
+def measure(sessions, sip2Params, used = False):
+    """ Memory used by idle sessions
+    @param  int     sessions   Number of wrappers to create
+    @param  dict    sip2Params Configuration of every wrapper
+    @param  boolean used       Parse a response in each session, like after a request
+    @return float              Bytes per session
+    """
+    tracemalloc.start()
+    before  = tracemalloc.take_snapshot()
+    wrappers = [Sip2Wrapper(sip2Params, False) for i in range(sessions)]
+    if used:
+        for wrapper in wrappers:
+            wrapper._sip2.sip_patron_information_response(SAMPLE)
+    after   = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    used = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del wrappers
+    return used / sessions
+
+
+def main(argv = None):
+    """ Print bytes per session for a default and a lean configuration """
+    argv     = sys.argv[1:] if argv is None else argv
+    sessions = int(argv[0]) if argv else 20000
+    sip2Params = {'hostName': 'sip.example.org', 'hostPort': 6001, 'institutionId': 'Library', 'scLocation': 'Kiosk'}
+    print ('%d sessions' % sessions)
+    print ('  new:                          %8.0f bytes per session' % measure(sessions, sip2Params))
+    print ('  after a request, retainLast:  %8.0f bytes per session' % measure(sessions, sip2Params, True))
+    print ('  after a request, no retention:%8.0f bytes per session' % measure(sessions, dict(sip2Params, retainLast = False), True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+""" Framing of responses in Sip2._exchange (@see Sip2.get_response)
+
+    python -m pytest Sip2/Tests
+"""
+import unittest
+
+from Sip2.sip2 import Sip2FramingError
+from Sip2.wrapper import Sip2Wrapper
+from Sip2.Tests.fake_acs import FakeAcs
+
+
+class ExchangeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.acs     = FakeAcs()
+        self.wrapper = Sip2Wrapper(self.acs.params(socketTimeout = 0.2))
+        self.wrapper.login_device('user', 'pass', False)
+
+    def tearDown(self):
+        self.wrapper.disconnect()
+        self.acs.close()
+
+    def test_response_over_several_segments(self):
+        self.acs.split = ('17', 10, 0.05)
+        info = self.wrapper.sip_item_information('I1')
+        self.assertEqual(info['fixed']['CirculationStatus'], '03')
+        self.assertEqual(info['variable']['AJ'], ['Title I1'])
+
+    def test_incomplete_response_closes_the_socket(self):
+        self.acs.split = ('17', 10, 0.5)
+        with self.assertRaises(Sip2FramingError):
+            self.wrapper.sip_item_information('I1')
+        self.assertIsNone(self.wrapper._sip2._socket)
+        # not resent, the rest of the frame would be read as its answer
+        self.assertEqual(self.acs.codes().count('17'), 1)
+
+        self.acs.split = None
+        self.wrapper.reconnect()
+        info = self.wrapper.sip_item_information('I2')
+        self.assertEqual(info['variable']['AB'], ['I2'])
+        self.assertEqual(info['fixed']['CirculationStatus'], '03')
+
+    def test_connection_closed_by_acs(self):
+        self.acs.dropBefore = {'17'}
+        with self.assertRaises(Sip2FramingError):
+            self.wrapper.sip_item_information('I1')
+        self.assertIsNone(self.wrapper._sip2._socket)
+
+    def test_crlf_terminated_responses(self):
+        self.acs.crlf = True
+        first  = self.wrapper.sip_item_information('I1')
+        # the LF is kept for the next response, not dropped with the socket data
+        self.assertEqual(self.wrapper._sip2._buffer, b'\n')
+        second = self.wrapper.sip_item_information('I2')
+        self.assertEqual(first['variable']['AB'], ['I1'])
+        self.assertEqual(second['variable']['AB'], ['I2'])
+        self.assertEqual(second['fixed']['CirculationStatus'], '03')
+
+    def test_bytes_after_the_terminator_start_the_next_response(self):
+        self.acs.extra = b'18010001'
+        self.wrapper.sip_item_information('I1')
+        self.assertEqual(self.wrapper._sip2._buffer, b'18010001')
+        self.wrapper._sip2.disconnect()
+        self.assertEqual(self.wrapper._sip2._buffer, b'')
+
+
+if __name__ == '__main__':
+    unittest.main()
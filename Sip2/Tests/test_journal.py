@@ -0,0 +1,73 @@
+""" Durable append-only journal (@see Sip2.journal)
+
+    python -m pytest Sip2/Tests
+"""
+import os
+import tempfile
+import threading
+import unittest
+
+from Sip2.journal import Journal
+
+
+class JournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(prefix = 'sip2-tests-'), 'test.journal')
+
+    def test_records_survive_reopening(self):
+        journal = Journal(self.path)
+        journal.append({'id': 1})
+        journal.append({'id': 2}, False)
+        journal.close()
+        self.assertEqual(Journal(self.path).records(), [{'id': 1}, {'id': 2}])
+
+    def test_torn_tail_is_cut_off(self):
+        journal = Journal(self.path)
+        journal.append({'id': 1})
+        journal.close()
+        size = os.path.getsize(self.path)
+        with open(self.path, 'a') as target:
+            target.write('deadbeef {"id": 2')
+
+        journal = Journal(self.path)
+        self.assertEqual(journal.records(), [{'id': 1}])
+        self.assertEqual(os.path.getsize(self.path), size)
+        journal.append({'id': 3})
+        journal.close()
+        self.assertEqual(Journal(self.path).records(), [{'id': 1}, {'id': 3}])
+
+    def test_records_after_a_bad_checksum_are_dropped(self):
+        journal = Journal(self.path)
+        for number in range(3):
+            journal.append({'id': number})
+        journal.close()
+        with open(self.path) as source:
+            lines = source.readlines()
+        lines[1] = '00000000' + lines[1][8:]
+        with open(self.path, 'w') as target:
+            target.writelines(lines)
+        self.assertEqual(Journal(self.path).records(), [{'id': 0}])
+
+    def test_concurrent_appends_share_fsyncs(self):
+        journal = Journal(self.path, syncDelay = 0.05)
+        threads = [threading.Thread(target = journal.append, args = ({'id': number},)) for number in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLess(journal.syncs, 8)
+        journal.close()
+        self.assertEqual(sorted(record['id'] for record in Journal(self.path).records()), list(range(8)))
+
+    def test_rewrite_replaces_the_content(self):
+        journal = Journal(self.path)
+        journal.append({'id': 1})
+        journal.rewrite([{'id': 2}])
+        journal.append({'id': 3})
+        journal.close()
+        self.assertEqual(Journal(self.path).records(), [{'id': 2}, {'id': 3}])
+
+
+if __name__ == '__main__':
+    unittest.main()
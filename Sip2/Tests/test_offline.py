@@ -0,0 +1,87 @@
+""" Store-and-forward of checkouts and checkins (@see Sip2.offline)
+
+    python -m pytest Sip2/Tests
+"""
+import os
+import tempfile
+import unittest
+
+from Sip2.offline import OfflineQueue
+from Sip2.wrapper import Sip2Wrapper
+from Sip2.Tests.fake_acs import FakeAcs
+
+
+class OfflineQueueTest(unittest.TestCase):
+
+    def setUp(self):
+        self.acs     = FakeAcs()
+        self.path    = os.path.join(tempfile.mkdtemp(prefix = 'sip2-tests-'), 'offline.journal')
+        self.queue   = OfflineQueue(self.path)
+        self.wrapper = Sip2Wrapper(self.acs.params(socketTimeout = 0.5), True, 'Sip2', offlineQueue = self.queue)
+        self.wrapper.login_device('user', 'pass')
+        self.wrapper.login_patron('P1', 'pin')
+
+    def tearDown(self):
+        self.wrapper.disconnect()
+        self.queue.close()
+        self.acs.close()
+
+    def go_offline(self):
+        """ Checkout I1 and checkin I2 while the ACS drops every connection """
+        self.acs.dropBefore = {'11', '09'}
+        checkout = self.wrapper.sip_item_checkout('I1')
+        checkin  = self.wrapper.sip_item_checkin('I2')
+        self.acs.dropBefore = set()
+        return checkout, checkin
+
+    def test_transactions_are_queued_while_offline(self):
+        checkout, checkin = self.go_offline()
+        self.assertEqual(checkout['fixed']['Ok'], '1')
+        self.assertEqual(checkin['fixed']['Ok'], '1')
+        self.assertIn('offline', checkout)
+        self.assertEqual([(record['op'], record['item'], record['patron']) for record in self.queue.pending()],
+                         [('checkout', 'I1', 'P1'), ('checkin', 'I2', '')])
+        # the dead connection was closed, not waited on again
+        self.assertEqual(self.acs.codes().count('09'), 0)
+
+    def test_pending_transactions_survive_a_restart(self):
+        self.go_offline()
+        self.queue.close()
+        self.assertEqual(len(OfflineQueue(self.path).pending()), 2)
+
+    def test_replay_sends_in_order_with_no_block(self):
+        self.go_offline()
+        self.wrapper.reconnect()
+        before = len(self.acs.requests)
+        report = self.wrapper.replay_offline(rate = 100)
+
+        self.assertEqual((report['sent'], report['accepted'], report['remaining'], report['error']), (2, 2, 0, None))
+        replayed = self.acs.requests[before:]
+        self.assertEqual([message[:2] for message in replayed], ['11', '09'])
+        self.assertEqual(replayed[0][3], 'Y')      # checkout: no block
+        self.assertEqual(replayed[1][2], 'Y')      # checkin: no block
+        self.assertEqual(self.queue.pending(), [])
+        self.assertEqual(os.path.getsize(self.path), 0)
+
+    def test_replay_stops_at_a_connection_error(self):
+        self.go_offline()
+        self.wrapper.reconnect()
+        self.acs.dropBefore = {'09'}
+        report = self.wrapper.replay_offline(rate = 100)
+
+        self.assertEqual((report['sent'], report['remaining']), (1, 1))
+        self.assertIsNotNone(report['error'])
+        # replaying must not queue the checkin a second time
+        self.assertEqual([record['item'] for record in self.queue.pending()], ['I2'])
+
+    def test_no_queueing_if_the_acs_forbids_offline_operation(self):
+        self.acs.offlineOk = 'N'
+        self.wrapper.sip_sc_status()
+        self.acs.dropBefore = {'11'}
+        with self.assertRaises(ConnectionError):
+            self.wrapper.sip_item_checkout('I1')
+        self.assertEqual(self.queue.pending(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
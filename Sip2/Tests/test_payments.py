@@ -0,0 +1,83 @@
+""" At-most-once Fee Paid (@see Sip2.payments)
+
+    python -m pytest Sip2/Tests
+"""
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+
+from Sip2.payments import PaymentJournal
+from Sip2.wrapper import Sip2Wrapper
+from Sip2.Tests.fake_acs import FakeAcs, field
+
+
+class PaymentJournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.acs      = FakeAcs()
+        self.path     = os.path.join(tempfile.mkdtemp(prefix = 'sip2-tests-'), 'payments.journal')
+        self.payments = PaymentJournal(self.path)
+        self.wrapper  = Sip2Wrapper(self.acs.params(socketTimeout = 0.5), True)
+        self.wrapper.login_device('user', 'pass')
+        self.wrapper.login_patron('P1', 'pin')
+
+    def tearDown(self):
+        self.wrapper.disconnect()
+        self.payments.close()
+        self.acs.close()
+
+    def fee_paid(self):
+        """ Fee Paid requests received, oldest first """
+        return [message for message in self.acs.requests if message[:2] == '37']
+
+    def test_accepted_payment(self):
+        result = self.payments.pay(self.wrapper, 1, 0, '1.50')
+        self.assertEqual(result['status'], 'accepted')
+        self.assertEqual(self.acs.balance, Decimal('2.50'))
+        self.assertEqual(field(self.fee_paid()[0], 'BK'), result['id'])
+        self.assertEqual(self.payments.in_doubt(), [])
+
+    def test_lost_response_of_a_booked_payment_is_not_resent(self):
+        self.acs.dropAfter = {'37'}
+        result = self.payments.pay(self.wrapper, 1, 0, '1.50')
+        self.assertEqual(result['status'], 'doubt')
+        self.assertEqual([record['id'] for record in self.payments.in_doubt()], [result['id']])
+
+        self.acs.dropAfter = set()
+        self.wrapper.reconnect()
+        report = self.payments.recover(self.wrapper)
+        self.assertEqual((report['booked'], report['resent'], report['doubt']), ([result['id']], [], []))
+        self.assertEqual(len(self.fee_paid()), 1)
+        self.assertEqual(self.acs.balance, Decimal('2.50'))
+
+    def test_lost_request_is_resent_with_the_same_transaction_id(self):
+        self.acs.dropBefore = {'37'}
+        result = self.payments.pay(self.wrapper, 1, 0, '1.50')
+        self.assertEqual(result['status'], 'doubt')
+        self.assertEqual(self.acs.balance, Decimal('4.00'))
+
+        self.acs.dropBefore = set()
+        self.wrapper.reconnect()
+        report = self.payments.recover(self.wrapper)
+        self.assertEqual((report['booked'], report['resent'], report['doubt']), ([], [result['id']], []))
+        self.assertEqual([field(message, 'BK') for message in self.fee_paid()], [result['id']] * 2)
+        self.assertEqual(self.acs.balance, Decimal('2.50'))
+
+    def test_attempts_in_doubt_survive_a_restart(self):
+        self.acs.dropBefore = {'37'}
+        result = self.payments.pay(self.wrapper, 1, 0, '1.50')
+        self.payments.close()
+
+        self.payments = PaymentJournal(self.path)
+        doubt = self.payments.in_doubt()
+        self.assertEqual([(record['id'], record['patron'], record['feeAmount']) for record in doubt],
+                         [(result['id'], 'P1', '1.50')])
+        self.assertEqual(doubt[0]['before']['balance'], '4.00')
+
+        self.payments.resolve(result['id'], False)
+        self.assertEqual(self.payments.in_doubt(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+""" Patron session leases of the connection pool (@see Sip2Pool.leased)
+
+    python -m pytest Sip2/Tests
+"""
+import unittest
+
+from Sip2.pool import Sip2Pool
+from Sip2.Tests.fake_acs import FakeAcs
+
+
+class PoolLeaseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.acs  = FakeAcs()
+        self.pool = Sip2Pool(self.acs.params(socketTimeout = 0.5), 2, 'Sip2', 'user', 'pass', False)
+
+    def tearDown(self):
+        self.pool.close()
+        self.acs.close()
+
+    def test_session_is_pinned_across_blocks(self):
+        with self.pool.leased('s1') as wrapper:
+            wrapper.login_patron('P1', 'pin')
+        self.assertIn('s1', self.pool._leases)
+        with self.pool.leased('s1') as again:
+            again.sip_item_checkout('I1')
+        self.assertIs(again, wrapper)
+        self.assertEqual(again._sip2.patron, 'P1')
+        with self.pool.leased('s2') as other:
+            self.assertIsNot(other, wrapper)
+
+    def test_session_ended_in_the_same_block_ends_the_lease(self):
+        with self.pool.leased('s1') as wrapper:
+            wrapper.login_patron('P1', 'pin')
+            wrapper.sip_item_checkout('I1')
+            wrapper.sip_patron_session_end()
+        self.assertNotIn('s1', self.pool._leases)
+        self.assertEqual(self.pool._idle, [wrapper])
+        self.assertEqual(wrapper._sip2.patron, '')
+
+    def test_session_ended_in_a_later_block_ends_the_lease(self):
+        with self.pool.leased('s1') as wrapper:
+            wrapper.login_patron('P1', 'pin')
+        with self.pool.leased('s1') as wrapper:
+            wrapper.sip_patron_session_end()
+        self.assertNotIn('s1', self.pool._leases)
+
+    def test_lease_without_a_session_is_kept(self):
+        with self.pool.leased('s1'):
+            pass
+        self.assertIn('s1', self.pool._leases)
+
+    def test_next_patron_keeps_the_lease(self):
+        with self.pool.leased('s1') as wrapper:
+            wrapper.login_patron('P1', 'pin')
+            wrapper.sip_patron_session_end()
+            wrapper.login_patron('P2', 'pin')
+        self.assertIs(self.pool._leases['s1']['wrapper'], wrapper)
+        self.assertEqual(wrapper._sip2.patron, 'P2')
+
+    def test_idle_leases_expire(self):
+        with self.pool.leased('s1') as wrapper:
+            wrapper.login_patron('P1', 'pin')
+        self.pool.leaseTimeout = 0
+        self.assertEqual(self.pool.expire_leases(), 1)
+        self.assertEqual(self.acs.codes()[-1], '35')
+        self.assertNotIn('s1', self.pool._leases)
+        self.assertEqual(self.pool._idle, [wrapper])
+        self.assertEqual(wrapper._sip2.patron, '')
+
+    def test_socket_error_ends_the_lease_and_closes_the_connection(self):
+        self.acs.dropBefore = {'11'}
+        with self.assertRaises(ConnectionError):
+            with self.pool.leased('s1') as wrapper:
+                wrapper.login_patron('P1', 'pin')
+                wrapper.sip_item_checkout('I1')
+        self.assertNotIn('s1', self.pool._leases)
+        self.assertEqual(self.pool._idle, [])
+        self.assertEqual(self.pool._created, 0)
+
+        self.acs.dropBefore = set()
+        with self.pool.leased('s1') as other:
+            other.sip_item_checkout('I1')
+        self.assertIsNot(other, wrapper)
+
+
+if __name__ == '__main__':
+    unittest.main()
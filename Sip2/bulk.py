@@ -0,0 +1,322 @@
+import datetime
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BulkCheckin:
+    """ Bulk check-in engine for automated returns sorters
+    Takes a stream of barcodes and checks them in (09/10) over the connections
+    of a Sip2Pool, several at a time. Barcodes are spread over worker threads
+    by hash, so the same barcode always goes to the same worker and is
+    processed in the order it was read (a book put on the belt twice is
+    checked in twice, one after the other).
+
+    Each checkin response is mapped to a sorter bin by route(): items the ACS
+    rejected go to errorBin, items with the alert flag set to alertBin, all
+    others by their sort bin (CL) through binMap, or to defaultBin. Subclass
+    and override route() for other rules.
+
+    @example:
+        from Sip2.pool import Sip2Pool
+        from Sip2.bulk import BulkCheckin
+        pool   = Sip2Pool(sip2Params, size = 4, loginUserId = 'user', loginPassword = 'pass')
+        engine = BulkCheckin(pool, binMap = {'B1': 1, 'B2': 2}, defaultBin = 3,
+                             onResult = lambda result: sorter.push(result['bin']))
+        report = engine.run(scanner.barcodes())
+        print (report['itemsPerHour'], report['failed'])
+    """
+
+    def __init__(self, pool, workers = None, currentLocation = '', binMap = {}, defaultBin = 'default', alertBin = 'alert', errorBin = 'reject', onResult = None, retries = 1):
+        """ Constructor
+        @param Sip2Pool pool           Connections to use
+        @param int      workers        Number of concurrent checkins (default: pool size)
+        @param string   currentLocation Value for AP (default: scLocation of the connection)
+        @param dict     binMap         Sort bin (CL) => sorter bin
+        @param mixed    defaultBin     Bin for items without (known) sort bin
+        @param mixed    alertBin       Bin for items with the alert flag set
+        @param mixed    errorBin       Bin for items the ACS rejected or that failed
+        @param callable onResult       Called with each result dict as soon as it is known (from worker threads)
+        @param int      retries        Resends after a connection error (on another connection)
+        """
+        self.pool           = pool
+        # @var Sip2Pool    Connections to use
+        self.workers        = pool.size if workers is None else workers
+        # @var int         Number of worker threads
+        self.currentLocation = currentLocation
+        # @var string      Value for the AP field
+        self.binMap         = binMap
+        # @var dict        Sort bin (CL) => sorter bin
+        self.defaultBin     = defaultBin
+        # @var mixed       Bin for items without (known) sort bin
+        self.alertBin       = alertBin
+        # @var mixed       Bin for items with the alert flag set
+        self.errorBin       = errorBin
+        # @var mixed       Bin for rejected or failed items
+        self.onResult       = onResult
+        # @var callable    Result callback
+        self.retries        = retries
+        # @var int         Resends after a connection error
+
+
+    def route(self, info):
+        """ Map a checkin response to a sorter bin
+        @param  array info     parsed Checkin response (10)
+        @return mixed          sorter bin
+        """
+        if (info['fixed']['Ok'] != '1'):
+            return self.errorBin
+        if (info['fixed']['Alert'] == 'Y'):
+            return self.alertBin
+        sortBin = info['variable'].get('CL', [''])[0]
+        return self.binMap.get(sortBin, self.defaultBin)
+
+
+    def checkin(self, itemIdentifier):
+        """ Check in a single item and route it
+        @param  string itemIdentifier  the barcode
+        @return array                  {'item', 'ok', 'bin', 'alert', 'response', 'error', 'seconds'}
+        """
+        started = time.monotonic()
+        result  = {'item': itemIdentifier, 'ok': False, 'bin': self.errorBin, 'alert': False,
+                   'response': None, 'error': None, 'seconds': 0.0}
+        for attempt in range(self.retries + 1):
+            try:
+                with self.pool.connection() as wrapper:
+                    info = wrapper.sip_item_checkin(itemIdentifier, None, self.currentLocation)
+                if (info == False):
+                    result['error'] = 'Checkin not supported by ACS'
+                else:
+                    result['response'] = info
+                    result['ok']       = (info['fixed']['Ok'] == '1')
+                    result['alert']    = (info['fixed']['Alert'] == 'Y')
+                    result['bin']      = self.route(info)
+                    result['error']    = None
+                break
+            except OSError as e:
+                result['error'] = '%s: %s' % (type(e).__name__, e)
+            except Exception as e:
+                # e.g. a malformed response or a closed pool: no point in resending
+                result.update(ok = False, bin = self.errorBin, error = '%s: %s' % (type(e).__name__, e))
+                break
+
+        result['seconds'] = time.monotonic() - started
+        return result
+
+
+    def run(self, barcodes):
+        """ Check in all barcodes of an iterable (may be an endless generator)
+        @param  iterable barcodes  Barcodes in the order they were read
+        @return array              Report: {'items', 'ok', 'failed', 'seconds', 'itemsPerHour', 'bins', 'failures'}
+        """
+        report = {'items': 0, 'ok': 0, 'failed': 0, 'seconds': 0.0, 'itemsPerHour': 0.0, 'bins': {}, 'failures': []}
+        lock   = threading.Lock()
+        queues = [queue.Queue(maxsize = 100) for i in range(self.workers)]
+
+        def work(items):
+            while True:
+                itemIdentifier = items.get()
+                if itemIdentifier is None:
+                    return
+                try:
+                    result = self.checkin(itemIdentifier)
+                except Exception as e:
+                    # never let one item stop the worker, its queue would fill up
+                    result = {'item': itemIdentifier, 'ok': False, 'bin': self.errorBin, 'alert': False,
+                              'response': None, 'error': '%s: %s' % (type(e).__name__, e), 'seconds': 0.0}
+                if (self.onResult != None):
+                    try:
+                        self.onResult(result)
+                    except Exception as e:
+                        result['ok']    = False
+                        result['bin']   = self.errorBin
+                        result['error'] = 'onResult failed: %s: %s' % (type(e).__name__, e)
+                with lock:
+                    report['items'] += 1
+                    report['bins'][result['bin']] = report['bins'].get(result['bin'], 0) + 1
+                    if result['ok']:
+                        report['ok'] += 1
+                    else:
+                        report['failed'] += 1
+                        report['failures'].append(result)
+
+        started = time.monotonic()
+        threads = [threading.Thread(target = work, args = (items,), daemon = True) for items in queues]
+        for thread in threads:
+            thread.start()
+        try:
+            for itemIdentifier in barcodes:
+                queues[hash(itemIdentifier) % self.workers].put(itemIdentifier)
+        finally:
+            for items in queues:
+                items.put(None)
+            for thread in threads:
+                thread.join()
+
+        report['seconds'] = time.monotonic() - started
+        if (report['seconds'] > 0):
+            report['itemsPerHour'] = report['items'] * 3600 / report['seconds']
+        return report
+
+
+class BulkRenew:
+    """ Nightly bulk renew engine with selective renewals
+    Instead of Renew All (65) for every patron, it fetches the charged and
+    overdue items of each patron with the paginator, looks up their due date
+    (Item Information, AH) and renews (29) only the items that are due within
+    dueWithin days. Patrons are processed concurrently over the connections of
+    a Sip2Pool, each patron on one connection (patron session). All Item
+    Information and Renew requests of the engine share a global rate limit.
+
+    Override needs_renewal() for other rules.
+
+    @example:
+        from Sip2.bulk import BulkRenew
+        engine = BulkRenew(pool, dueWithin = 2, rate = 20)
+        report = engine.run([('patron1', 'pin1'), 'patron2'])
+        print (report['renewed'], report['failed'])
+    """
+
+    def __init__(self, pool, workers = None, dueWithin = 2, rate = None, pageSize = 20, now = None):
+        """ Constructor
+        @param Sip2Pool pool       Connections to use
+        @param int      workers    Patrons processed concurrently (default: pool size)
+        @param float    dueWithin  Renew items due within that many days (overdue items included)
+        @param float    rate       Maximum Item Information and Renew requests per second (None: unlimited)
+        @param int      pageSize   Items per Patron Information request
+        @param datetime now        Reference time for due dates (default: time of run())
+        """
+        from Sip2.ratelimit import TokenBucket
+
+        self.pool           = pool
+        # @var Sip2Pool    Connections to use
+        self.workers        = pool.size if workers is None else workers
+        # @var int         Patrons processed concurrently
+        self.dueWithin      = dueWithin
+        # @var float       Renewal horizon in days
+        self.pageSize       = pageSize
+        # @var int         Items per Patron Information request
+        self.now            = now
+        # @var datetime    Reference time for due dates
+        self._bucket        = None if rate is None else TokenBucket(rate)
+        # @var TokenBucket Global rate limit (or None)
+
+
+    def needs_renewal(self, dueDate, now):
+        """ Decide if an item should be renewed
+        @param  datetime dueDate   Due date of the item
+        @param  datetime now       Reference time
+        @return boolean
+        """
+        return (dueDate - now <= datetime.timedelta(days = self.dueWithin))
+
+
+    def renew_patron(self, patron, patronpwd = '', now = None):
+        """ Renew the items of one patron that need it
+        @param  string   patron        Patron identifier (AA)
+        @param  string   patronpwd     Patron password (AD)
+        @param  datetime now           Reference time (default: now)
+        @return dict   {'patron', 'valid', 'checked', 'renewed', 'notRenewed', 'unknownDueDate', 'error'}
+                       renewed: list of items; notRenewed: list of (item, screen message)
+        """
+        now    = datetime.datetime.now() if now is None else now
+        result = {'patron': patron, 'valid': False, 'checked': 0, 'renewed': [], 'notRenewed': [],
+                  'unknownDueDate': [], 'error': None}
+        try:
+            with self.pool.connection() as wrapper:
+                result['valid'] = wrapper.login_patron(patron, patronpwd)
+                if result['valid']:
+                    try:
+                        self._renew_items(wrapper, now, result)
+                    finally:
+                        wrapper.sip_patron_session_end()
+        except (OSError, RuntimeError) as e:
+            result['error'] = '%s: %s' % (type(e).__name__, e)
+        return result
+
+
+    def run(self, patrons):
+        """ Renew for all patrons
+        @param  iterable patrons   Patron identifiers or (identifier, password) tuples
+        @return dict   {'patrons', 'invalidPatrons', 'checked', 'renewed', 'notRenewed', 'unknownDueDate',
+                        'failed', 'seconds', 'results'}
+        """
+        now     = datetime.datetime.now() if self.now is None else self.now
+        report  = {'patrons': 0, 'invalidPatrons': 0, 'checked': 0, 'renewed': 0, 'notRenewed': 0,
+                   'unknownDueDate': 0, 'failed': 0, 'seconds': 0.0, 'results': []}
+
+        def renew(patron):
+            if isinstance(patron, (tuple, list)):
+                return self.renew_patron(patron[0], patron[1], now)
+            return self.renew_patron(patron, '', now)
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(self.workers) as executor:
+            for result in executor.map(renew, patrons):
+                report['patrons']        += 1
+                report['checked']        += result['checked']
+                report['renewed']        += len(result['renewed'])
+                report['notRenewed']     += len(result['notRenewed'])
+                report['unknownDueDate'] += len(result['unknownDueDate'])
+                if (result['error'] != None):
+                    report['failed'] += 1
+                elif (result['valid'] == False):
+                    report['invalidPatrons'] += 1
+                report['results'].append(result)
+
+        report['seconds'] = time.monotonic() - started
+        return report
+
+
+    def _renew_items(self, wrapper, now, result):
+        """ Check and renew the charged and overdue items of the patron session of wrapper """
+        items = []
+        for infoType in ('overdue', 'charged'):
+            pages = wrapper.iter_patron_items(infoType, self.pageSize)
+            if (pages == False):
+                raise RuntimeError('Patron Information not supported by ACS')
+            for item in pages:
+                if (item not in items):
+                    items.append(item)
+
+        for itemIdentifier in items:
+            result['checked'] += 1
+            self._throttle()
+            info = wrapper.sip_item_information(itemIdentifier)
+            dueDate = None if info == False else parse_sip_date(info['variable'].get('AH', [''])[0])
+            if (dueDate == None):
+                result['unknownDueDate'].append(itemIdentifier)
+                continue
+            if (self.needs_renewal(dueDate, now) == False):
+                continue
+
+            self._throttle()
+            info = wrapper.sip_item_renew(itemIdentifier)
+            if (info != False and info['fixed']['Ok'] == '1'):
+                result['renewed'].append(itemIdentifier)
+            else:
+                message = '' if info == False else info['variable'].get('AF', [''])[0]
+                result['notRenewed'].append((itemIdentifier, message))
+
+
+    def _throttle(self):
+        """ Wait for the global rate limit """
+        if (self._bucket != None):
+            self._bucket.acquire()
+
+
+def parse_sip_date(value):
+    """ Parse a date sent by an ACS. The due date (AH) format is not fixed by
+    the protocol, this tries the SIP2 datestamp and common ACS formats.
+    @param  string value       e.g. '20240105    235959', '20240105', '08.06.2016', '5/23/2008,23:59'
+    @return datetime|None      None if empty or unknown format
+    """
+    value = value.strip()
+    for pattern in ('%Y%m%d    %H%M%S', '%Y%m%dZ   %H%M%S', '%Y%m%d%H%M%S', '%Y%m%d', '%Y-%m-%d %H:%M:%S',
+                    '%Y-%m-%d', '%d.%m.%Y', '%m/%d/%Y,%H:%M', '%m/%d/%Y'):
+        try:
+            return datetime.datetime.strptime(value, pattern)
+        except ValueError:
+            pass
+    return None
@@ -0,0 +1,204 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class ItemCache:
+    """ Item Information Cache
+    A bounded LRU cache with TTL for parsed Item Information responses (code
+    18), keyed by (institution id, item identifier). Self check terminals and
+    sorters ask for the same barcode several times within seconds, so most of
+    those 17/18 round trips can be answered locally.
+
+    - Unknown items (no title returned by the ACS) are cached "negatively" for
+      a shorter period (negativeTtl), so a typo or foreign barcode does not
+      hit the ACS over and over, but a freshly catalogued item shows up soon.
+    - Sip2Wrapper invalidates the entry of an item on checkin, checkout, 
+      renew and item status update. A response requested before that is 
+      not stored afterwards (@see generation()).
+    - Optionally an SQLite file (dbPath) backs the cache, so title and media
+      data survive restarts. Only positive entries are persisted.
+
+    @note Cached responses are shared between callers. Don't modify them.
+
+    @example:
+        from Sip2.cache import ItemCache
+        from Sip2.wrapper import Sip2Wrapper
+
+        cache   = ItemCache(maxSize = 5000, ttl = 300, negativeTtl = 30, dbPath = '/var/lib/sc/items.db')
+        wrapper = Sip2Wrapper(sip2Params, True, 'Sip2', itemCache = cache)
+        wrapper.sip_item_information('itemBarcode')   # asks the ACS
+        wrapper.sip_item_information('itemBarcode')   # answered by the cache
+    """
+
+    def __init__(self, maxSize = 1024, ttl = 300, negativeTtl = 30, dbPath = None, persistentTtl = None):
+        """ Constructor
+        @param int    maxSize        Maximum number of entries kept in memory (LRU eviction)
+        @param int    ttl            Seconds a known item is served from the cache
+        @param int    negativeTtl    Seconds an unknown item is served from the cache
+        @param string dbPath         Optional SQLite file for a persistent second level
+        @param int    persistentTtl  Seconds an entry is valid in the SQLite file (default: ttl)
+        """
+        if (maxSize < 1):
+            raise ValueError("ItemCache: maxSize must be at least 1: '%s'" % maxSize)
+
+        self.maxSize        = maxSize
+        # @var int         Maximum number of entries in memory
+        self.ttl            = ttl
+        # @var int         Time to live (seconds) of known items
+        self.negativeTtl    = negativeTtl
+        # @var int         Time to live (seconds) of unknown items
+        self.persistentTtl  = ttl if persistentTtl is None else persistentTtl
+        # @var int         Time to live (seconds) of entries in the SQLite file
+
+        self.hits           = 0
+        # @var int         Number of requests answered by the cache
+        self.misses         = 0
+        # @var int         Number of requests that had to go to the ACS
+
+        self._entries       = OrderedDict()
+        # @var OrderedDict (institution, item) => (expires, info), oldest first
+        self._generation    = 0
+        # @var int         Number of invalidations so far
+        self._invalidated   = OrderedDict()
+        # @var OrderedDict (institution, item) => _generation of its last invalidation, oldest first (maxSize entries)
+        self._floor         = 0
+        # @var int         Latest generation dropped from _invalidated
+        self._lock          = threading.Lock()
+        # @var Lock        Guards _entries and _db
+        self._db            = None
+        # @var object      SQLite connection (if dbPath is set)
+
+        if dbPath is not None:
+            self._db = sqlite3.connect(dbPath, check_same_thread = False)
+            self._db.execute('CREATE TABLE IF NOT EXISTS item_cache ('
+                             'institution TEXT NOT NULL, item TEXT NOT NULL, '
+                             'expires REAL NOT NULL, info TEXT NOT NULL, '
+                             'PRIMARY KEY (institution, item))')
+            self._db.commit()
+
+
+    @staticmethod
+    def is_unknown(info):
+        """ Check if an Item Information response describes an item unknown to the ACS
+        The protocol has no explicit "not found" flag. ACSes answer with an
+        empty or missing title identifier (AJ) instead.
+        @param  array info     parsed Item Information response
+        @return boolean
+        """
+        title = info['variable'].get('AJ', [''])
+        return (title[0].strip() == '')
+
+
+    def get(self, institutionId, itemIdentifier):
+        """ Return the cached Item Information response for an item
+        @param  string institutionId   value of the AO field
+        @param  string itemIdentifier  value of the AB field
+        @return array|None             parsed response or None on a cache miss
+        """
+        key = (institutionId, itemIdentifier)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if (entry[0] > now):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute('SELECT expires, info FROM item_cache WHERE institution = ? AND item = ?', key).fetchone()
+                if row is not None:
+                    if (row[0] > now):
+                        info = json.loads(row[1])
+                        self._store(key, min(row[0], now + self.ttl), info)
+                        self.hits += 1
+                        return info
+                    self._db.execute('DELETE FROM item_cache WHERE institution = ? AND item = ?', key)
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+
+    def generation(self):
+        """ Token to pass to put() for a response requested now, e.g. after a get() miss
+        @return int
+        """
+        with self._lock:
+            return self._generation
+
+
+    def put(self, institutionId, itemIdentifier, info, generation = None):
+        """ Store an Item Information response
+        @param  string institutionId   value of the AO field
+        @param  string itemIdentifier  value of the AB field
+        @param  array  info            parsed Item Information response
+        @param  int    generation      generation() before the request; the response is
+                                       dropped if the item was invalidated since (None: store anyway)
+        """
+        key      = (institutionId, itemIdentifier)
+        now      = time.time()
+        negative = self.is_unknown(info)
+        with self._lock:
+            if (generation is not None and self._invalidated.get(key, self._floor) > generation):
+                # changed while the request was in flight, the response may be older
+                return
+            self._store(key, now + (self.negativeTtl if negative else self.ttl), info)
+            if (self._db is not None and negative == False):
+                self._db.execute('INSERT OR REPLACE INTO item_cache (institution, item, expires, info) VALUES (?, ?, ?, ?)',
+                                 (institutionId, itemIdentifier, now + self.persistentTtl, json.dumps(info)))
+                self._db.commit()
+
+
+    def invalidate(self, institutionId, itemIdentifier):
+        """ Drop an item, e.g. because its circulation status changed
+        @param  string institutionId   value of the AO field
+        @param  string itemIdentifier  value of the AB field
+        """
+        key = (institutionId, itemIdentifier)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generation += 1
+            self._invalidated[key] = self._generation
+            self._invalidated.move_to_end(key)
+            while (len(self._invalidated) > self.maxSize):
+                self._floor = self._invalidated.popitem(last = False)[1]
+            if self._db is not None:
+                self._db.execute('DELETE FROM item_cache WHERE institution = ? AND item = ?', key)
+                self._db.commit()
+
+
+    def clear(self):
+        """ Drop all entries (memory and SQLite file) """
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._invalidated.clear()
+            self._floor = self._generation
+            if self._db is not None:
+                self._db.execute('DELETE FROM item_cache')
+                self._db.commit()
+
+
+    def close(self):
+        """ Close the SQLite file. The in memory part keeps working. """
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    def _store(self, key, expires, info):
+        """ Put an entry into the in memory LRU, evict the oldest if full (caller holds the lock) """
+        self._entries[key] = (expires, info)
+        self._entries.move_to_end(key)
+        while (len(self._entries) > self.maxSize):
+            self._entries.popitem(last = False)
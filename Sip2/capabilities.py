@@ -0,0 +1,90 @@
+from enum import IntFlag
+
+
+class SupportedMessages(IntFlag):
+    """ Messages the ACS supports, the BX field of the SC Status response (98)
+    Bit n is position n of BX ('Y' = supported), so SupportedMessages(1 << n)
+    is the message with the position n used by Sip2Wrapper._command_available().
+
+    @example:
+        from Sip2.capabilities import SupportedMessages
+        wrapper.login_device('user', 'pass', True)
+        if (SupportedMessages.RENEW_ALL in wrapper.return_supported_messages()):
+            wrapper.sip_renew_all()
+    """
+    PATRON_STATUS       = 1 << 0
+    CHECKOUT            = 1 << 1
+    CHECKIN             = 1 << 2
+    BLOCK_PATRON        = 1 << 3
+    SC_ACS_STATUS       = 1 << 4
+    REQUEST_RESEND      = 1 << 5
+    LOGIN               = 1 << 6
+    PATRON_INFORMATION  = 1 << 7
+    END_PATRON_SESSION  = 1 << 8
+    FEE_PAID            = 1 << 9
+    ITEM_INFORMATION    = 1 << 10
+    ITEM_STATUS_UPDATE  = 1 << 11
+    PATRON_ENABLE       = 1 << 12
+    HOLD                = 1 << 13
+    RENEW               = 1 << 14
+    RENEW_ALL           = 1 << 15
+
+    @classmethod
+    def decode(cls, field):
+        """ Flags of a BX field
+        @param  string field       BX value, e.g. 'YYYNYNYYYYYNNYYY'
+        @return SupportedMessages
+        """
+        return cls(_bits(field, 16))
+
+
+class PatronRestrictions(IntFlag):
+    """ Conditions of the patron status field (24, 64), bit n is position n
+    ('Y' = the condition is true, e.g. charge privileges denied).
+
+    @example:
+        from Sip2.capabilities import PatronRestrictions
+        wrapper.login_patron('patron', 'pin')
+        if (PatronRestrictions.CARD_REPORTED_LOST in wrapper.return_patron_restrictions()):
+            ...
+    """
+    CHARGE_DENIED       = 1 << 0
+    RENEWAL_DENIED      = 1 << 1
+    RECALL_DENIED       = 1 << 2
+    HOLD_DENIED         = 1 << 3
+    CARD_REPORTED_LOST  = 1 << 4
+    TOO_MANY_CHARGED    = 1 << 5
+    TOO_MANY_OVERDUE    = 1 << 6
+    TOO_MANY_RENEWALS   = 1 << 7
+    TOO_MANY_CLAIMS_OF_ITEMS_RETURNED = 1 << 8
+    TOO_MANY_LOST       = 1 << 9
+    EXCESSIVE_FINES     = 1 << 10
+    EXCESSIVE_FEES      = 1 << 11
+    RECALL_OVERDUE      = 1 << 12
+    TOO_MANY_BILLED     = 1 << 13
+
+    @classmethod
+    def decode(cls, field):
+        """ Flags of a patron status field
+        @param  string field       PatronStatus, 14 characters
+        @return PatronRestrictions
+        """
+        return cls(_bits(field, 14))
+
+
+deniedBy = tuple(int({
+    1:  PatronRestrictions.CHARGE_DENIED,       # Checkout
+    13: PatronRestrictions.HOLD_DENIED,         # Hold
+    14: PatronRestrictions.RENEWAL_DENIED,      # Renew
+    15: PatronRestrictions.RENEWAL_DENIED,      # Renew All
+}.get(position, 0)) for position in range(16))
+# @var tuple Message position => restrictions denying the message to the patron (int mask)
+
+
+def _bits(field, length):
+    """ Integer with bit n set if position n of field is 'Y' """
+    bits = 0
+    for position, flag in enumerate(field[:length]):
+        if (flag == 'Y'):
+            bits |= 1 << position
+    return bits
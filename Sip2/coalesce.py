@@ -0,0 +1,122 @@
+import asyncio
+import threading
+
+
+class SingleFlight:
+    """ Single-flight request coalescing for threads
+    Concurrent calls with the same key share one execution: the first caller
+    (leader) runs the exchange, every caller arriving while it is in flight
+    waits and gets the same result (or the same exception). As soon as the
+    exchange finished the key is free again, so nothing is cached here
+    (@see Sip2.cache for that).
+
+    Only use it for read-only requests (SC Status, Item Information, Patron
+    Status/Information). Sip2Wrapper does this if a SingleFlight instance is
+    passed to it. Share one instance between all wrappers of a process, e.g.
+    all kiosks of a branch that refresh SC Status at the same time.
+
+    @note The parsed response is shared between all waiters. Don't modify it.
+
+    @example:
+        from Sip2.coalesce import SingleFlight
+        flight   = SingleFlight()
+        wrappers = [Sip2Wrapper(sip2Params, True, 'Sip2', singleFlight = flight) for i in range(30)]
+    """
+
+    def __init__(self):
+        self._calls         = {}
+        # @var dict        key => _Call currently in flight
+        self._lock          = threading.Lock()
+        # @var Lock        Guards _calls
+        self.executed       = 0
+        # @var int         Number of exchanges actually executed
+        self.shared         = 0
+        # @var int         Number of calls that got the result of another call
+
+
+    def do(self, key, fn, *args):
+        """ Run fn(*args) unless a call with the same key is in flight already
+        @param  hashable key   identifies identical requests
+        @param  callable fn    the exchange to run
+        @return mixed          return value of fn (own or shared)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+            else:
+                self.shared += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+
+class AsyncSingleFlight:
+    """ Single-flight request coalescing for asyncio
+    Same as SingleFlight, but for coroutines running in one event loop. A
+    cancelled waiter does not cancel the shared exchange for the others.
+
+    @example:
+        flight = AsyncSingleFlight()
+        loop   = asyncio.get_event_loop()
+        async def item_information(wrapper, itemId):
+            return await flight.do(('17', itemId), loop.run_in_executor, None, wrapper.sip_item_information, itemId)
+    """
+
+    def __init__(self):
+        self._calls         = {}
+        # @var dict        key => Future currently in flight
+        self.executed       = 0
+        # @var int         Number of exchanges actually executed
+        self.shared         = 0
+        # @var int         Number of calls that got the result of another call
+
+
+    async def do(self, key, fn, *args):
+        """ Await fn(*args) unless a call with the same key is in flight already
+        @param  hashable key   identifies identical requests
+        @param  callable fn    returns an awaitable (coroutine function, run_in_executor, ...)
+        @return mixed          result of the awaitable (own or shared)
+        """
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn(*args))
+            self._calls[key] = future
+            self.executed += 1
+
+            def forget(done):
+                if self._calls.get(key) is done:
+                    del self._calls[key]
+            future.add_done_callback(forget)
+        else:
+            self.shared += 1
+
+        return await asyncio.shield(future)
+
+
+class _Call:
+    """ An exchange in flight (SingleFlight internal) """
+
+    def __init__(self):
+        self.done           = threading.Event()
+        self.result         = None
+        self.error          = None
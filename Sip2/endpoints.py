@@ -0,0 +1,182 @@
+import threading
+import time
+
+
+class EndpointSet:
+    """ Several SIP2 front-ends of the same ACS, with health state and load spreading
+    Set it as endpoints in the sip2Params of wrappers and pools (hostName and
+    hostPort are then ignored). Each connect picks an endpoint by weight and
+    either the least outstanding requests or the lowest recent latency;
+    if it cannot be reached, the next one is tried.
+
+    Every endpoint has a circuit breaker: after failureThreshold connection
+    errors in a row (connect or request) it is taken out for resetTimeout
+    seconds. Then one connect is let through as a trial; if it succeeds the
+    endpoint is back, otherwise it is taken out again.
+
+    Running connections stay on their endpoint. After a connection error,
+    Sip2Wrapper.reconnect() (or a pool replacing the broken connection)
+    connects to a healthy endpoint.
+
+    @example:
+        from Sip2.endpoints import EndpointSet
+        endpoints = EndpointSet([('sip1.ils.net', 6001, 2), ('sip2.ils.net', 6001, 1)], strategy = 'latency')
+        wrapper   = Sip2Wrapper(dict(sip2Params, endpoints = endpoints), False)
+        wrapper.connect()
+        wrapper.login_device('user', 'pass')
+        try:
+            wrapper.sip_item_information('itemBarcode')
+        except ConnectionError:
+            wrapper.reconnect()
+        print (endpoints.status())
+    """
+
+    strategies = ('least_outstanding', 'latency')
+    # @var tuple       Selection strategies
+
+    def __init__(self, endpoints, strategy = 'least_outstanding', failureThreshold = 3, resetTimeout = 30.0, smoothing = 0.2):
+        """ Constructor
+        @param list   endpoints        (hostName, hostPort) or (hostName, hostPort, weight) tuples
+        @param string strategy         least_outstanding or latency
+        @param int    failureThreshold Connection errors in a row that open the circuit breaker
+        @param float  resetTimeout     Seconds before a trial connect to an open endpoint
+        @param float  smoothing        Weight of a new response time in the latency average (0-1)
+        """
+        if (strategy not in self.strategies):
+            raise ValueError("EndpointSet: invalid strategy: '%s'" % strategy)
+        if not endpoints:
+            raise ValueError('EndpointSet: no endpoints')
+
+        self.strategy       = strategy
+        # @var string      Selection strategy
+        self.failureThreshold = failureThreshold
+        # @var int         Connection errors in a row that open the circuit breaker
+        self.resetTimeout   = resetTimeout
+        # @var float       Seconds an open endpoint is skipped
+        self.smoothing      = smoothing
+        # @var float       EWMA weight of the latency
+
+        self._endpoints     = {}
+        # @var dict        (hostName, hostPort) => state
+        for endpoint in endpoints:
+            weight = endpoint[2] if len(endpoint) > 2 else 1
+            if (weight <= 0):
+                raise ValueError("EndpointSet: weight must be positive: '%s'" % (endpoint,))
+            self._endpoints[(endpoint[0], endpoint[1])] = {'weight': weight, 'outstanding': 0, 'connections': 0, 'latency': None,
+                                                          'failures': 0, 'state': 'closed', 'openedAt': 0.0}
+        self._lock          = threading.Lock()
+        # @var Lock        Guards _endpoints
+
+
+    def select(self, exclude = ()):
+        """ Choose an endpoint to connect to
+        @param  list exclude       Endpoints already tried
+        @return tuple|None         (hostName, hostPort), None if no endpoint is available
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = []
+            for endpoint, state in self._endpoints.items():
+                if (endpoint in exclude):
+                    continue
+                if (state['state'] == 'closed'):
+                    candidates.append(endpoint)
+                elif (state['state'] == 'open' and now - state['openedAt'] >= self.resetTimeout):
+                    candidates.append(endpoint)
+            if not candidates:
+                return None
+
+            endpoint = min(candidates, key = self._score)
+            state = self._endpoints[endpoint]
+            if (state['state'] == 'open'):
+                # trial connect, others keep skipping the endpoint meanwhile
+                state['state'] = 'half-open'
+            return endpoint
+
+
+    def connected(self, endpoint, seconds):
+        """ Record a successful connect
+        @param tuple endpoint      (hostName, hostPort)
+        @param float seconds       Time to connect
+        """
+        with self._lock:
+            self._endpoints[endpoint]['connections'] += 1
+        self._success(endpoint, seconds)
+
+
+    def disconnected(self, endpoint):
+        """ Record a closed connection
+        @param tuple endpoint      (hostName, hostPort)
+        """
+        with self._lock:
+            self._endpoints[endpoint]['connections'] -= 1
+
+
+    def begin(self, endpoint):
+        """ Record the start of a request
+        @param  tuple endpoint     (hostName, hostPort)
+        @return float              Start time, for end()
+        """
+        with self._lock:
+            self._endpoints[endpoint]['outstanding'] += 1
+        return time.monotonic()
+
+
+    def end(self, endpoint, started, ok):
+        """ Record the end of a request
+        @param tuple   endpoint    (hostName, hostPort)
+        @param float   started     Return value of begin()
+        @param boolean ok          False on a connection error, None if there was no exchange (e.g. not sent)
+        """
+        with self._lock:
+            self._endpoints[endpoint]['outstanding'] -= 1
+        if (ok == True):
+            self._success(endpoint, time.monotonic() - started)
+        elif (ok == False):
+            self.failure(endpoint)
+
+
+    def failure(self, endpoint):
+        """ Record a connection error, opens the circuit breaker after failureThreshold in a row
+        @param tuple endpoint      (hostName, hostPort)
+        """
+        with self._lock:
+            state = self._endpoints[endpoint]
+            state['failures'] += 1
+            if (state['state'] == 'half-open' or state['failures'] >= self.failureThreshold):
+                state['state']    = 'open'
+                state['openedAt'] = time.monotonic()
+
+
+    def status(self):
+        """ Health and load of all endpoints
+        @return dict   (hostName, hostPort) => {'weight', 'outstanding', 'connections', 'latency', 'failures', 'state'}
+        """
+        with self._lock:
+            result = {}
+            for endpoint, state in self._endpoints.items():
+                result[endpoint] = dict(state)
+                del result[endpoint]['openedAt']
+            return result
+
+
+    def _success(self, endpoint, seconds):
+        """ Record a response time, closes the circuit breaker """
+        with self._lock:
+            state = self._endpoints[endpoint]
+            state['failures'] = 0
+            state['state']    = 'closed'
+            if (state['latency'] == None):
+                state['latency'] = seconds
+            else:
+                state['latency'] = (1 - self.smoothing) * state['latency'] + self.smoothing * seconds
+
+
+    def _score(self, endpoint):
+        """ Sort key for select(), lower is better (caller holds the lock) """
+        state = self._endpoints[endpoint]
+        if (self.strategy == 'latency'):
+            # endpoints without measurements first, to get one
+            latency = 0.0 if state['latency'] is None else state['latency']
+            return (latency / state['weight'], state['outstanding'])
+        return (state['outstanding'] / state['weight'], state['connections'] / state['weight'])
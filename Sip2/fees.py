@@ -0,0 +1,107 @@
+import datetime
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+
+
+FeePosition = namedtuple('FeePosition', (
+    'feeId', 'amount', 'itemId', 'date', 'title', 'costType', 'costTypeDescription', 'paid'))
+""" One Gossip fee position (@see Gossip)
+feeId               CG  Fee identifier, used to pay the position (string)
+amount              FA  Outstanding amount (Decimal)
+itemId              FB  Item of the fee position (string)
+date                FC  Date the fee was generated (datetime.date, None if missing or invalid)
+title               FD  Description/title of the fee position (string)
+costType            FE  Cost type (string)
+costTypeDescription FF  Description of the cost type (string)
+paid                FG  Paid amount, Fee Paid responses only (Decimal, None if missing)
+"""
+
+_positionFields = {'CG': 'feeId', 'FA': 'amount', 'FB': 'itemId', 'FC': 'date',
+                   'FD': 'title', 'FE': 'costType', 'FF': 'costTypeDescription', 'FG': 'paid'}
+# @var dict  Field id => FeePosition attribute
+
+_emptyPosition = {'feeId': '', 'amount': Decimal('0'), 'itemId': '', 'date': None,
+                  'title': '', 'costType': '', 'costTypeDescription': '', 'paid': None}
+# @var dict  Values of the fields a position does not contain
+
+
+def iter_fee_positions(response):
+    """ Decode the fee positions of a Gossip response, one at a time
+    Walks the variable fields once, in the order the ACS sent them. Every CG
+    starts a new position, the F* fields following it belong to it; missing
+    optional fields get empty values instead of shifting the fields of other
+    positions (which zipping the per field lists does). A fee field repeated
+    before the next CG also starts a new position (ACS without CG).
+    @param  array response     Parsed Patron Information (64) or Fee Paid (38) response, or its ['variable']['Raw'] list
+    @throws ValueError if an amount is not a number
+    @return generator          FeePosition
+    """
+    fields   = response['variable']['Raw'] if isinstance(response, dict) else response
+    position = None
+    for item in fields:
+        name = _positionFields.get(item[:2])
+        if (name == None):
+            continue
+        if (position == None or name == 'feeId' or name in position):
+            if (position != None):
+                yield _position(position)
+            position = {}
+        position[name] = item[2:]
+    if (position != None):
+        yield _position(position)
+
+
+def fee_positions(response):
+    """ All fee positions of a Gossip response (@see iter_fee_positions)
+    @return list of FeePosition
+    """
+    return list(iter_fee_positions(response))
+
+
+def fee_totals(positions):
+    """ Sum up fee positions by cost type
+    @param  iterable positions FeePosition (e.g. the generator of iter_fee_positions)
+    @return dict               {'amount': Decimal, 'count': int, 'costTypes': {costType: {'description', 'amount', 'count'}}}
+    """
+    totals = {'amount': Decimal('0'), 'count': 0, 'costTypes': {}}
+    for position in positions:
+        costType = totals['costTypes'].get(position.costType)
+        if (costType == None):
+            costType = totals['costTypes'][position.costType] = {'description': position.costTypeDescription, 'amount': Decimal('0'), 'count': 0}
+        costType['amount'] += position.amount
+        costType['count']  += 1
+        totals['amount']   += position.amount
+        totals['count']    += 1
+    return totals
+
+
+def _position(values):
+    """ FeePosition from the raw field values of one position """
+    record = dict(_emptyPosition)
+    record.update(values)
+    if ('amount' in values):
+        record['amount'] = _decimal(values['amount'], 'FA')
+    if ('paid' in values):
+        record['paid']   = _decimal(values['paid'], 'FG')
+    if ('date' in values):
+        record['date']   = _date(values['date'])
+    return FeePosition(**record)
+
+
+def _decimal(value, field):
+    """ Decimal of an amount, the ACS always uses a dot as decimal separator """
+    try:
+        return Decimal(value.strip() or '0')
+    except InvalidOperation:
+        raise ValueError("Invalid amount in %s: '%s'" % (field, value)) from None
+
+
+def _date(value):
+    """ Date of a "dd.MM.yyyy" field, None if it is not one """
+    value = value.strip()
+    if (len(value) != 10 or value[2] != '.' or value[5] != '.'):
+        return None
+    try:
+        return datetime.date(int(value[6:10]), int(value[3:5]), int(value[0:2]))
+    except ValueError:
+        return None
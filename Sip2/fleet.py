@@ -0,0 +1,190 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from Sip2.wrapper import Sip2Wrapper
+
+
+class Fleet:
+    """ Parallel startup of many terminal accounts
+    Connects, logs in (93) and runs SC Status (99) for all terminals in the
+    background, with at most parallelism terminals starting at a time and
+    their starts spread by stagger seconds (no connection storm at the ACS).
+    start() returns at once. A terminal can be used as soon as it is ready
+    (wait(name)); status() reports the state of all terminals.
+
+    @example:
+        from Sip2.fleet import Fleet
+        fleet = Fleet({
+            'kiosk01': {'sip2Params': sip2Params, 'loginUserId': 'kiosk01', 'loginPassword': 'pass'},
+            'kiosk02': {'sip2Params': sip2Params, 'loginUserId': 'kiosk02', 'loginPassword': 'pass'},
+        }, parallelism = 16, stagger = 0.05)
+        fleet.start()
+        wrapper = fleet.wait('kiosk01', timeout = 30)
+        ...
+        print (fleet.status())
+        fleet.close()
+    """
+
+    def __init__(self, terminals, parallelism = 10, stagger = 0.0, version = 'Sip2', autoSelfCheck = True, retries = 1, wrapperOptions = {}):
+        """ Constructor
+        @param dict    terminals       Name => {'sip2Params', 'loginUserId', 'loginPassword'}
+        @param int     parallelism     Terminals starting at the same time
+        @param float   stagger         Seconds between the starts of two terminals
+        @param string  version         Either Sip2 (default) or Gossip
+        @param boolean autoSelfCheck   Do a SC Status (99) after the login
+        @param int     retries         Start attempts after a failed one (connection errors)
+        @param array   wrapperOptions  Additional keyword arguments for Sip2Wrapper (e.g. itemCache)
+        """
+        if (parallelism < 1):
+            raise ValueError("Fleet: parallelism must be at least 1: '%s'" % parallelism)
+
+        self.terminals      = dict(terminals)
+        # @var dict        Name => terminal configuration
+        self.parallelism    = parallelism
+        # @var int         Terminals starting at the same time
+        self.stagger        = stagger
+        # @var float       Seconds between two starts
+        self.version        = version
+        # @var string      Sip2 or Gossip
+        self.autoSelfCheck  = autoSelfCheck
+        # @var boolean     Do a SC Status after the login
+        self.retries        = retries
+        # @var int         Start attempts after a failed one
+        self.wrapperOptions = wrapperOptions
+        # @var array       Keyword arguments for new wrappers
+
+        self._state         = {name: {'state': 'pending', 'error': None, 'seconds': 0.0, 'attempts': 0} for name in self.terminals}
+        # @var dict        Name => readiness
+        self._wrappers      = {}
+        # @var dict        Name => ready Sip2Wrapper
+        self._events        = {name: threading.Event() for name in self.terminals}
+        # @var dict        Name => set when the terminal is ready or failed
+        self._lock          = threading.Lock()
+        # @var Lock        Guards _state and _wrappers
+        self._executor      = None
+        # @var ThreadPoolExecutor Runs the starts
+        self._futures       = {}
+        # @var dict        Name => Future of the start, cancelled by close()
+
+
+    def start(self, onReady = None):
+        """ Start all terminals in the background
+        @param callable onReady    Called with (name, wrapper) when a terminal is ready, (name, None) if it failed
+        """
+        if (self._executor != None):
+            raise RuntimeError('Fleet: already started')
+        self._executor = ThreadPoolExecutor(self.parallelism, thread_name_prefix = 'Sip2Fleet')
+        started = time.monotonic()
+        for position, name in enumerate(self.terminals):
+            self._futures[name] = self._executor.submit(self._start_terminal, name, started + position * self.stagger, onReady)
+
+
+    def wait(self, name, timeout = None):
+        """ Wait until a terminal is ready
+        @param  string name        Terminal name
+        @param  float  timeout     Seconds to wait (None = forever)
+        @throws TimeoutError if the terminal is not ready in time, ConnectionError if it failed
+        @return Sip2Wrapper
+        """
+        if (self._events[name].wait(timeout) == False):
+            raise TimeoutError("Fleet: terminal '%s' not ready within %s seconds" % (name, timeout))
+        with self._lock:
+            if (name not in self._wrappers):
+                raise ConnectionError("Fleet: terminal '%s' failed: %s" % (name, self._state[name]['error']))
+            return self._wrappers[name]
+
+
+    def wait_all(self, timeout = None):
+        """ Wait until all terminals are ready or failed
+        @param  float timeout      Seconds to wait (None = forever)
+        @return boolean            True if all terminals are finished (ready or failed)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for event in self._events.values():
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if (event.wait(remaining) == False):
+                return False
+        return True
+
+
+    def get(self, name):
+        """ A terminal if it is ready
+        @param  string name        Terminal name
+        @return Sip2Wrapper|None
+        """
+        with self._lock:
+            return self._wrappers.get(name)
+
+
+    def status(self):
+        """ Readiness of all terminals
+        @return dict   Name => {'state' (pending, starting, ready, failed), 'error', 'seconds', 'attempts'}
+        """
+        with self._lock:
+            return {name: dict(state) for name, state in self._state.items()}
+
+
+    def close(self):
+        """ Stop starting terminals and disconnect all. Terminals whose start
+        was not running yet fail (wait() raises a ConnectionError).
+        """
+        if (self._executor != None):
+            # starts not running yet are dropped, the running ones finish
+            for name, future in self._futures.items():
+                if future.cancel():
+                    with self._lock:
+                        self._state[name].update(state = 'failed', error = 'Fleet: closed before the start')
+                    self._events[name].set()
+            self._executor.shutdown(wait = True)
+        with self._lock:
+            wrappers, self._wrappers = list(self._wrappers.values()), {}
+        for wrapper in wrappers:
+            try:
+                wrapper.disconnect()
+            except OSError:
+                pass
+
+
+    def _start_terminal(self, name, notBefore, onReady):
+        """ Connect, login and check one terminal (worker thread) """
+        delay = notBefore - time.monotonic()
+        if (delay > 0):
+            time.sleep(delay)
+
+        terminal = self.terminals[name]
+        started  = time.monotonic()
+        wrapper  = None
+        with self._lock:
+            self._state[name]['state'] = 'starting'
+        for attempt in range(self.retries + 1):
+            with self._lock:
+                self._state[name]['attempts'] += 1
+            try:
+                wrapper = Sip2Wrapper(terminal.get('sip2Params', {}), False, self.version, **self.wrapperOptions)
+                if (wrapper.connect() == False):
+                    raise ConnectionError('Fleet: could not connect')
+                if (terminal.get('loginUserId') != None):
+                    wrapper.login_device(terminal['loginUserId'], terminal.get('loginPassword', ''), self.autoSelfCheck)
+                break
+            except (OSError, RuntimeError) as e:
+                with self._lock:
+                    self._state[name]['error'] = '%s: %s' % (type(e).__name__, e)
+                if (wrapper != None):
+                    try:
+                        wrapper.disconnect()
+                    except OSError:
+                        pass
+                wrapper = None
+
+        with self._lock:
+            self._state[name]['seconds'] = time.monotonic() - started
+            if (wrapper != None):
+                self._state[name]['state'] = 'ready'
+                self._state[name]['error'] = None
+                self._wrappers[name] = wrapper
+            else:
+                self._state[name]['state'] = 'failed'
+        self._events[name].set()
+        if (onReady != None):
+            onReady(name, wrapper)
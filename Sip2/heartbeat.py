@@ -0,0 +1,184 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+
+from Sip2.pool import Sip2Pool
+
+
+class Heartbeat:
+    """ Keep-alive for idle connections, one background thread per process
+    Firewalls silently drop idle connections. The heartbeat sends a SC Status
+    (99) on each registered connection that was idle for interval seconds,
+    so the connection stays open, and a dead one is found before a patron
+    needs it: it is reconnected right away (Sip2Wrapper.reconnect(), or
+    replaced by the pool).
+
+    Register wrappers or pools. Idle pooled connections are taken out of the
+    pool while checked. A single wrapper is only checked if its lock is free;
+    every request of the wrapper holds wrapper.lock, so a heartbeat never
+    interleaves with a request of the application. Checks are spread by a
+    random jitter, so a fleet of connections does not send all at once.
+
+    @example:
+        from Sip2.heartbeat import Heartbeat
+        heartbeat = Heartbeat(interval = 120, jitter = 0.2)
+        heartbeat.register(kioskWrapper)
+        heartbeat.register(pool)
+        ...
+        heartbeat.stop()
+    """
+
+    def __init__(self, interval = 60.0, jitter = 0.2, statusCode = 0):
+        """ Constructor
+        @param float interval      Idle seconds before a heartbeat is sent
+        @param float jitter        Random spread of the schedule (0.2 = +/- 20 %)
+        @param int   statusCode    Status code of the SC Status request (0 = ok)
+        """
+        if (interval <= 0 or jitter < 0 or jitter >= 1):
+            raise ValueError("Heartbeat: invalid interval or jitter: '%s', '%s'" % (interval, jitter))
+
+        self.interval       = interval
+        # @var float       Idle seconds before a heartbeat
+        self.jitter         = jitter
+        # @var float       Random spread of the schedule
+        self.statusCode     = statusCode
+        # @var int         Status code of the SC Status request
+
+        self._queue         = []
+        # @var list        Heap of (due, order, target)
+        self._targets       = set()
+        # @var set         Ids of the registered wrappers and pools
+        self._order         = itertools.count()
+        # @var count       Tie breaker for equal due times
+        self._stats         = {'sent': 0, 'failed': 0, 'reconnected': 0, 'skipped': 0}
+        # @var dict        Statistics
+        self._thread        = None
+        # @var Thread      Scheduler thread, started on first register()
+        self._stopped       = False
+        # @var boolean     Stop the scheduler thread
+        self._cond          = threading.Condition()
+        # @var Condition   Guards the state above, wakes the scheduler thread
+
+
+    def register(self, target):
+        """ Keep a wrapper or all connections of a pool alive
+        @param Sip2Wrapper|Sip2Pool target
+        """
+        with self._cond:
+            if (id(target) in self._targets):
+                return
+            self._targets.add(id(target))
+            heapq.heappush(self._queue, (self._due(), next(self._order), target))
+            if (self._thread == None):
+                self._stopped = False
+                self._thread  = threading.Thread(target = self._run, name = 'Sip2Heartbeat', daemon = True)
+                self._thread.start()
+            self._cond.notify()
+
+
+    def unregister(self, target):
+        """ Stop keeping a wrapper or pool alive
+        @param Sip2Wrapper|Sip2Pool target
+        """
+        with self._cond:
+            self._targets.discard(id(target))
+            self._queue = [entry for entry in self._queue if entry[2] is not target]
+            heapq.heapify(self._queue)
+
+
+    def stop(self):
+        """ Stop the scheduler thread """
+        with self._cond:
+            self._stopped = True
+            thread, self._thread = self._thread, None
+            self._cond.notify()
+        if (thread != None):
+            thread.join()
+
+
+    def stats(self):
+        """ Statistics
+        @return dict   {'sent', 'failed', 'reconnected', 'skipped'}
+        """
+        with self._cond:
+            return dict(self._stats)
+
+
+    def check(self, target):
+        """ Send heartbeats on the idle connections of a target now
+        @param Sip2Wrapper|Sip2Pool target
+        """
+        if isinstance(target, Sip2Pool):
+            target.expire_leases()
+            checked, replaced = target.check_idle(self.interval, self._beat)
+            self._count(sent = checked, failed = replaced, reconnected = replaced)
+            return
+
+        if (time.monotonic() - target._sip2._lastExchange < self.interval or target._connected == False):
+            return
+        if (target.lock.acquire(blocking = False) == False):
+            # in use, so it is not idle
+            self._count(skipped = 1)
+            return
+        try:
+            self._beat(target)
+            self._count(sent = 1)
+        except OSError:
+            self._count(sent = 1, failed = 1)
+            try:
+                target.reconnect()
+                self._count(reconnected = 1)
+            except (OSError, RuntimeError):
+                # try again next round
+                pass
+        finally:
+            target.lock.release()
+
+
+    def _beat(self, wrapper):
+        """ One heartbeat: SC Status on the socket of the wrapper itself.
+        Not sip_sc_status(), with a SingleFlight it might join a 99 in flight
+        on another connection and send nothing on this one.
+        """
+        with wrapper.lock:
+            msg = wrapper._sip2.sip_sc_status_request(self.statusCode)
+            wrapper._sip2.sip_sc_status_response(wrapper._sip2.get_response(msg))
+
+
+    def _run(self):
+        """ Scheduler thread """
+        with self._cond:
+            while (self._stopped == False):
+                if not self._queue:
+                    self._cond.wait()
+                    continue
+                due = self._queue[0][0]
+                now = time.monotonic()
+                if (due > now):
+                    self._cond.wait(due - now)
+                    continue
+                entry = heapq.heappop(self._queue)
+                self._cond.release()
+                try:
+                    self.check(entry[2])
+                except Exception:
+                    # never let one target stop the heartbeat of the others
+                    pass
+                finally:
+                    self._cond.acquire()
+                if (id(entry[2]) in self._targets):
+                    heapq.heappush(self._queue, (self._due(), next(self._order), entry[2]))
+
+
+    def _due(self):
+        """ Next check with jitter, twice per interval so no connection stays idle much longer """
+        return time.monotonic() + self.interval / 2.0 * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+    def _count(self, **counts):
+        """ Add to the statistics """
+        with self._cond:
+            for key, value in counts.items():
+                self._stats[key] += value
@@ -0,0 +1,166 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class Hedger:
+    """ Hedged read-only requests over the connections of a Sip2Pool
+    A request is sent on one pooled connection. If it has not been answered
+    after the delay (a percentile of the recent response times, e.g. p95),
+    the same request is sent again on a second connection. The first answer
+    wins; the other one is read to the end on its connection and dropped, so
+    both connections stay in sync.
+
+    Only use it for idempotent requests: Item Information (17), Patron
+    Information (63, also covers patron status) and SC Status (99). Hedges
+    are limited by a budget, a fraction of all requests (default 5 %), so a
+    slow ACS does not get twice the load.
+
+    @example:
+        from Sip2.hedge import Hedger
+        hedger = Hedger(pool, percentile = 95, budget = 0.05)
+        info   = hedger.item_information('itemBarcode')
+        print (hedger.stats())
+    """
+
+    def __init__(self, pool, percentile = 95, minDelay = 0.05, maxDelay = 2.0, budget = 0.05, window = 200):
+        """ Constructor
+        @param Sip2Pool pool       Connections to use (at least 2 for hedging)
+        @param float    percentile Response time percentile after which to hedge
+        @param float    minDelay   Lower bound of the hedge delay (seconds)
+        @param float    maxDelay   Upper bound, also used until there are enough samples
+        @param float    budget     Hedges allowed per request (0.05 = 5 %)
+        @param int      window     Number of recent response times to keep
+        """
+        if (percentile <= 0 or percentile > 100):
+            raise ValueError("Hedger: invalid percentile: '%s'" % percentile)
+
+        self.pool           = pool
+        # @var Sip2Pool    Connections to use
+        self.percentile     = percentile
+        # @var float       Response time percentile after which to hedge
+        self.minDelay       = minDelay
+        # @var float       Lower bound of the hedge delay
+        self.maxDelay       = maxDelay
+        # @var float       Upper bound of the hedge delay
+        self.budget         = budget
+        # @var float       Hedges allowed per request
+
+        self._samples       = deque(maxlen = window)
+        # @var deque       Recent response times
+        self._credit        = 1.0
+        # @var float       Hedges currently allowed (grows by budget per request)
+        self._stats         = {'requests': 0, 'hedged': 0, 'hedgeWins': 0, 'budgetDenied': 0}
+        # @var dict        Statistics
+        self._lock          = threading.Lock()
+        # @var Lock        Guards the state above
+        self._executor      = ThreadPoolExecutor(max(2, pool.size))
+        # @var ThreadPoolExecutor Runs the attempts
+
+
+    def call(self, fn, *args):
+        """ Run fn(wrapper, *args) on a pooled connection, hedged
+        @param  callable fn        Idempotent request, called with a wrapper first
+        @return mixed              Result of the first attempt that answers
+        """
+        with self._lock:
+            self._stats['requests'] += 1
+            self._credit = min(10.0, self._credit + self.budget)
+        delay = self.delay()
+
+        first = self._executor.submit(self._attempt, fn, args)
+        done, pending = wait([first], timeout = delay)
+        if done:
+            return first.result()[1]
+
+        if (self.pool.size < 2 or self._take_credit() == False):
+            return first.result()[1]
+
+        second = self._executor.submit(self._attempt, fn, args)
+        attempts = [first, second]
+        error = None
+        while attempts:
+            done, pending = wait(attempts, return_when = FIRST_COMPLETED)
+            for future in done:
+                attempts.remove(future)
+                try:
+                    result = future.result()[1]
+                except Exception as e:
+                    error = e if error is None else error
+                    continue
+                if (future is second):
+                    with self._lock:
+                        self._stats['hedgeWins'] += 1
+                return result
+        raise error
+
+
+    def item_information(self, itemIdentifier):
+        """ Hedged Item Information (17/18), @see Sip2Wrapper.sip_item_information """
+        return self.call(lambda wrapper: wrapper.sip_item_information(itemIdentifier))
+
+
+    def patron_information(self, patron, patronpwd = '', infoType = 'none', startItem = '1', endItem = '5'):
+        """ Hedged Patron Information (63/64) for the given patron credentials
+        @see Sip2Wrapper._fetch_patron_information
+        """
+        return self.call(lambda wrapper: wrapper._fetch_patron_information(patron, patronpwd, infoType, startItem, endItem))
+
+
+    def sc_status(self):
+        """ Hedged SC Status (99/98), @see Sip2Wrapper.sip_sc_status """
+        return self.call(lambda wrapper: wrapper.sip_sc_status())
+
+
+    def delay(self):
+        """ Current hedge delay: the percentile of the recent response times
+        @return float              Seconds
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if (len(samples) < 20):
+            return self.maxDelay
+        index = min(len(samples) - 1, int(len(samples) * self.percentile / 100.0))
+        return min(self.maxDelay, max(self.minDelay, samples[index]))
+
+
+    def stats(self):
+        """ Statistics
+        @return dict   {'requests', 'hedged', 'hedgeWins', 'budgetDenied', 'delay'}
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats['delay'] = self.delay()
+        return stats
+
+
+    def close(self):
+        """ Wait for running attempts and stop the worker threads """
+        self._executor.shutdown(wait = True)
+
+
+    def _attempt(self, fn, args):
+        """ One attempt on a pooled connection, records the response time
+        @return tuple              (seconds, result)
+        """
+        started = time.monotonic()
+        with self.pool.connection() as wrapper:
+            result = fn(wrapper, *args)
+        seconds = time.monotonic() - started
+        with self._lock:
+            self._samples.append(seconds)
+        return (seconds, result)
+
+
+    def _take_credit(self):
+        """ Use one hedge of the budget
+        @return boolean            False if the budget is used up
+        """
+        with self._lock:
+            if (self._credit < 1.0):
+                self._stats['budgetDenied'] += 1
+                return False
+            self._credit -= 1.0
+            self._stats['hedged'] += 1
+            return True
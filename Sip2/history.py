@@ -0,0 +1,164 @@
+import datetime
+import re
+import threading
+from collections import deque
+
+
+_responseParsers = {
+    '10': 'sip_checkin_response',           '12': 'sip_checkout_response',
+    '16': 'sip_hold_response',              '18': 'sip_item_information_response',
+    '20': 'sip_item_status_update_response', '24': 'sip_patron_status_response',
+    '26': 'sip_patron_enable_response',     '30': 'sip_renew_response',
+    '36': 'sip_end_patron_session_response', '38': 'sip_fee_paid_response',
+    '64': 'sip_patron_information_response', '66': 'sip_renew_all_response',
+    '94': 'sip_login_response',             '98': 'sip_sc_status_response',
+}
+# @var dict Response code => Sip2 parser method
+
+_secretFields = re.compile(r'(\|(?:AC|AD|CO))([^|]*)')
+# @var regex  Password fields (terminal, patron, login) masked in dumps
+
+_parsers = {}
+# @var dict Sip2 class => parser instance, shared for lazy parsing
+_parsersLock = threading.Lock()
+
+
+class Exchange:
+    """ One request/response pair as sent and received, parsed on demand """
+
+    __slots__ = ('request', 'response', 'started', 'seconds', 'error', '_parserClass', '_parsed')
+
+    def __init__(self, request, response, started, seconds, error, parserClass):
+        """ Constructor
+        @param bytes  request      Request as sent
+        @param bytes  response     Response as received (b'' if none)
+        @param float  started      time.time() of the request
+        @param float  seconds      Time until the response (or the error)
+        @param string error        Error, None if a response arrived
+        @param class  parserClass  Sip2 or Gossip, used by parsed
+        """
+        self.request        = request
+        # @var bytes       Request as sent
+        self.response       = response
+        # @var bytes       Response as received
+        self.started        = started
+        # @var float       time.time() of the request
+        self.seconds        = seconds
+        # @var float       Time until the response or the error
+        self.error          = error
+        # @var string      Error, None if a response arrived
+        self._parserClass   = parserClass
+        # @var class       Class of the connection
+        self._parsed        = None
+        # @var array       Parsed response (cached)
+
+
+    @property
+    def parsed(self):
+        """ The parsed response, None if there is none or its code is unknown
+        @return array
+        """
+        if (self._parsed == None and self.response != b''):
+            text   = self.response.decode('utf-8', errors = 'replace')
+            method = _responseParsers.get(text[:2])
+            if (method != None):
+                self._parsed = getattr(_parser(self._parserClass), method)(text)
+        return self._parsed
+
+
+    def as_dict(self, parse = False):
+        """ The exchange for a crash report, passwords masked
+        @param  boolean parse      Include the parsed response
+        @return dict               {'started', 'seconds', 'request', 'response', 'error'(, 'parsed')}
+        """
+        result = {
+            'started':  datetime.datetime.fromtimestamp(self.started).isoformat(),
+            'seconds':  round(self.seconds, 4),
+            'request':  _mask(self.request.decode('utf-8', errors = 'replace')),
+            'response': _mask(self.response.decode('utf-8', errors = 'replace')),
+            'error':    self.error
+        }
+        if parse:
+            result['parsed'] = self.parsed
+        return result
+
+
+class ExchangeHistory:
+    """ Ring buffer of the last exchanges of a connection
+    Set historySize in the sip2Params to keep the last N exchanges (raw bytes
+    and timing) of each connection; 0 (default) keeps nothing. Parsing only
+    happens on inspection. Failed exchanges (timeouts, lost connections) are
+    recorded too.
+
+    @example:
+        wrapper = Sip2Wrapper(dict(sip2Params, historySize = 20, retainLast = False))
+        try:
+            ...
+        except OSError:
+            log.error('%s', wrapper.dump_history())
+    """
+
+    def __init__(self, size):
+        """ Constructor
+        @param int size            Number of exchanges to keep
+        """
+        self._exchanges     = deque(maxlen = size)
+        # @var deque       Exchanges, oldest first
+
+
+    @property
+    def size(self):
+        """ Number of exchanges kept """
+        return self._exchanges.maxlen
+
+
+    def record(self, request, response, started, seconds, error, parserClass):
+        """ Add an exchange, dropping the oldest one if full (@see Exchange) """
+        self._exchanges.append(Exchange(request, response, started, seconds, error, parserClass))
+
+
+    def exchanges(self):
+        """ The kept exchanges, oldest first
+        @return list of Exchange
+        """
+        return list(self._exchanges)
+
+
+    def dump(self, parse = False):
+        """ The kept exchanges for a crash report, passwords masked
+        @param  boolean parse      Include the parsed responses
+        @return list of dict       @see Exchange.as_dict
+        """
+        return [exchange.as_dict(parse) for exchange in list(self._exchanges)]
+
+
+    def dumps(self):
+        """ The kept exchanges as text, one block per exchange, passwords masked
+        @return string
+        """
+        lines = []
+        for exchange in self.dump():
+            lines.append('%(started)s  %(seconds).4fs' % exchange + ('  ERROR: %s' % exchange['error'] if exchange['error'] else ''))
+            lines.append('  > ' + exchange['request'].rstrip('\r\n'))
+            lines.append('  < ' + exchange['response'].rstrip('\r\n'))
+        return '\n'.join(lines)
+
+
+    def clear(self):
+        """ Forget all exchanges """
+        self._exchanges.clear()
+
+
+def _mask(message):
+    """ Mask the password fields of a message """
+    return _secretFields.sub(lambda match: match.group(1) + ('***' if match.group(2) != '' else ''), message)
+
+
+def _parser(parserClass):
+    """ A shared instance of parserClass for parsing only (never connected) """
+    with _parsersLock:
+        if (parserClass not in _parsers):
+            parser = parserClass()
+            parser.retainLast = False
+            _parsers[parserClass] = parser
+        return _parsers[parserClass]
@@ -0,0 +1,246 @@
+""" Inventory / shelf reading: Item Information (17/18) for long barcode lists
+
+Streams barcodes (CSV, first column, or one per line) through a Sip2Pool with
+bounded concurrency and writes circulation status, permanent location (AQ),
+title (AJ) and due date (AH) as CSV or NDJSON, in input order. A checkpoint
+file records how many barcodes are written, so an interrupted run continues
+where it left off (output is appended, the CSV header only starts a new
+file). Rows written after the last checkpoint may appear twice after a crash.
+The CLI writes nothing but the rows to stdout, messages go to stderr.
+
+@example API:
+    from Sip2.pool import Sip2Pool
+    from Sip2.inventory import Inventory, read_barcodes
+    pool = Sip2Pool(sip2Params, size = 8, loginUserId = 'user', loginPassword = 'pass')
+    with open('scans.csv', newline = '') as scans, open('result.csv', 'a', newline = '') as out:
+        report = Inventory(pool, checkpointPath = 'result.ckpt').run(read_barcodes(scans), out)
+
+@example CLI:
+    python -m Sip2.inventory --host my-asc.ils.net --login user --password pass \\
+        --institution 'My Test Institute' --input scans.csv --output result.ndjson \\
+        --format ndjson --checkpoint result.ckpt --concurrency 8
+"""
+import argparse
+import contextlib
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Inventory:
+    """ Batch job running Item Information for a stream of barcodes """
+
+    columns = ('item', 'circulationStatus', 'permanentLocation', 'title', 'dueDate', 'error')
+    # @var tuple       Output columns
+
+    def __init__(self, pool, concurrency = None, checkpointPath = None, checkpointEvery = 100, retries = 1):
+        """ Constructor
+        @param Sip2Pool pool           Connections to use
+        @param int      concurrency    Requests in flight (default: pool size)
+        @param string   checkpointPath File recording the number of barcodes written (None: no resume)
+        @param int      checkpointEvery Write the checkpoint every n barcodes
+        @param int      retries        Resends after a connection error
+        """
+        self.pool           = pool
+        # @var Sip2Pool    Connections to use
+        self.concurrency    = pool.size if concurrency is None else concurrency
+        # @var int         Requests in flight
+        self.checkpointPath = checkpointPath
+        # @var string      Checkpoint file
+        self.checkpointEvery = checkpointEvery
+        # @var int         Checkpoint interval (barcodes)
+        self.retries        = retries
+        # @var int         Resends after a connection error
+
+
+    def lookup(self, itemIdentifier):
+        """ Item Information for one barcode, reduced to the output columns
+        @param  string itemIdentifier  the barcode
+        @return dict                   one output row
+        """
+        row = dict.fromkeys(self.columns, '')
+        row['item'] = itemIdentifier
+        for attempt in range(self.retries + 1):
+            try:
+                with self.pool.connection() as wrapper:
+                    info = wrapper.sip_item_information(itemIdentifier)
+                if (info == False):
+                    row['error'] = 'Item Information not supported by ACS'
+                else:
+                    row['circulationStatus'] = info['fixed']['CirculationStatus']
+                    row['permanentLocation'] = info['variable'].get('AQ', [''])[0]
+                    row['title']             = info['variable'].get('AJ', [''])[0]
+                    row['dueDate']           = info['variable'].get('AH', [''])[0]
+                    row['error']             = ''
+                break
+            except OSError as e:
+                row['error'] = '%s: %s' % (type(e).__name__, e)
+        return row
+
+
+    def run(self, barcodes, output, outputFormat = 'csv'):
+        """ Look up all barcodes and write one row each to output
+        @param  iterable barcodes      Barcodes (strings)
+        @param  file     output        Text file to write to (opened for appending when resuming)
+        @param  string   outputFormat  csv or ndjson
+        @return dict                   {'items', 'skipped', 'failed', 'seconds', 'itemsPerHour'}
+        """
+        if (outputFormat not in ('csv', 'ndjson')):
+            raise ValueError("Inventory: invalid output format: '%s'" % outputFormat)
+
+        done   = self._checkpoint_read()
+        report = {'items': 0, 'skipped': done, 'failed': 0, 'seconds': 0.0, 'itemsPerHour': 0.0}
+
+        if (outputFormat == 'csv'):
+            writer = csv.DictWriter(output, fieldnames = self.columns)
+            if self._new_output(output, done):
+                writer.writeheader()
+            write = writer.writerow
+        else:
+            write = lambda row: output.write(json.dumps(row) + '\n')
+
+        def finish(future):
+            nonlocal done
+            row = future.result()
+            write(row)
+            done += 1
+            report['items'] += 1
+            if (row['error'] != ''):
+                report['failed'] += 1
+            if (done % self.checkpointEvery == 0):
+                self._checkpoint_write(output, done)
+
+        started = time.monotonic()
+        inFlight = deque()
+        with ThreadPoolExecutor(self.concurrency) as executor:
+            for position, itemIdentifier in enumerate(barcodes):
+                if (position < report['skipped']):
+                    continue
+                inFlight.append(executor.submit(self.lookup, itemIdentifier))
+                # keep order and a bounded number of requests in flight
+                while (len(inFlight) >= self.concurrency or inFlight[0].done()):
+                    finish(inFlight.popleft())
+                    if not inFlight:
+                        break
+            while inFlight:
+                finish(inFlight.popleft())
+
+        self._checkpoint_write(output, done)
+        report['seconds'] = time.monotonic() - started
+        if (report['seconds'] > 0):
+            report['itemsPerHour'] = report['items'] * 3600 / report['seconds']
+        return report
+
+
+    def _new_output(self, output, done):
+        """ Whether output gets its first row, i.e. needs a CSV header
+        @param  file output        The output file
+        @param  int  done          Number of barcodes written by a previous run
+        @return boolean
+        """
+        try:
+            return output.tell() == 0
+        except (OSError, ValueError):
+            # pipe or terminal, only a new run starts a new file
+            return done == 0
+
+
+    def _checkpoint_read(self):
+        """ Number of barcodes written by a previous run
+        @return int
+        """
+        if (self.checkpointPath == None or os.path.exists(self.checkpointPath) == False):
+            return 0
+        with open(self.checkpointPath) as checkpoint:
+            return int(json.load(checkpoint)['done'])
+
+
+    def _checkpoint_write(self, output, done):
+        """ Flush the output, then atomically replace the checkpoint file
+        @param file output     The output file
+        @param int  done       Number of barcodes written
+        """
+        output.flush()
+        if (self.checkpointPath == None):
+            return
+        try:
+            os.fsync(output.fileno())
+        except (OSError, ValueError):
+            # not a real file (stdout, StringIO)
+            pass
+        temp = self.checkpointPath + '.tmp'
+        with open(temp, 'w') as checkpoint:
+            json.dump({'done': done}, checkpoint)
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+        os.replace(temp, self.checkpointPath)
+
+
+def read_barcodes(stream, skipHeader = False):
+    """ Yield barcodes from a CSV stream (first column) or a plain list, one per line
+    @param  file    stream         Text stream (file, sys.stdin)
+    @param  boolean skipHeader     Ignore the first row
+    @return generator              Barcodes (strings)
+    """
+    for number, row in enumerate(csv.reader(stream)):
+        if (number == 0 and skipHeader):
+            continue
+        if (row and row[0].strip() != ''):
+            yield row[0].strip()
+
+
+def main(argv = None):
+    """ Command line interface, @see module documentation """
+    parser = argparse.ArgumentParser(prog = 'python -m Sip2.inventory', description = 'Item Information (17/18) for a list of barcodes')
+    parser.add_argument('--host', required = True, help = 'ACS host name')
+    parser.add_argument('--port', type = int, default = 1294, help = 'ACS port (default 1294)')
+    parser.add_argument('--no-tls', action = 'store_true', help = 'Use an unencrypted connection')
+    parser.add_argument('--gossip', action = 'store_true', help = 'Use the Gossip variant')
+    parser.add_argument('--institution', default = '', help = 'Institution id (AO)')
+    parser.add_argument('--location', default = '', help = 'SC location (CP)')
+    parser.add_argument('--login', help = 'Device login (93)')
+    parser.add_argument('--password', default = '', help = 'Device password')
+    parser.add_argument('--input', default = '-', help = 'CSV file with barcodes in the first column, - for stdin')
+    parser.add_argument('--skip-header', action = 'store_true', help = 'Ignore the first input row')
+    parser.add_argument('--output', default = '-', help = 'Output file, - for stdout')
+    parser.add_argument('--format', choices = ('csv', 'ndjson'), default = 'csv', help = 'Output format')
+    parser.add_argument('--checkpoint', help = 'Checkpoint file to resume interrupted runs')
+    parser.add_argument('--concurrency', type = int, default = 4, help = 'Requests in flight (default 4)')
+    parser.add_argument('--logfile-path', default = '', help = 'Directory for sip2.log')
+    args = parser.parse_args(argv)
+
+    from Sip2.pool import Sip2Pool
+    sip2Params = {
+        'hostName':     args.host,
+        'hostPort':     args.port,
+        'tlsEnable':    not args.no_tls,
+        'institutionId': args.institution,
+        'logfile_path': args.logfile_path,
+        'loglevel':     'WARNING',
+    }
+    if (args.location != ''):
+        sip2Params['scLocation'] = args.location
+
+    pool      = Sip2Pool(sip2Params, args.concurrency, 'Gossip' if args.gossip else 'Sip2', args.login, args.password)
+    inventory = Inventory(pool, checkpointPath = args.checkpoint)
+    source    = sys.stdin if args.input == '-' else open(args.input, newline = '')
+    target    = sys.stdout if args.output == '-' else open(args.output, 'a', newline = '')
+    # stdout is the data stream, the messages of the wrappers go to stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            report = inventory.run(read_barcodes(source, args.skip_header), target, args.format)
+        finally:
+            pool.close()
+            if (source is not sys.stdin): source.close()
+            if (target is not sys.stdout): target.close()
+
+    sys.stderr.write('%(items)s items (%(skipped)s skipped from checkpoint), %(failed)s failed, %(itemsPerHour).0f items/hour\n' % report)
+    return 0 if report['failed'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+import json
+import os
+import threading
+import time
+import zlib
+
+
+class Journal:
+    """ Durable append-only journal of JSON records
+    Each record is one line "<crc32 hex> <json>". A crash in the middle of a
+    write leaves at most one torn line at the end; it fails the checksum and
+    is cut off when the journal is opened again, so all records before it
+    survive.
+
+    append() returns after the record is on disk (fsync). Concurrent appends
+    share fsyncs (group commit): while one thread syncs, others queue up and
+    are covered by the next single fsync. syncDelay lets the syncing thread
+    wait a little for more records, trading latency for throughput.
+
+    Used by the offline transaction queue (@see Sip2.offline) and the fee
+    payment journal (@see Sip2.payments).
+    """
+
+    def __init__(self, path, syncDelay = 0.0):
+        """ Constructor, opens (and repairs) the journal file
+        @param string path         Journal file, created if missing
+        @param float  syncDelay    Seconds to gather more records before an fsync
+        """
+        self.path           = path
+        # @var string      Journal file
+        self.syncDelay      = syncDelay
+        # @var float       Seconds to gather more records before an fsync
+        self.syncs          = 0
+        # @var int         Number of fsyncs done (statistics)
+
+        self._records       = self._load()
+        # @var list        Records found when opening the file
+        self._file          = open(path, 'a', encoding = 'utf-8')
+        # @var file        Journal file, opened for appending
+        self._lock          = threading.Lock()
+        # @var Lock        Serializes writes
+        self._syncLock      = threading.Lock()
+        # @var Lock        Only one fsync at a time
+        self._written       = 0
+        # @var int         Number of records written since opening
+        self._synced        = 0
+        # @var int         Number of records known to be on disk
+
+
+    def records(self):
+        """ Records that were in the file when it was opened, oldest first
+        @return list
+        """
+        return list(self._records)
+
+
+    def append(self, record, durable = True):
+        """ Append a record
+        @param  dict    record     JSON serializable record
+        @param  boolean durable    Wait until the record is on disk
+        """
+        data = json.dumps(record, separators = (',', ':'))
+        line = '%08x %s\n' % (zlib.crc32(data.encode('utf-8')), data)
+        with self._lock:
+            self._file.write(line)
+            self._written += 1
+            ticket = self._written
+
+        if durable:
+            self._sync(ticket)
+
+
+    def sync(self):
+        """ Make sure all appended records are on disk """
+        with self._lock:
+            ticket = self._written
+        self._sync(ticket)
+
+
+    def rewrite(self, records):
+        """ Atomically replace the journal content, e.g. to drop finished records
+        @param list records        Records to keep
+        """
+        with self._syncLock, self._lock:
+            temp = self.path + '.tmp'
+            with open(temp, 'w', encoding = 'utf-8') as target:
+                for record in records:
+                    data = json.dumps(record, separators = (',', ':'))
+                    target.write('%08x %s\n' % (zlib.crc32(data.encode('utf-8')), data))
+                target.flush()
+                os.fsync(target.fileno())
+            self._file.close()
+            os.replace(temp, self.path)
+            self._file    = open(self.path, 'a', encoding = 'utf-8')
+            self._records = list(records)
+            self._written = 0
+            self._synced  = 0
+
+
+    def close(self):
+        """ Sync and close the file """
+        self.sync()
+        with self._lock:
+            self._file.close()
+
+
+    def _sync(self, ticket):
+        """ fsync unless another thread's fsync already covered record number ticket """
+        with self._syncLock:
+            if (self._synced >= ticket):
+                return
+            if (self.syncDelay > 0):
+                time.sleep(self.syncDelay)
+            with self._lock:
+                self._file.flush()
+                covered = self._written
+            os.fsync(self._file.fileno())
+            self._synced = covered
+            self.syncs += 1
+
+
+    def _load(self):
+        """ Read all valid records, cut off a torn or corrupt tail
+        @return list
+        """
+        records = []
+        if (os.path.exists(self.path) == False):
+            return records
+
+        valid = 0
+        with open(self.path, 'rb') as source:
+            for line in source:
+                try:
+                    checksum, data = line.rstrip(b'\n').split(b' ', 1)
+                    if (line.endswith(b'\n') == False or int(checksum, 16) != zlib.crc32(data)):
+                        break
+                    records.append(json.loads(data.decode('utf-8')))
+                except ValueError:
+                    break
+                valid += len(line)
+
+        if (valid < os.path.getsize(self.path)):
+            with open(self.path, 'r+b') as source:
+                source.truncate(valid)
+                source.flush()
+                os.fsync(source.fileno())
+        return records
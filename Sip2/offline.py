@@ -0,0 +1,147 @@
+import datetime
+import itertools
+import threading
+import time
+
+from Sip2.journal import Journal
+from Sip2.ratelimit import TokenBucket
+
+
+class OfflineQueue:
+    """ Store-and-forward queue for checkouts and checkins while the ACS is unreachable
+    If a Sip2Wrapper has an OfflineQueue and the ACS allows offline operation
+    (OfflineOk in the SC Status response, or no SC Status known), a checkout
+    or checkin that fails with a connection error is written to a durable
+    journal (@see Sip2.journal) and answered with a synthetic "ok" response
+    carrying the key 'offline'. The kiosk keeps circulating.
+
+    When the ACS is back, replay() sends the recorded transactions in their
+    original order with "no block" set to Y (as the protocol defines for
+    transactions done offline), at a limited rate so the catch-up does not
+    flood the ACS. Each response is reconciled in the journal; transactions
+    the ACS rejected are returned so staff can follow up. Finished entries
+    are dropped from the journal once nothing is pending anymore.
+
+    @note Patron passwords are not written to the journal. The optional AD
+          field is left empty on replay.
+
+    @example:
+        from Sip2.offline import OfflineQueue
+        queue   = OfflineQueue('/var/lib/sc/offline.journal')
+        wrapper = Sip2Wrapper(sip2Params, False, 'Sip2', offlineQueue = queue)
+        ...
+        # later, when the ACS is reachable again
+        wrapper.connect()
+        wrapper.login_device('user', 'pass')
+        report = wrapper.replay_offline(rate = 2)
+    """
+
+    def __init__(self, path, syncDelay = 0.0):
+        """ Constructor, opens the journal and restores pending transactions
+        @param string path         Journal file
+        @param float  syncDelay    Seconds to batch journal fsyncs (@see Journal)
+        """
+        self._journal       = Journal(path, syncDelay)
+        # @var Journal     Durable storage
+        self._pending       = []
+        # @var list        Transactions not yet reconciled, oldest first
+        self._lock          = threading.Lock()
+        # @var Lock        Guards _pending and the id counter
+
+        done = set()
+        for record in self._journal.records():
+            if (record['type'] == 'done'):
+                done.add(record['id'])
+        self._pending = [record for record in self._journal.records() if record['type'] == 'txn' and record['id'] not in done]
+        lastId = max([record['id'] for record in self._journal.records()], default = 0)
+        self._ids = itertools.count(lastId + 1)
+        # @var count       Transaction id generator
+
+
+    def pending(self):
+        """ Transactions waiting for replay, oldest first
+        @return list       Journal records {'id', 'op', 'item', 'patron', 'time'}
+        """
+        with self._lock:
+            return list(self._pending)
+
+
+    def record_checkout(self, patron, itemIdentifier):
+        """ Record a checkout done offline
+        @param  string patron          Patron identifier (AA)
+        @param  string itemIdentifier  Item identifier (AB)
+        @return array                  Synthetic checkout response (key 'offline' holds the transaction id)
+        """
+        record = self._record('checkout', itemIdentifier, patron)
+        return self._response(record, {'Ok': '1', 'RenewalOk': 'N', 'MagneticMedia': 'U', 'Desensitize': 'Y'})
+
+
+    def record_checkin(self, itemIdentifier):
+        """ Record a checkin done offline
+        @param  string itemIdentifier  Item identifier (AB)
+        @return array                  Synthetic checkin response (key 'offline' holds the transaction id)
+        """
+        record = self._record('checkin', itemIdentifier, '')
+        return self._response(record, {'Ok': '1', 'Resensitize': 'Y', 'MagneticMedia': 'U', 'Alert': 'N'})
+
+
+    def replay(self, wrapper, rate = 2.0):
+        """ Send pending transactions to the ACS in order and reconcile the responses
+        Stops at the first connection error; the rest stays pending.
+        @param  Sip2Wrapper wrapper    A connected (and logged in) wrapper
+        @param  float       rate       Maximum transactions per second
+        @return dict       {'sent', 'accepted', 'rejected', 'remaining', 'error'}
+                           rejected: list of (record, parsed response)
+        """
+        bucket = TokenBucket(rate, 1)
+        report = {'sent': 0, 'accepted': 0, 'rejected': [], 'remaining': 0, 'error': None}
+        for record in self.pending():
+            bucket.acquire()
+            try:
+                if (record['op'] == 'checkout'):
+                    info = wrapper._checkout_for(record['patron'], '', record['item'], 'N', 'Y')
+                else:
+                    # never through sip_item_checkin(): it would queue the checkin again
+                    info = wrapper._checkin_raw(record['item'], record['time'], noBlock = 'Y')
+            except OSError as e:
+                report['error'] = '%s: %s' % (type(e).__name__, e)
+                break
+
+            report['sent'] += 1
+            accepted = (info != False and info['fixed']['Ok'] == '1')
+            if accepted:
+                report['accepted'] += 1
+            else:
+                report['rejected'].append((record, info))
+            message = '' if info == False else info['variable'].get('AF', [''])[0]
+            self._journal.append({'type': 'done', 'id': record['id'], 'ok': accepted, 'message': message}, False)
+            with self._lock:
+                self._pending.remove(record)
+
+        self._journal.sync()
+        with self._lock:
+            report['remaining'] = len(self._pending)
+            if (report['remaining'] == 0):
+                self._journal.rewrite([])
+        return report
+
+
+    def close(self):
+        """ Close the journal """
+        self._journal.close()
+
+
+    def _record(self, op, itemIdentifier, patron):
+        """ Write a transaction to the journal (durable before returning) """
+        with self._lock:
+            record = {'type': 'txn', 'id': next(self._ids), 'op': op, 'item': itemIdentifier,
+                      'patron': patron, 'time': int(time.time())}
+            self._pending.append(record)
+        self._journal.append(record)
+        return record
+
+
+    def _response(self, record, fixed):
+        """ Build a synthetic response for an offline transaction """
+        fixed['TransactionDate'] = datetime.datetime.fromtimestamp(record['time']).strftime('%Y%m%d    %H%M%S')
+        return {'fixed': fixed, 'variable': {'AB': [record['item']], 'AA': [record['patron']]}, 'offline': record['id']}
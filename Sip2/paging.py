@@ -0,0 +1,108 @@
+import threading
+
+
+class PageSizer:
+    """ Adaptive BP/BQ window sizing for Sip2Wrapper.iter_patron_items()
+    Small windows cost round trips, big windows produce frames that some ACSes
+    truncate. The sizer learns per ACS (host, port) how long an item field
+    and the rest of a Patron Information response (64) are on average and
+    picks the largest window that stays below maxFrameSize. The first window
+    is initialSize, later ones never exceed the number of items left (known
+    from the count in the fixed part of the first response).
+
+    If a response comes back truncated (fewer items than requested although
+    the count says there are more) or fails the CRC check, the window that
+    caused it becomes an upper limit for that ACS and is halved.
+
+    Share one instance between wrappers talking to the same ACSes.
+
+    @example:
+        from Sip2.paging import PageSizer
+        sizer = PageSizer(maxFrameSize = 2048)
+        for itemId in wrapper.iter_patron_items('charged', pageSizer = sizer):
+            print(itemId)
+    """
+
+    def __init__(self, maxFrameSize = 4096, initialSize = 5, minSize = 1, maxSize = 100, smoothing = 0.2):
+        """ Constructor
+        @param int   maxFrameSize  Target maximum response size in characters
+        @param int   initialSize   Window for an ACS without observations
+        @param int   minSize       Smallest window
+        @param int   maxSize       Largest window
+        @param float smoothing     Weight of a new observation in the moving averages (0-1)
+        """
+        if (minSize < 1 or maxSize < minSize):
+            raise ValueError("PageSizer: invalid window limits: '%s' - '%s'" % (minSize, maxSize))
+
+        self.maxFrameSize   = maxFrameSize
+        # @var int         Target maximum response size in characters
+        self.initialSize    = max(minSize, min(initialSize, maxSize))
+        # @var int         Window for an ACS without observations
+        self.minSize        = minSize
+        # @var int         Smallest window
+        self.maxSize        = maxSize
+        # @var int         Largest window
+        self.smoothing      = smoothing
+        # @var float       Weight of a new observation in the moving averages
+
+        self._stats         = {}
+        # @var dict        acs => [average item length, average overhead, window limit]
+        self._lock          = threading.Lock()
+        # @var Lock        Guards _stats
+
+
+    def window(self, acs, remaining = None):
+        """ Return the window size for the next request
+        @param  tuple acs          (hostName, hostPort)
+        @param  int   remaining    Items left to fetch, None if unknown
+        @return int                Number of items to request
+        """
+        with self._lock:
+            stats = self._stats.get(acs)
+            if (stats == None or stats[0] == None):
+                size = self.initialSize if stats == None else min(self.initialSize, stats[2])
+            else:
+                itemLength, overhead, limit = stats
+                size = int((self.maxFrameSize - overhead) // max(itemLength, 1))
+                size = min(size, limit)
+
+        size = max(self.minSize, min(size, self.maxSize))
+        if (remaining != None):
+            size = max(1, min(size, remaining))
+        return size
+
+
+    def observe(self, acs, info, field):
+        """ Learn item and overhead length from a complete Patron Information response
+        @param tuple  acs          (hostName, hostPort)
+        @param array  info         Parsed Patron Information response
+        @param string field        Item field of the requested category (e.g. AU)
+        """
+        # fixed part (61) + each raw field with its terminator + checksum
+        items    = info['variable'].get(field, [])
+        frame    = 61 + sum(len(raw) + 1 for raw in info['variable']['Raw']) + 6
+        itemsLen = sum(len(item) + 3 for item in items)
+        with self._lock:
+            stats = self._stats.setdefault(acs, [None, None, self.maxSize])
+            stats[1] = self._average(stats[1], frame - itemsLen)
+            if items:
+                stats[0] = self._average(stats[0], itemsLen / len(items))
+
+
+    def shrink(self, acs, size):
+        """ Register a truncated or corrupt response for a window size
+        @param  tuple acs          (hostName, hostPort)
+        @param  int   size         The window that failed
+        @return boolean            False if the window can't get any smaller
+        """
+        with self._lock:
+            stats = self._stats.setdefault(acs, [None, None, self.maxSize])
+            stats[2] = max(self.minSize, min(stats[2], size // 2))
+            return (size > self.minSize)
+
+
+    def _average(self, current, value):
+        """ Exponentially weighted moving average (caller holds the lock) """
+        if (current == None):
+            return float(value)
+        return current + self.smoothing * (value - current)
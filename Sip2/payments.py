@@ -0,0 +1,374 @@
+import threading
+import time
+import uuid
+from decimal import Decimal, InvalidOperation
+
+from Sip2.fees import iter_fee_positions
+from Sip2.journal import Journal
+
+
+class PaymentJournal:
+    """ Write-ahead journal for Fee Paid (37/38) with at-most-once semantics
+    A Fee Paid request that times out or loses its connection may or may not
+    be booked by the ACS. pay() therefore writes every attempt to a durable
+    journal before sending it, with a transaction id (BK) that stays the same
+    for the attempt, and the patron's fee state seen just before.
+
+    If the response is lost, the attempt stays "in doubt". recover() looks at
+    the patron's fee state again (Gossip: the fee item CG in feeItems, SIP2:
+    the fee amount BV) and decides: booked (nothing to do), not booked
+    (resent with the same transaction id) or undecidable, e.g. because the
+    balance changed otherwise meanwhile (left for staff, see in_doubt()).
+
+    Results are appended without waiting for the disk; only the attempt has to
+    be durable before sending. Several cash machines sharing one journal share
+    their fsyncs (@see Journal, syncDelay).
+
+    @example:
+        from Sip2.payments import PaymentJournal
+        payments = PaymentJournal('/var/lib/sc/payments.journal', syncDelay = 0.005)
+        wrapper.login_patron('patron', 'pin')
+        result = payments.pay(wrapper, 1, 0, '2.50', 'fee-4711')
+        if (result['status'] == 'doubt'):
+            # after reconnecting
+            wrapper.connect()
+            wrapper.login_device('user', 'pass')
+            report = payments.recover(wrapper)
+
+    @example: Gossip, pay 5.00 on several fee positions in one go
+        summary = payments.pay_amount(wrapper, '5.00', 1, 0, partial = True)
+        print (summary['status'], summary['paid'], summary['unpaid'])
+    """
+
+    def __init__(self, path, syncDelay = 0.0):
+        """ Constructor, opens the journal and restores attempts in doubt
+        @param string path         Journal file
+        @param float  syncDelay    Seconds to batch journal fsyncs (@see Journal)
+        """
+        self._journal       = Journal(path, syncDelay)
+        # @var Journal     Durable storage
+        self._open          = {}
+        # @var dict        Attempts without a result: transaction id => record
+        self._doubt         = {}
+        # @var dict        Attempts recover() could not decide: transaction id => record
+        self._lock          = threading.Lock()
+        # @var Lock        Guards _open, _doubt and compaction
+
+        for record in self._journal.records():
+            if (record['type'] == 'attempt'):
+                self._open[record['id']] = record
+            elif (record['type'] == 'result'):
+                self._open.pop(record['id'], None)
+                if (record['status'] == 'doubt'):
+                    self._doubt[record['id']] = self._find(record['id'])
+                else:
+                    self._doubt.pop(record['id'], None)
+        # attempts without result: the process died while sending
+        self._doubt.update(self._open)
+        self._open = {}
+
+
+    def in_doubt(self):
+        """ Attempts whose outcome is unknown, oldest first
+        @return list       Journal records {'id', 'patron', 'feeType', 'paymentType', 'feeAmount', 'feeIdentifier', 'currencyType', 'before', 'time'}
+        """
+        with self._lock:
+            return sorted(self._doubt.values(), key = lambda record: record['time'])
+
+
+    def pay(self, wrapper, feeType, paymentType, feeAmount, feeIdentifier = '', currencyType = 'EUR'):
+        """ Pay a fee for the patron logged in at wrapper (@see Sip2Wrapper.sip_fee_paid)
+        @param  Sip2Wrapper wrapper        Connection with an active patron session
+        @param  int         feeType        Fee type (01-99)
+        @param  int         paymentType    Payment type (00-99)
+        @param  string      feeAmount      Amount (BV)
+        @param  string      feeIdentifier  Fee id (CG), used to check the outcome with Gossip
+        @param  string      currencyType   Currency (ISO 4217)
+        @return dict   {'id', 'status', 'response', 'error'}
+                       status: 'accepted', 'rejected' or 'doubt' (connection lost, call recover())
+        """
+        patron = wrapper._sip2.patron
+        before = self._fee_state(wrapper, patron, wrapper._sip2.patronpwd, feeIdentifier)
+        record = {'type': 'attempt', 'id': uuid.uuid4().hex, 'patron': patron, 'feeType': feeType,
+                  'paymentType': paymentType, 'feeAmount': feeAmount, 'feeIdentifier': feeIdentifier,
+                  'currencyType': currencyType, 'before': before, 'time': int(time.time())}
+        # open before it is journaled, so a compact() meanwhile keeps it; the
+        # append is outside the lock, concurrent payments share their fsync
+        with self._lock:
+            self._open[record['id']] = record
+        self._journal.append(record)
+        return self._send(wrapper, record)
+
+
+    def pay_amount(self, wrapper, amount, feeType, paymentType, partial = False, currencyType = 'EUR'):
+        """ Gossip: pay an amount on the fee positions of the patron logged in at wrapper
+        Fetches the fee positions once, plans the allocation (@see plan_payment)
+        and pays it with pay_plan().
+        @param  Sip2Wrapper wrapper        Connection with an active patron session (Gossip)
+        @param  string      amount         Amount to pay
+        @param  int         feeType        Fee type (01-99)
+        @param  int         paymentType    Payment type (00-99)
+        @param  boolean     partial        Pay the rest of the amount on a position partially
+        @param  string      currencyType   Currency (ISO 4217)
+        @return dict   @see pay_plan
+        """
+        positions = wrapper.get_patron_feePositions()
+        if (positions == False):
+            raise RuntimeError('PaymentJournal: fee positions need Gossip and Patron Information')
+        return self.pay_plan(wrapper, plan_payment(positions, amount, partial), feeType, paymentType, currencyType)
+
+
+    def pay_plan(self, wrapper, plan, feeType, paymentType, currencyType = 'EUR'):
+        """ Pay all payments of a plan for the patron logged in at wrapper
+        All attempts are journaled with one fsync before the first Fee Paid
+        (37) is sent; the fee positions of the plan are their state before
+        (no Patron Information per payment). The 37 are sent one after the
+        other on the connection. After a connection error the remaining
+        payments are not sent but left in doubt: recover() books them later,
+        the patron has paid the whole amount.
+        @param  Sip2Wrapper wrapper        Connection with an active patron session (Gossip)
+        @param  dict        plan           Return value of plan_payment()
+        @param  int         feeType        Fee type (01-99)
+        @param  int         paymentType    Payment type (00-99)
+        @param  string      currencyType   Currency (ISO 4217)
+        @return dict   {'status', 'paid', 'doubt', 'unpaid', 'results'}
+                       status: 'accepted' (all), 'partial', 'rejected' (none) or 'doubt' (call recover())
+                       paid, doubt, unpaid: Decimal amounts (unpaid includes the remainder of the plan)
+                       results: one pay() result per payment, with 'feeId' and 'amount'
+        """
+        patron  = wrapper._sip2.patron
+        records = []
+        for payment in plan['payments']:
+            position = payment['position']
+            records.append({'type': 'attempt', 'id': uuid.uuid4().hex, 'patron': patron, 'feeType': feeType,
+                            'paymentType': paymentType, 'feeAmount': str(payment['amount']), 'feeIdentifier': position.feeId,
+                            'currencyType': currencyType, 'before': {'balance': None, 'fee': str(position.amount)},
+                            'time': int(time.time())})
+        with self._lock:
+            for record in records:
+                self._journal.append(record, False)
+                self._open[record['id']] = record
+        self._journal.sync()
+
+        summary = {'status': None, 'paid': Decimal('0'), 'doubt': Decimal('0'), 'unpaid': plan['remainder'], 'results': []}
+        error   = None
+        for payment, record in zip(plan['payments'], records):
+            if (error == None):
+                result = self._send(wrapper, record)
+                error  = result['error'] if result['status'] == 'doubt' else None
+            else:
+                result = {'id': record['id'], 'status': 'doubt', 'response': None, 'error': 'not sent: %s' % error}
+                self._result(record, 'doubt', result['error'])
+            result.update(feeId = record['feeIdentifier'], amount = payment['amount'])
+            summary['results'].append(result)
+            key = {'accepted': 'paid', 'rejected': 'unpaid', 'doubt': 'doubt'}[result['status']]
+            summary[key] += payment['amount']
+
+        statuses = set(result['status'] for result in summary['results'])
+        if ('doubt' in statuses):
+            summary['status'] = 'doubt'
+        elif (statuses == {'accepted'}):
+            summary['status'] = 'accepted'
+        elif ('accepted' in statuses):
+            summary['status'] = 'partial'
+        else:
+            summary['status'] = 'rejected'
+        return summary
+
+
+    def recover(self, wrapper):
+        """ Decide the outcome of all attempts in doubt, resend those not booked
+        @param  Sip2Wrapper wrapper        A connected (and logged in) device
+        @return dict   {'booked', 'resent', 'doubt', 'error'}
+                       booked, resent: lists of transaction ids; doubt: records still undecided
+        """
+        report = {'booked': [], 'resent': [], 'doubt': [], 'error': None}
+        for record in self.in_doubt():
+            try:
+                booked = self._booked(wrapper, record)
+                if booked:
+                    self._result(record, 'accepted', 'booked (recovered)')
+                    report['booked'].append(record['id'])
+                elif (booked == False):
+                    with self._lock:
+                        self._open[record['id']] = record
+                    result = self._send_for(wrapper, record)
+                    if (result['status'] != 'doubt'):
+                        report['resent'].append(record['id'])
+            except OSError as e:
+                report['error'] = '%s: %s' % (type(e).__name__, e)
+                break
+
+        self._journal.sync()
+        self.compact()
+        report['doubt'] = self.in_doubt()
+        return report
+
+
+    def resolve(self, transactionId, booked):
+        """ Record the outcome of an attempt decided by staff
+        @param string  transactionId   Transaction id (BK) of the attempt
+        @param boolean booked          True if the ACS booked the payment
+        """
+        with self._lock:
+            record = self._doubt.get(transactionId)
+        if (record == None):
+            raise ValueError("PaymentJournal: no attempt in doubt: '%s'" % transactionId)
+        self._result(record, 'accepted' if booked else 'rejected', 'resolved manually')
+        self._journal.sync()
+
+
+    def compact(self):
+        """ Drop finished attempts from the journal """
+        with self._lock:
+            keep = []
+            for record in list(self._open.values()) + list(self._doubt.values()):
+                keep.append(record)
+                if record['id'] in self._doubt:
+                    keep.append({'type': 'result', 'id': record['id'], 'status': 'doubt', 'message': ''})
+            self._journal.rewrite(keep)
+
+
+    def close(self):
+        """ Close the journal """
+        self._journal.close()
+
+
+    def _send_for(self, wrapper, record):
+        """ Resend an attempt with the patron of the record on a device connection """
+        previous = (wrapper._sip2.patron, wrapper._sip2.patronpwd)
+        wrapper._sip2.patron, wrapper._sip2.patronpwd = record['patron'], ''
+        try:
+            return self._send(wrapper, record)
+        finally:
+            wrapper._sip2.patron, wrapper._sip2.patronpwd = previous
+
+
+    def _send(self, wrapper, record):
+        """ Send a journaled attempt and record the outcome
+        @return dict   {'id', 'status', 'response', 'error'}
+        """
+        result = {'id': record['id'], 'status': 'doubt', 'response': None, 'error': None}
+        try:
+            info = wrapper.sip_fee_paid(record['feeType'], record['paymentType'], record['feeAmount'],
+                                        record['feeIdentifier'], record['id'], record['currencyType'])
+        except OSError as e:
+            result['error'] = '%s: %s' % (type(e).__name__, e)
+            self._result(record, 'doubt', result['error'])
+            return result
+
+        if (info == False):
+            result['status'] = 'rejected'
+            result['error']  = 'Fee Paid not supported by ACS'
+        else:
+            result['response'] = info
+            result['status']   = 'accepted' if info['fixed']['PaymentAccepted'] == 'Y' else 'rejected'
+        message = result['error'] if info == False else info['variable'].get('AF', [''])[0]
+        self._result(record, result['status'], message)
+        return result
+
+
+    def _result(self, record, status, message):
+        """ Append the outcome of an attempt (not waiting for the disk) """
+        with self._lock:
+            self._open.pop(record['id'], None)
+            if (status == 'doubt'):
+                self._doubt[record['id']] = record
+            else:
+                self._doubt.pop(record['id'], None)
+            self._journal.append({'type': 'result', 'id': record['id'], 'status': status, 'message': message}, False)
+
+
+    def _fee_state(self, wrapper, patron, patronpwd, feeIdentifier):
+        """ The patron's fee state used to decide the outcome of an attempt later
+        @return dict   {'balance': amount (BV)|None, 'fee': amount of fee item feeIdentifier|None (Gossip only)}
+                       amounts as strings, they are journaled (JSON)
+        """
+        state = {'balance': None, 'fee': None}
+        if (feeIdentifier != '' and wrapper._sip2._version == 'Gossip'):
+            info  = wrapper._fetch_patron_information(patron, patronpwd, 'feeItems', '1', '99999')
+            for position in iter_fee_positions(info):
+                if (position.feeId == feeIdentifier):
+                    state['fee'] = str(position.amount)
+                    break
+        else:
+            info  = wrapper._fetch_patron_information(patron, patronpwd, 'none')
+        if 'BV' in info['variable']:
+            state['balance'] = str(_amount(info['variable']['BV'][0]))
+        return state
+
+
+    def _booked(self, wrapper, record):
+        """ Compare the fee state before the attempt with the current one
+        @return boolean|None   True: booked, False: not booked, None: cannot tell
+        """
+        before = record['before']
+        now    = self._fee_state(wrapper, record['patron'], '', record['feeIdentifier'])
+        if (before['fee'] != None):
+            if (now['fee'] == None):
+                return True
+            paid = _amount(before['fee']) - _amount(now['fee'])
+        elif (before['balance'] != None and now['balance'] != None):
+            paid = _amount(before['balance']) - _amount(now['balance'])
+        else:
+            return None
+
+        if (paid == 0):
+            return False
+        if (paid == _amount(record['feeAmount'])):
+            return True
+        return None
+
+
+    def _find(self, transactionId):
+        """ The attempt record of a transaction id from the journal """
+        for record in self._journal.records():
+            if (record['type'] == 'attempt' and record['id'] == transactionId):
+                return record
+
+
+def plan_payment(positions, amount, partial = False):
+    """ Allocate an amount to fee positions
+    Positions are paid oldest first (FC date, positions without date last).
+    Only complete positions are paid; a position larger than what is left is
+    skipped, so smaller ones after it still can be paid completely. With
+    partial the rest then goes to the oldest position not paid.
+    @param  list    positions  FeePosition (@see Sip2.fees)
+    @param  string  amount     Amount to pay (string or Decimal)
+    @param  boolean partial    Pay the rest on a position partially
+    @throws ValueError if the amount is not a positive number
+    @return dict   {'payments': [{'position', 'amount', 'partial'}], 'total', 'remainder'} with Decimal amounts
+    """
+    try:
+        left = Decimal(str(amount).strip().replace(',', '.'))
+    except InvalidOperation:
+        left = Decimal('NaN')
+    if (left.is_finite() == False or left <= 0):
+        raise ValueError("plan_payment: invalid amount: '%s'" % amount)
+
+    order    = sorted((position for position in positions if position.amount > 0),
+                      key = lambda position: (position.date == None, position.date or 0))
+    payments = []
+    skipped  = []
+    for position in order:
+        if (position.amount <= left):
+            payments.append({'position': position, 'amount': position.amount, 'partial': False})
+            left -= position.amount
+        else:
+            skipped.append(position)
+    if (partial and left > 0 and skipped):
+        payments.append({'position': skipped[0], 'amount': left, 'partial': True})
+        left = Decimal('0')
+
+    return {'payments': payments, 'total': sum((payment['amount'] for payment in payments), Decimal('0')), 'remainder': left}
+
+
+def _amount(value):
+    """ Parse an amount sent by an ACS ('2.50', '2,50')
+    @throws ValueError if it is not a number
+    @return Decimal            Rounded to cents
+    """
+    try:
+        return Decimal(str(value).strip().replace(',', '.')).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise ValueError("Invalid amount: '%s'" % value) from None
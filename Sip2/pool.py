@@ -0,0 +1,335 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from Sip2.wrapper import Sip2Wrapper
+
+
+class Sip2Pool:
+    """ Connection pool of Sip2Wrapper instances
+    Keeps up to "size" connected (and optionally logged in) wrappers for the
+    same ACS and terminal account. Connections are created lazily on demand
+    and reused afterwards. A wrapper must only be used by the thread that
+    acquired it, until it is released again.
+
+    Use the pool for stateless requests (item information, checkin, patron
+    information with explicit patron credentials) that can be sent over any
+    connection. For patron sessions (login_patron() ... sip_patron_session_end())
+    lease a connection: it stays pinned to the session id until the session
+    ends (35/36) or was idle for leaseTimeout seconds.
+
+    @example:
+        from Sip2.pool import Sip2Pool
+        pool = Sip2Pool(sip2Params, size = 6, loginUserId = 'user', loginPassword = 'pass')
+        with pool.connection() as wrapper:
+            wrapper.sip_item_information('itemBarcode')
+        pool.close()
+
+        # patron session, e.g. across several requests of a web kiosk
+        with pool.leased(sessionId) as wrapper:
+            wrapper.login_patron('patron', 'pin')
+        with pool.leased(sessionId) as wrapper:
+            wrapper.sip_item_checkout('itemBarcode')
+            wrapper.sip_patron_session_end()      # ends the lease at the end of the block
+    """
+
+    def __init__(self, sip2Params = {}, size = 4, version = 'Sip2', loginUserId = None, loginPassword = '', autoSelfCheck = True, wrapperOptions = {}, leaseTimeout = 300.0):
+        """ Constructor
+        @param array   sip2Params      Parameters for each Sip2Wrapper (@see Sip2Wrapper)
+        @param int     size            Maximum number of connections
+        @param string  version         Either Sip2 (default) or Gossip
+        @param string  loginUserId     Device login (93) for each new connection; None to skip login
+        @param string  loginPassword   Device password
+        @param boolean autoSelfCheck   Do a SC Status (99) after the login
+        @param array   wrapperOptions  Additional keyword arguments for Sip2Wrapper (e.g. itemCache)
+        @param float   leaseTimeout    Idle seconds after which a patron session lease ends
+        """
+        if (size < 1):
+            raise ValueError("Sip2Pool: size must be at least 1: '%s'" % size)
+
+        self.size           = size
+        # @var int         Maximum number of connections
+        self._sip2Params    = sip2Params
+        # @var array       Parameters for new wrappers
+        self._version       = version
+        # @var string      Sip2 or Gossip
+        self._login         = (loginUserId, loginPassword, autoSelfCheck)
+        # @var tuple       Device login data for new wrappers
+        self._wrapperOptions = wrapperOptions
+        # @var array       Keyword arguments for new wrappers
+        self.leaseTimeout   = leaseTimeout
+        # @var float       Idle seconds after which a lease ends
+
+        self._idle          = []
+        # @var list        Connected wrappers not in use (last released at the end)
+        self._created       = 0
+        # @var int         Number of wrappers that exist (idle or in use)
+        self._closed        = False
+        # @var boolean     No more acquires after close()
+        self._leases        = {}
+        # @var dict        Patron session id => {'wrapper', 'used', 'session' (a patron session was seen)}
+        self._cond          = threading.Condition()
+        # @var Condition   Guards the state above, signals released wrappers
+
+
+    def acquire(self, timeout = None):
+        """ Get a connected wrapper for exclusive use
+        @param  float timeout      Seconds to wait for a free connection (None = forever)
+        @throws TimeoutError if no connection became free in time
+        @return Sip2Wrapper
+        """
+        if self._leases:
+            self.expire_leases()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError('Sip2Pool: pool is closed')
+                if self._idle:
+                    return self._idle.pop()
+                if (self._created < self.size):
+                    self._created += 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if (remaining is not None and remaining <= 0):
+                    raise TimeoutError('Sip2Pool: no free connection within %s seconds' % timeout)
+                self._cond.wait(remaining)
+
+        # connect outside of the lock, it takes a round trip or two
+        try:
+            return self._create()
+        except BaseException:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+
+    def release(self, wrapper, broken = False):
+        """ Give a wrapper back to the pool
+        @param Sip2Wrapper wrapper     The wrapper got from acquire()
+        @param boolean     broken      True if the connection failed; it is closed and replaced on demand
+        """
+        with self._cond:
+            if (broken or self._closed):
+                self._created -= 1
+            else:
+                self._idle.append(wrapper)
+            self._cond.notify()
+
+        if (broken or self._closed):
+            try:
+                wrapper.disconnect()
+            except OSError:
+                pass
+
+
+    @contextmanager
+    def connection(self, timeout = None):
+        """ Context manager around acquire()/release(). A ConnectionError
+        (including ConnectionResetError) or any other socket error, like a 
+        timeout, marks the connection as broken: a late response would end up
+        as answer to the next request.
+        @param  float timeout      Seconds to wait for a free connection
+        @return Sip2Wrapper
+        """
+        wrapper = self.acquire(timeout)
+        try:
+            yield wrapper
+        except OSError:
+            self.release(wrapper, True)
+            raise
+        except BaseException:
+            self.release(wrapper)
+            raise
+        else:
+            self.release(wrapper)
+
+
+    def lease(self, sessionId, timeout = None):
+        """ Get the connection pinned to a patron session, pin a free one for a new session.
+        The lease ends with end_lease(), after a leased() block that ended the
+        patron session (35/36) or after leaseTimeout idle seconds (the session
+        is ended then). Logging in the next patron keeps the lease.
+        @param  string sessionId   Id of the patron session (chosen by the application)
+        @param  float  timeout     Seconds to wait for a free connection (None = forever)
+        @throws TimeoutError if no connection became free in time
+        @return Sip2Wrapper
+        """
+        with self._cond:
+            if (sessionId in self._leases):
+                self._leases[sessionId]['used'] = time.monotonic()
+                return self._leases[sessionId]['wrapper']
+
+        wrapper = self.acquire(timeout)
+        with self._cond:
+            if (sessionId not in self._leases):
+                self._leases[sessionId] = {'wrapper': wrapper, 'used': time.monotonic(), 'session': False}
+                return wrapper
+            # leased by another thread meanwhile
+            other = self._leases[sessionId]['wrapper']
+        self.release(wrapper)
+        return other
+
+
+    @contextmanager
+    def leased(self, sessionId, timeout = None):
+        """ Context manager around lease(). A socket error ends the lease and 
+        closes the connection. If the block ended the patron session (35/36)
+        the lease ends too; otherwise it is kept after the block.
+        @param  string sessionId   Id of the patron session
+        @param  float  timeout     Seconds to wait for a free connection
+        @return Sip2Wrapper
+        """
+        wrapper = self.lease(sessionId, timeout)
+        endedBefore = wrapper._sessionsEnded
+        try:
+            yield wrapper
+        except OSError:
+            self.end_lease(sessionId, True)
+            raise
+        # the wrapper is not in use anymore, now it may go back to the pool
+        with self._cond:
+            lease = self._leases.get(sessionId)
+            if (lease == None or lease['wrapper'] is not wrapper):
+                return
+            if wrapper._inPatronSession:
+                lease['session'] = True
+                return
+            # a session of an earlier block or of this one has ended
+            ended = (lease['session'] or wrapper._sessionsEnded != endedBefore)
+        if ended:
+            self.end_lease(sessionId)
+
+
+    def end_lease(self, sessionId, broken = False):
+        """ Unpin the connection of a patron session (without sending 35)
+        @param string  sessionId   Id of the patron session
+        @param boolean broken      True if the connection failed
+        """
+        with self._cond:
+            lease = self._leases.pop(sessionId, None)
+        if (lease != None):
+            self._unpin(lease['wrapper'], broken)
+
+
+    def expire_leases(self):
+        """ End the patron sessions idle for leaseTimeout seconds (35/36) and 
+        unpin their connections
+        @return int                Number of leases ended
+        """
+        now = time.monotonic()
+        with self._cond:
+            expired = [sessionId for sessionId, lease in self._leases.items()
+                       if now - max(lease['used'], lease['wrapper']._sip2._lastExchange) >= self.leaseTimeout]
+            leases  = [self._leases.pop(sessionId) for sessionId in expired]
+
+        for lease in leases:
+            wrapper = lease['wrapper']
+            try:
+                if wrapper._inPatronSession:
+                    wrapper.sip_patron_session_end()
+            except OSError:
+                self._unpin(wrapper, True)
+                continue
+            except RuntimeError:
+                pass
+            self._unpin(wrapper)
+        return len(leases)
+
+
+    def _unpin(self, wrapper, broken = False):
+        """ Forget the patron of a leased wrapper and give it back to the pool """
+        wrapper._inPatronSession  = False
+        wrapper._patronStatus     = None
+        wrapper._restrictions     = 0
+        wrapper._patronInfo       = None
+        wrapper._sip2.patron      = ''
+        wrapper._sip2.patronpwd   = ''
+        self.release(wrapper, broken)
+
+
+    def check_idle(self, idleSeconds, check):
+        """ Run check(wrapper) on each idle connection unused for idleSeconds, 
+        e.g. a heartbeat (@see Sip2.heartbeat). The connections are taken out of
+        the pool while checked. A connection whose check raises an OSError is 
+        closed and replaced by a new one right away; any other exception closes
+        it as well and is raised after the unchecked ones are back in the pool.
+        @param  float    idleSeconds   Minimum idle time
+        @param  callable check         Called with the wrapper
+        @return tuple                  (checked, replaced)
+        """
+        now = time.monotonic()
+        with self._cond:
+            stale = [wrapper for wrapper in self._idle if now - wrapper._sip2._lastExchange >= idleSeconds]
+            self._idle = [wrapper for wrapper in self._idle if wrapper not in stale]
+
+        checked = replaced = 0
+        try:
+            while stale:
+                wrapper = stale.pop(0)
+                broken  = True
+                try:
+                    check(wrapper)
+                    broken = False
+                except OSError:
+                    replaced += 1
+                finally:
+                    # any other exception leaves the connection in an unknown state too
+                    self.release(wrapper, broken)
+                checked += 1
+                if broken:
+                    self._prewarm()
+        finally:
+            # the ones not checked after an unexpected exception
+            for wrapper in stale:
+                self.release(wrapper)
+        return (checked, replaced)
+
+
+    def close(self):
+        """ Disconnect all idle connections. Wrappers in use are closed on release. """
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._cond.notify_all()
+
+        for wrapper in idle:
+            try:
+                wrapper.disconnect()
+            except OSError:
+                pass
+
+
+    def _prewarm(self):
+        """ Create one idle connection unless the pool is full or closed.
+        Connection errors are ignored, acquire() tries again on demand.
+        """
+        with self._cond:
+            if (self._closed or self._created >= self.size):
+                return
+            self._created += 1
+        try:
+            wrapper = self._create()
+        except (OSError, RuntimeError):
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            return
+        self.release(wrapper)
+
+
+    def _create(self):
+        """ Create, connect and login a new wrapper
+        @return Sip2Wrapper
+        """
+        wrapper = Sip2Wrapper(self._sip2Params, True, self._version, **self._wrapperOptions)
+        loginUserId, loginPassword, autoSelfCheck = self._login
+        if loginUserId is not None:
+            try:
+                wrapper.login_device(loginUserId, loginPassword, autoSelfCheck)
+            except BaseException:
+                wrapper.disconnect()
+                raise
+        return wrapper
@@ -0,0 +1,211 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Sip2RateLimited(RuntimeError):
+    """ Raised if a limiter has no token or slot within its timeout. The
+    request was not sent, the ACS is busy but fine: it is no OSError, so
+    connection error handling (offline queue, reconnects, broken pooled
+    connections, endpoint failures) must not kick in.
+    """
+
+
+class TokenBucket:
+    """ Token bucket rate limiter
+    Allows "rate" messages per second on average and bursts of up to "burst"
+    messages. Thread safe; waiting callers sleep outside of the lock and are
+    served in the order they asked.
+
+    @example:
+        bucket = TokenBucket(rate = 20, burst = 5)
+        bucket.acquire()              # blocks until a token is available
+        wrapper.sip_item_renew(itemId)
+    """
+
+    def __init__(self, rate, burst = None):
+        """ Constructor
+        @param float rate      Tokens added per second
+        @param int   burst     Bucket capacity (default: rate, at least 1)
+        """
+        if (rate <= 0):
+            raise ValueError("TokenBucket: rate must be positive: '%s'" % rate)
+
+        self.rate           = float(rate)
+        # @var float       Tokens added per second
+        self.burst          = max(1.0, float(rate if burst is None else burst))
+        # @var float       Bucket capacity
+        self._tokens        = self.burst
+        # @var float       Tokens available (negative: reserved by waiting callers)
+        self._updated       = time.monotonic()
+        # @var float       Last refill
+        self._lock          = threading.Lock()
+        # @var Lock        Guards _tokens and _updated
+
+
+    def acquire(self, tokens = 1, timeout = None):
+        """ Take tokens, wait until they are available
+        @param  int   tokens       Number of tokens (messages)
+        @param  float timeout      Maximum seconds to wait (None = forever)
+        @throws Sip2RateLimited if the tokens would not be available in time (nothing is taken then)
+        @return float              Seconds waited
+        """
+        with self._lock:
+            self._refill()
+            wait = max(0.0, (tokens - self._tokens) / self.rate)
+            if (timeout is not None and wait > timeout):
+                raise Sip2RateLimited('TokenBucket: no token within %s seconds' % timeout)
+            self._tokens -= tokens
+
+        if (wait > 0):
+            time.sleep(wait)
+        return wait
+
+
+    def try_acquire(self, tokens = 1):
+        """ Take tokens only if they are available right now
+        @param  int tokens     Number of tokens (messages)
+        @return boolean
+        """
+        with self._lock:
+            self._refill()
+            if (self._tokens >= tokens):
+                self._tokens -= tokens
+                return True
+            return False
+
+
+    def _refill(self):
+        """ Add the tokens earned since the last refill (caller holds the lock) """
+        now = time.monotonic()
+        self._tokens  = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class EndpointLimiter:
+    """ Rate and concurrency limits for one ACS endpoint
+    Shared by all connections to the endpoint: set it as rateLimiter in the 
+    sip2Params of wrappers and pools, every request (Sip2.get_response) then
+    waits for a slot. The endpoint has an overall budget (messages per second,
+    requests in flight) and each traffic class (the trafficClass of the
+    connection, e.g. 'interactive' for kiosks, 'batch' for bulk jobs) may
+    have a smaller budget of its own, so batch jobs cannot use up the
+    endpoint. Waiting times are recorded per class.
+
+    @example:
+        from Sip2.ratelimit import EndpointLimiter
+        limiter = EndpointLimiter(rate = 50, maxInFlight = 8,
+                                  classes = {'batch': {'rate': 20, 'maxInFlight': 4}})
+        kiosk = Sip2Wrapper(dict(sip2Params, rateLimiter = limiter))
+        pool  = Sip2Pool(dict(sip2Params, rateLimiter = limiter, trafficClass = 'batch'), size = 4)
+        print (limiter.stats()['batch']['waitSeconds'])
+    """
+
+    def __init__(self, rate = None, burst = None, maxInFlight = None, classes = {}, timeout = None):
+        """ Constructor
+        @param float rate          Messages per second for the endpoint (None: unlimited)
+        @param int   burst         Bucket capacity (default: rate)
+        @param int   maxInFlight   Requests in flight for the endpoint (None: unlimited)
+        @param dict  classes       Traffic class => {'rate', 'burst', 'maxInFlight'} (all optional)
+        @param float timeout       Maximum seconds to wait for a slot (None: forever)
+        """
+        self.timeout        = timeout
+        # @var float       Maximum seconds to wait for a slot
+        self._endpoint      = self._budget({'rate': rate, 'burst': burst, 'maxInFlight': maxInFlight})
+        # @var dict        Endpoint budget {'bucket', 'slots'}
+        self._classes       = {name: self._budget(budget) for name, budget in classes.items()}
+        # @var dict        Traffic class => budget
+        self._stats         = {}
+        # @var dict        Traffic class => wait statistics
+        self._lock          = threading.Lock()
+        # @var Lock        Guards _stats
+
+
+    def acquire(self, trafficClass = 'interactive'):
+        """ Wait for a slot of the traffic class and the endpoint
+        @param  string trafficClass    Traffic class of the request
+        @throws Sip2RateLimited if no slot is available within timeout (nothing is held then)
+        @return float                  Seconds waited
+        """
+        started  = time.monotonic()
+        budgets  = [self._endpoint] if trafficClass not in self._classes else [self._classes[trafficClass], self._endpoint]
+        acquired = []
+        try:
+            for budget in budgets:
+                if (budget['slots'] != None):
+                    if (budget['slots'].acquire(timeout = self._remaining(started)) == False):
+                        raise Sip2RateLimited('EndpointLimiter: no slot for %s within %s seconds' % (trafficClass, self.timeout))
+                    acquired.append(budget)
+                if (budget['bucket'] != None):
+                    budget['bucket'].acquire(1, self._remaining(started))
+        except Sip2RateLimited:
+            for budget in acquired:
+                budget['slots'].release()
+            self._count(trafficClass, time.monotonic() - started, False)
+            raise
+
+        waited = time.monotonic() - started
+        self._count(trafficClass, waited, True)
+        return waited
+
+
+    def release(self, trafficClass = 'interactive'):
+        """ Free the slot taken by acquire()
+        @param string trafficClass     Traffic class of the request
+        """
+        budgets = [self._endpoint] if trafficClass not in self._classes else [self._classes[trafficClass], self._endpoint]
+        for budget in budgets:
+            if (budget['slots'] != None):
+                budget['slots'].release()
+        with self._lock:
+            self._stats[trafficClass]['inFlight'] -= 1
+
+
+    @contextmanager
+    def slot(self, trafficClass = 'interactive'):
+        """ Hold a slot for the duration of the with block
+        @param string trafficClass     Traffic class of the request
+        """
+        self.acquire(trafficClass)
+        try:
+            yield self
+        finally:
+            self.release(trafficClass)
+
+
+    def stats(self):
+        """ Wait statistics
+        @return dict   Traffic class => {'requests', 'waited', 'waitSeconds', 'maxWait', 'timeouts', 'inFlight'}
+        """
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+
+    def _budget(self, budget):
+        """ Build the token bucket and semaphore of a budget """
+        rate        = budget.get('rate')
+        maxInFlight = budget.get('maxInFlight')
+        return {'bucket': None if rate is None else TokenBucket(rate, budget.get('burst')),
+                'slots':  None if maxInFlight is None else threading.BoundedSemaphore(maxInFlight)}
+
+
+    def _remaining(self, started):
+        """ Seconds left of the timeout (None: forever) """
+        if (self.timeout is None):
+            return None
+        return max(0.0, self.timeout - (time.monotonic() - started))
+
+
+    def _count(self, trafficClass, waited, ok):
+        """ Record a wait """
+        with self._lock:
+            stats = self._stats.setdefault(trafficClass, {'requests': 0, 'waited': 0, 'waitSeconds': 0.0, 'maxWait': 0.0, 'timeouts': 0, 'inFlight': 0})
+            stats['waitSeconds'] += waited
+            stats['maxWait']      = max(stats['maxWait'], waited)
+            if ok:
+                stats['requests'] += 1
+                stats['inFlight'] += 1
+                if (waited > 0.001):
+                    stats['waited'] += 1
+            else:
+                stats['timeouts'] += 1
@@ -0,0 +1,232 @@
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class PoolScheduler:
+    """ Priority scheduling of requests for the connections of a Sip2Pool
+    Requests of different classes (by default interactive patron sessions,
+    staff clients and batch jobs) wait in one queue per class. Whenever a
+    connection is free, the next request is chosen by weighted fair queuing:
+    a class with weight 8 gets about eight connections for each one of a
+    class with weight 1, as long as both have requests waiting.
+
+    Classes listed in preemptible (batch) additionally step back in the queue
+    as soon as any other class waits, i.e. kiosks never queue behind batch
+    requests. To keep batch jobs from starving in busy hours, a preemptible
+    request that waited maxDelay seconds is scheduled by weight again. Running
+    requests are never interrupted.
+
+    All users of the pool must go through the scheduler, it limits the number
+    of connections handed out to the pool size.
+
+    @example:
+        from Sip2.scheduler import PoolScheduler
+        scheduler = PoolScheduler(pool)
+        with scheduler.connection('interactive') as wrapper:
+            wrapper.sip_item_information('itemBarcode')
+        # batch jobs take the scheduler like a pool
+        Inventory(scheduler.view('batch')).run(barcodes, output)
+        print (scheduler.stats()['interactive']['maxWait'])
+    """
+
+    def __init__(self, pool, weights = {'interactive': 8, 'staff': 4, 'batch': 1}, preemptible = ('batch',), maxDelay = 5.0):
+        """ Constructor
+        @param Sip2Pool pool           Connections to schedule
+        @param dict     weights        Priority class => weight (positive number)
+        @param tuple    preemptible    Classes that step back while other classes wait
+        @param float    maxDelay       Seconds after which a preemptible request is scheduled by weight again (None: never)
+        """
+        for name, weight in weights.items():
+            if (weight <= 0):
+                raise ValueError("PoolScheduler: weight of '%s' must be positive: '%s'" % (name, weight))
+
+        self.pool           = pool
+        # @var Sip2Pool    Connections to schedule
+        self.size           = pool.size
+        # @var int         Maximum number of connections handed out
+        self.weights        = dict(weights)
+        # @var dict        Priority class => weight
+        self.preemptible    = tuple(preemptible)
+        # @var tuple       Classes that step back while other classes wait
+        self.maxDelay       = maxDelay
+        # @var float       Starvation guard for preemptible classes
+
+        self._queues        = {name: deque() for name in self.weights}
+        # @var dict        Priority class => waiting tickets, oldest first
+        self._lastTag       = dict.fromkeys(self.weights, 0.0)
+        # @var dict        Priority class => finish tag of its last ticket
+        self._virtual       = 0.0
+        # @var float       Virtual time: tag of the last ticket served
+        self._busy          = 0
+        # @var int         Connections handed out
+        self._order         = itertools.count()
+        # @var count       Tie breaker for equal tags
+        self._stats         = {name: {'served': 0, 'timeouts': 0, 'waitSeconds': 0.0, 'maxWait': 0.0} for name in self.weights}
+        # @var dict        Priority class => wait statistics
+        self._cond          = threading.Condition()
+        # @var Condition   Guards the state above, signals granted tickets
+
+
+    def acquire(self, priority = 'interactive', timeout = None):
+        """ Wait for the turn of the request, then get a connection from the pool
+        @param  string priority    Priority class
+        @param  float  timeout     Seconds to wait (None = forever)
+        @throws TimeoutError if the request was not scheduled in time
+        @return Sip2Wrapper
+        """
+        if (priority not in self.weights):
+            raise ValueError("PoolScheduler: unknown priority class: '%s'" % priority)
+
+        with self._cond:
+            tag = max(self._virtual, self._lastTag[priority]) + 1.0 / self.weights[priority]
+            self._lastTag[priority] = tag
+            ticket = {'tag': tag, 'order': next(self._order), 'queued': time.monotonic(), 'granted': False}
+            self._queues[priority].append(ticket)
+            self._dispatch()
+
+            deadline = None if timeout is None else ticket['queued'] + timeout
+            while (ticket['granted'] == False):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if (remaining is not None and remaining <= 0):
+                    self._queues[priority].remove(ticket)
+                    self._stats[priority]['timeouts'] += 1
+                    raise TimeoutError('PoolScheduler: no connection for %s within %s seconds' % (priority, timeout))
+                self._cond.wait(remaining)
+
+            waited = time.monotonic() - ticket['queued']
+            stats  = self._stats[priority]
+            stats['served']      += 1
+            stats['waitSeconds'] += waited
+            stats['maxWait']      = max(stats['maxWait'], waited)
+
+        try:
+            return self.pool.acquire()
+        except BaseException:
+            self._done()
+            raise
+
+
+    def release(self, wrapper, broken = False):
+        """ Give a connection back (@see Sip2Pool.release)
+        @param Sip2Wrapper wrapper     The wrapper got from acquire()
+        @param boolean     broken      True if the connection failed
+        """
+        self.pool.release(wrapper, broken)
+        self._done()
+
+
+    @contextmanager
+    def connection(self, priority = 'interactive', timeout = None):
+        """ Context manager around acquire()/release(), a socket error marks the
+        connection as broken (@see Sip2Pool.connection)
+        @param  string priority    Priority class
+        @param  float  timeout     Seconds to wait
+        @return Sip2Wrapper
+        """
+        wrapper = self.acquire(priority, timeout)
+        try:
+            yield wrapper
+        except OSError:
+            self.release(wrapper, True)
+            raise
+        except BaseException:
+            self.release(wrapper)
+            raise
+        else:
+            self.release(wrapper)
+
+
+    def view(self, priority):
+        """ A pool-like object whose connections are scheduled in one priority
+        class, for code written against Sip2Pool (bulk engines, Inventory)
+        @param  string priority    Priority class
+        @return _PriorityView      with size, acquire(), release() and connection()
+        """
+        if (priority not in self.weights):
+            raise ValueError("PoolScheduler: unknown priority class: '%s'" % priority)
+        return _PriorityView(self, priority)
+
+
+    def stats(self):
+        """ Queue statistics
+        @return dict   Priority class => {'queued', 'served', 'timeouts', 'waitSeconds', 'maxWait', 'avgWait'}
+        """
+        with self._cond:
+            result = {}
+            for name, stats in self._stats.items():
+                result[name] = dict(stats, queued = len(self._queues[name]))
+                result[name]['avgWait'] = stats['waitSeconds'] / stats['served'] if stats['served'] else 0.0
+            return result
+
+
+    def _done(self):
+        """ A connection is back, schedule the next request """
+        with self._cond:
+            self._busy -= 1
+            self._dispatch()
+
+
+    def _dispatch(self):
+        """ Grant free connections to the next tickets (caller holds the lock) """
+        granted = False
+        while (self._busy < self.size):
+            priority = self._next()
+            if (priority == None):
+                break
+            ticket = self._queues[priority].popleft()
+            ticket['granted'] = True
+            self._virtual = max(self._virtual, ticket['tag'])
+            self._busy += 1
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+
+    def _next(self):
+        """ The priority class whose first ticket is served next (caller holds the lock)
+        @return string|None
+        """
+        now        = time.monotonic()
+        candidates = [name for name, tickets in self._queues.items() if tickets]
+        others     = [name for name in candidates if name not in self.preemptible]
+        if others:
+            # preemptible requests step back, unless they waited too long
+            candidates = others + [name for name in candidates if name in self.preemptible and
+                                   self.maxDelay is not None and now - self._queues[name][0]['queued'] >= self.maxDelay]
+        if not candidates:
+            return None
+        return min(candidates, key = lambda name: (self._queues[name][0]['tag'], self._queues[name][0]['order']))
+
+
+class _PriorityView:
+    """ Pool interface of a PoolScheduler for one priority class (@see PoolScheduler.view) """
+
+    def __init__(self, scheduler, priority):
+        """ Constructor
+        @param PoolScheduler scheduler     The scheduler
+        @param string        priority      Priority class of all requests
+        """
+        self.scheduler      = scheduler
+        # @var PoolScheduler
+        self.priority       = priority
+        # @var string      Priority class
+        self.size           = scheduler.size
+        # @var int         Maximum number of connections
+
+
+    def acquire(self, timeout = None):
+        """ @see PoolScheduler.acquire """
+        return self.scheduler.acquire(self.priority, timeout)
+
+
+    def release(self, wrapper, broken = False):
+        """ @see PoolScheduler.release """
+        self.scheduler.release(wrapper, broken)
+
+
+    def connection(self, timeout = None):
+        """ @see PoolScheduler.connection """
+        return self.scheduler.connection(self.priority, timeout)
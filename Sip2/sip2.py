@@ -8,6 +8,81 @@ import sys
 import logging
 from logging.handlers import TimedRotatingFileHandler
 import os.path
+import weakref
+
+from Sip2.history import ExchangeHistory
+
+
+class Sip2CrcError(ConnectionError):
+    """ Raised by Sip2.get_response() if a response still fails the CRC check
+    after all retries. Usually the response got truncated. It is a 
+    ConnectionError, so existing reconnect handling keeps working.
+    """
+
+
+class Sip2FramingError(ConnectionError):
+    """ Raised by Sip2.get_response() if a response ends without the message
+    terminator (timeout or connection closed after a part of it). The socket
+    is closed: the rest of the frame would be read as the next response.
+    """
+
+
+class Sip2Settings:
+    """ Immutable configuration of a Sip2 instance. Instances with the same 
+    configuration (e.g. all connections of a terminal account) share one object,
+    setting an attribute replaces it (copy on write). @see Sip2._defaults
+    A namedtuple in all but the weak references the shared cache needs.
+    """
+    _fields = ('hostName', 'hostPort', 'maxretry', 'socketTimeout', 'tlsEnable', 'tlsAcceptSelfsigned', 'hostEncoding',
+               'rateLimiter', 'trafficClass', 'timeoutPolicy', 'endpoints', 'retainLast', 'historySize',
+               'fldTerminator', 'msgTerminator', 'withCrc', 'withSeq', 'UIDalgorithm', 'PWDalgorithm',
+               'language', 'institutionId', 'terminalPassword', 'scLocation', 'logfile_path', 'loglevel')
+    __slots__ = _fields + ('__weakref__',)
+
+    def __init__(self, **values):
+        for name in self._fields:
+            object.__setattr__(self, name, values[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Sip2Settings: immutable, use _replace()')
+
+    def _replace(self, **changes):
+        """ Copy with some values changed
+        @return Sip2Settings
+        """
+        values = {name: getattr(self, name) for name in self._fields}
+        values.update(changes)
+        return Sip2Settings(**values)
+
+    def _values(self):
+        """ The values in the order of _fields """
+        return tuple(getattr(self, name) for name in self._fields)
+
+
+_settingsCache = weakref.WeakValueDictionary()
+# @var WeakValueDictionary Values of a Sip2Settings => the shared instance, as long as a Sip2 uses it
+
+
+def _shared_settings(settings):
+    """ The shared instance of equal settings
+    @param  Sip2Settings settings
+    @return Sip2Settings
+    """
+    try:
+        return _settingsCache.setdefault(settings._values(), settings)
+    except TypeError:
+        # unhashable value, not shared
+        return settings
+
+
+def _setting(name):
+    """ Property of Sip2 for a field of its Sip2Settings """
+    def get(self):
+        return getattr(self._settings, name)
+    def set(self, value):
+        self._settings = _shared_settings(self._settings._replace(**{name: value}))
+    return property(get, set)
+
 
 class Sip2:
     """ SIP2 Class
@@ -16,7 +91,7 @@ class Sip2:
     low level implementation and method, parameter and variable names are chosen
     in accordance with the protocol definition document 
     ("sip_COMMAND-MESSAGE_request/response"). Some sip fields are configured as
-    class properties (@see __init__() - "Public SIP variables (saved for various 
+    class properties (@see _defaults - "Public SIP variables (saved for various 
     requests)", because they are used for nearly every request.
 
     @note:
@@ -84,31 +159,90 @@ class Sip2:
     @requires:  Python 3.4 (I guess)
     """
 
-    def __init__(self):
-        self._version        = 'Sip2'
-        # @var string      Used protocol version (or extension) - Sip2 or Gossip
+    __slots__ = ('_version', '_settings', '_socket', '_retryCount', '_endpoint', '_lastExchange',
+                 'last_request', 'last_response', '_lastParsed', 'patron', 'patronpwd',
+                 '_noFixed', '_rqstBuild', '_seq', 'log', '_history', '_buffer')
+    # Many thousand instances may exist in a gateway: no per instance __dict__,
+    # the configuration is a shared Sip2Settings (@see below)
 
-        """Public connection variables"""
-        self.hostName       = ''
+    _defaults = Sip2Settings(
+        # Public connection variables
+        hostName       = '',
         # @var string      Instance hostname
-        self.hostPort       = 1294
+        hostPort       = 1294,
         # @var int         Port number
-        self.maxretry       = 0
+        maxretry       = 0,
         # @var integer     Maximum number of resends allowed before we give up. Note: this is pretty much a relict from pre tcp times
-        self.socketTimeout  = 3;
+        socketTimeout  = 3,
         # @var integer     Socket: value until connection times out (no server response)
-        self.tlsEnable      = True
+        tlsEnable      = True,
         # @var boolean     Use encrypted connection (or try to). Server has to support it.
-        self.tlsAcceptSelfsigned = True
+        tlsAcceptSelfsigned = True,
         # @var boolean     Allow self signed certificates (adds server cert to ca)
-        self.hostEncoding   = 'utf-8'
+        hostEncoding   = 'utf-8',
         # @var string      Encoding returned by ACS
+        rateLimiter    = None,
+        # @var object      EndpointLimiter shared by all connections to this ACS (@see Sip2.ratelimit)
+        trafficClass   = 'interactive',
+        # @var string      Traffic class of this connection for the rateLimiter (e.g. interactive, batch)
+        timeoutPolicy  = None,
+        # @var object      TimeoutPolicy replacing the fixed socketTimeout (@see Sip2.timeouts)
+        endpoints      = None,
+        # @var object      EndpointSet to connect to instead of hostName/hostPort (@see Sip2.endpoints)
+        retainLast     = True,
+        # @var boolean     Keep last_request, last_response and last_response_parsed (False saves memory)
+        historySize    = 0,
+        # @var integer     Number of recent exchanges kept for debugging (0 = none, @see Sip2.history)
+
+        # Public SIP variables (...which you will probably never change)
+        fldTerminator  = '|',
+        # @var string      Field terminator
+        msgTerminator  = "\r",
+        # @var string      Message terminator
+        withCrc        = True,
+        # @var boolean     Toggle crc checking and appending. Note: this is pretty much a relict from pre tcp times
+        withSeq        = True,
+        # @var boolean     Toggle the use of sequence numbers
+        UIDalgorithm   = 0,
+        # @var integer     Login encryption algorithm type (0 = plain text)
+        PWDalgorithm   = 0,
+        # @var integer     Password encryption algorithm type (undocumented)
+
+        # Public SIP variables (saved for various requests)
+        language       = '000',
+        # @var string      Language code (000 = default, 001 == english)
+        institutionId  = 'My Test Institute',
+        # @var string      Value for the AO field
+        terminalPassword = '',
+        # @var string      Terminal password (AC)
+        scLocation     = 'My Test SC Location',
+        # @var string l    Location code (AP "location code" / CP "current location")
+
+        # Public logging variables
+        logfile_path   = '',
+        # @var string      Path where to write to the logfile. Exampele: 'c:\\temp'
+        loglevel       = 'DEBUG',
+        # @var string      Loglevel (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+    )
+    # @var Sip2Settings  Default configuration
+
+    def __init__(self):
+        self._version        = 'Sip2'
+        # @var string      Used protocol version (or extension) - Sip2 or Gossip
+        self._settings       = self._defaults
+        # @var Sip2Settings Configuration, shared by all instances with the same settings
 
         """Private connection variables"""
         self._socket        = None
         # @var object      A socket connection
         self._retryCount    = 0
         # @var integer     Internal retry counter
+        self._endpoint      = None
+        # @var tuple       (hostName, hostPort) of the endpoint set connected to
+        self._lastExchange  = 0.0
+        # @var float       time.monotonic() of the last connect or response (idle detection)
+        self._buffer        = b''
+        # @var bytes       Received after the last response, the start of the next one
 
 
         """Public SIP variables (...which you will probably never change)"""
@@ -116,33 +250,10 @@ class Sip2:
         # @var string      Last message sent to ACS
         self.last_response   = ''
         # @var string      Last response from ACS
-        self.last_response_parsed = {}
-        # @var array       Last parsed response from ACS
-
-        self.fldTerminator  = '|'
-        # @var string      Field terminator
-        self.msgTerminator  = "\r"
-        # @var string      Message terminator
-
-        self.withCrc        = True
-        # @var boolean     Toggle crc checking and appending. Note: this is pretty much a relict from pre tcp times
-        self.withSeq        = True
-        # @var boolean     Toggle the use of sequence numbers
-
-        self.UIDalgorithm   = 0
-        # @var integer     Login encryption algorithm type (0 = plain text)
-        self.PWDalgorithm   = 0
-        # @var integer     Password encryption algorithm type (undocumented)
+        self._lastParsed     = {}
+        # @var array       Last parsed response from ACS (@see last_response_parsed)
 
         """Public SIP variables (saved for various requests) """
-        self.language       = '000'
-        # @var string      Language code (000 = default, 001 == english)
-        self.institutionId  = 'My Test Institute'
-        # @var string      Value for the AO field
-        self.terminalPassword     = ''
-        # @var string      Terminal password (AC)
-        self.scLocation     = 'My Test SC Location'
-        # @var string l    Location code (AP "location code" / CP "current location")
         self.patron         = ''
         # @var string      Patron identifier (AA)
         self.patronpwd      = ''
@@ -159,10 +270,19 @@ class Sip2:
         """Public logging variables """
         self.log            = None
         # @var object      Logger object. Log of communication actions
-        self.logfile_path   = ''
-        # @var string      Path where to write to the logfile. Exampele: 'c:\\temp'
-        self.loglevel       = 'DEBUG'
-        # @var string      Loglevel (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        self._history       = None
+        # @var ExchangeHistory Recent exchanges, created on the first one if historySize is set
+
+
+    @property
+    def last_response_parsed(self):
+        """ Last parsed response from ACS ({} if retainLast is False) """
+        return self._lastParsed
+
+    @last_response_parsed.setter
+    def last_response_parsed(self, result):
+        if self._settings.retainLast:
+            self._lastParsed = result
 
 
     def __del__(self):
@@ -269,7 +389,9 @@ class Sip2:
         parsed = {}
         response = response.strip()
 
-        if (self.withCrc):
+        # responses of an ACS with error detection switched off have no AZ
+        withCrc = (self.withCrc and response[-6:-4] == 'AZ')
+        if (withCrc):
             parsed['Raw'] =  response[start:len(response)-6].split(self.fldTerminator)
         else:
             #$result['Raw'] = explode("|", substr($response, $start));
@@ -286,7 +408,7 @@ class Sip2:
             if (field not in parsed): parsed[field] = []
             parsed[field].append(value)
 
-        if (self.withCrc):
+        if (withCrc):
             parsed['AZ'] = [response[len(response)-4:len(response)]]
         else:
             parsed['AZ'] = ['']
@@ -314,7 +436,7 @@ class Sip2:
         ordSum = 0
         for n in range(0, len(msg)):
             ordSum = ordSum + ord(msg[n:n+1])
-        crc = format((-ordSum & 0xFFFF), 'X')
+        crc = format((-ordSum & 0xFFFF), '04X')
         return crc
 
 
@@ -326,12 +448,22 @@ class Sip2:
         # check for enabled crc
         if (self.withCrc != True): return True;
 
-        # test the received message's CRC by generating our own CRC from the message
-        test = re.split('(.{4})$', msg.strip());
+        # an ACS with error detection switched off sends no AY/AZ: nothing to check
+        msg = msg.strip()
+        if (msg[-6:-4] != 'AZ'): return True;
 
-        # check validity
-        if (len(test) > 1 and (self._crc_calc(test[0]) > test[1] and self._crc_calc(test[0]) < test[1]) == 0):
-            return True;
+        # test the received message's CRC by generating our own CRC from the message
+        test = re.split('(.{4})$', msg);
+
+        # check validity. Some ACSes sum up the encoded bytes instead of the
+        # characters, which only makes a difference for non ASCII characters.
+        if (len(test) > 1):
+            received = test[1].upper()
+            if (self._crc_calc(test[0]) == received):
+                return True;
+            byteSum = sum(bytes(test[0], self.hostEncoding, 'replace'))
+            if (format((-byteSum & 0xFFFF), '04X') == received):
+                return True;
 
         # default return
         return False;
@@ -402,10 +534,43 @@ class Sip2:
             - PHP 5.6+ has context option "allow_self_signed" - check if Python adds it too later on
         @return bool               The socket connection status
         """
+        if (self.endpoints == None):
+            return self._connect_host()
+
+        # Try the endpoints of the set until one can be reached
+        tried = []
+        while True:
+            endpoint = self.endpoints.select(tried)
+            if (endpoint == None):
+                raise ConnectionError('Connection error: no endpoint available (tried: %s)' % ', '.join('%s:%s' % host for host in tried))
+            tried.append(endpoint)
+            self.hostName, self.hostPort = endpoint
+            started = time.monotonic()
+            try:
+                self._connect_host()
+            except OSError:
+                # including ssl errors and timeouts
+                self.endpoints.failure(endpoint)
+                continue
+            except BaseException:
+                # ends a trial connect too, the endpoint must not stay half-open
+                self.endpoints.failure(endpoint)
+                raise
+            self.endpoints.connected(endpoint, time.monotonic() - started)
+            self._endpoint = endpoint
+            return True
+
+
+    def _connect_host(self):
+        """ Connect to hostName/hostPort (@see connect)
+        @return bool               The socket connection status
+        """
         # Initialize logger on first connect
         if self.log == None:
             self._init_logger()
         
+        self._buffer = b''
+
         # Check that basic parameters are right
         if self.hostName == '':
             raise ValueError("Cannot autoconnect. No host set (parameter: hostName): '%s'" % self.hostName)
@@ -417,12 +582,17 @@ class Sip2:
 
         """ Check if host is reachable at all """
         plain = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        plain.settimeout(self.socketTimeout)
+        plain.settimeout(self._timeout('connect'))
         try:
+            started = time.monotonic()
             plain.connect((self.hostName, self.hostPort))
+            if (self.timeoutPolicy != None):
+                self.timeoutPolicy.observe('connect', time.monotonic() - started)
             self.log.info("--- SOCKET EXISTS ---")
             mode = 'plain'
         except socket.timeout as e:
+            if (self.timeoutPolicy != None):
+                self.timeoutPolicy.observe_timeout('connect')
             self.log.critical("--- CONNECTION ERROR: Host not reachable. ---")
             raise ConnectionError('Connection error: TCP') from e
         except socket.error as e:
@@ -449,6 +619,7 @@ class Sip2:
         if (self.tlsEnable == False):
             self.log.warning("--- CONNECTION ESTABLISHED: Unencrypted ---")
             self._socket = plain
+            self._lastExchange = time.monotonic()
             return True
 
         # Otherwise go for TLS
@@ -535,17 +706,20 @@ class Sip2:
             if plain.fileno() == -1:
                 plain = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
                 plain.connect((self.hostName, self.hostPort))
-                plain.settimeout(self.socketTimeout)
+                plain.settimeout(self._timeout('connect'))
 
             self._socket = plain
+            self._lastExchange = time.monotonic()
             return True
         elif (mode == 'tls'):
             self.log.info("--- CONNECTION ESTABLISHED: Encrypted (Valid host, valid known CA, valid certificate) ---")
             self._socket = sslSock
+            self._lastExchange = time.monotonic()
             return True
         elif (mode == 'tls_untrusted'):
             self.log.warning("--- CONNECTION ESTABLISHED: Encrypted (Self Signed - Valid host = valid CA => valid certificate) ---")
             self._socket = sslSock
+            self._lastExchange = time.monotonic()
             return True
         else:
             self.log.critical("--- CONNECTION FAILED ---")
@@ -558,6 +732,10 @@ class Sip2:
         """
         #if (gettype($this->socket) !=  'resource') {
         #    $context = ($this->socket_protocol == 'tcp') ? stream_context_create() : stream_context_create( ['ssl' => $this->socket_tls_options] );
+        if (self._endpoint != None):
+            self.endpoints.disconnected(self._endpoint)
+            self._endpoint = None
+        self._buffer = b''
         if (self._socket != None):
             self._socket.shutdown(SHUT_RDWR)
             self._socket.close()
@@ -573,22 +751,74 @@ class Sip2:
               it's better to keep this class "dumb" and let it handle the actual
               user if either a ConnectionResetError or a ConnectionError happens.
         @param  string request     The request text to send to the backend system
+        @throws Sip2FramingError if the response ended without terminator (the socket is closed then),
+                Sip2CrcError if it failed the CRC check after all retries,
+                Sip2RateLimited if the rateLimiter had no slot in time (nothing sent, @see Sip2.ratelimit),
+                Sip2BudgetExceeded if the budget of the timeoutPolicy is used up (nothing sent, @see Sip2.timeouts)
         @return string|false       Raw string response returned from the backend system (response)
         """
-        # Set user defined socket timeout
+        if (self.rateLimiter == None):
+            return self._exchange_tracked(request)
+        with self.rateLimiter.slot(self.trafficClass):
+            return self._exchange_tracked(request)
+
+
+    def _exchange_tracked(self, request):
+        """ _exchange() recording load, latency and errors in the endpoint set
+        @param  string request     The request text to send to the backend system
+        @return string             Raw response
+        """
+        if (self._endpoint == None):
+            return self._exchange(request)
+        endpoint = self._endpoint
+        started  = self.endpoints.begin(endpoint)
+        try:
+            response = self._exchange(request)
+        except OSError:
+            self.endpoints.end(endpoint, started, False)
+            raise
+        except BaseException:
+            # not sent (e.g. Sip2BudgetExceeded), no news about the endpoint
+            self.endpoints.end(endpoint, started, None)
+            raise
+        self.endpoints.end(endpoint, started, True)
+        return response
+
+
+    def _timeout(self, code):
+        """ Socket timeout for a request: socketTimeout or the one of the timeoutPolicy
+        @param  string code        Message code of the request or 'connect'
+        @return float              Seconds
+        """
+        if (self.timeoutPolicy == None):
+            return self.socketTimeout
+        return self.timeoutPolicy.timeout(code)
+
+
+    def _exchange(self, request):
+        """ Send a request and read the response (@see get_response)
+        @param  string request     The request text to send to the backend system
+        @return string             Raw response
+        """
+        # Set user defined socket timeout (or the one of the timeout policy)
+        code    = request[:2]
+        timeout = self._timeout(code)
         try:
-            self._socket.settimeout(self.socketTimeout)
+            self._socket.settimeout(timeout)
         # If _connect is not initialized then no (successful) connection was ever initiated
         except AttributeError as e:
             raise ConnectionError('Connection error: You must make a successful connection attempt before sending commands!') from e
 
         self.log.info("--- SENDING REQUEST --- \n%s" % request)
+        data    = bytes(request, self.hostEncoding)
+        sentAt  = (time.time(), time.monotonic())
         try:
             #Send complete string at once
-            self._socket.sendall(bytes(request, self.hostEncoding))
+            self._socket.sendall(data)
             self.log.info("--- REQUEST SENT, WAITING FOR RESPONSE ---")
         except socket.error as e:
             self.log.warning("--- SENDING REQUEST FAILED --- \n%s" % e)
+            self._record(data, b'', sentAt, 'send failed: %s' % e)
             raise ConnectionResetError('Connection reset: Most likely connection was lost. %s' % e) from e
             # HERE > NEW TRY > CONNECT AGAIN!?! (
             # if self_socket != None:
@@ -600,7 +830,31 @@ class Sip2:
         # \x0A is the escaped hexadecimal Line Feed. The equivalent of \n.
         # \x0D is the escaped hexadecimal Carriage Return. The equivalent of \r.
         #$result = stream_get_line((stream_socket_client($this->socket_protocol.'://'.$this->hostname.':'.$this->port, $this->socket_error_id, $this->socket_error_msg, $this->socketTimeout, STREAM_CLIENT_CONNECT|STREAM_CLIENT_PERSISTENT, $context)), 100000, "\x0D");
-        response = self._socket.recv(4096).decode(encoding = self.hostEncoding)
+        # Read until the message terminator, a response may span several
+        # segments. Decode at the end, a segment might split a character.
+        terminator = bytes(self.msgTerminator, self.hostEncoding)
+        # drop the LF of an ACS terminating its responses with CRLF
+        received   = self._buffer.lstrip(b'\n')
+        self._buffer = b''
+        started    = time.monotonic()
+        while (terminator not in received):
+            try:
+                chunk = self._socket.recv(4096)
+            except socket.timeout:
+                if (received == b''):
+                    if (self.timeoutPolicy != None):
+                        self.timeoutPolicy.observe_timeout(code)
+                    self._record(data, received, sentAt, 'timeout after %ss' % timeout)
+                    raise
+                self._broken_frame(data, received, sentAt, 'incomplete response, timeout after %ss' % timeout)
+            if (chunk == b''):
+                self._broken_frame(data, received, sentAt, 'connection closed' if received == b'' else 'incomplete response, connection closed')
+            received = (received + chunk).lstrip(b'\n')
+        # keep what follows the terminator for the next response
+        end = received.index(terminator) + len(terminator)
+        received, self._buffer = received[:end], received[end:]
+        response = received.decode(encoding = self.hostEncoding, errors = 'replace')
+        self._record(data, received, sentAt, None)
 
         self.log.info("--- RESPONSE RECEIVED  --- \n%s" % response)
 
@@ -609,29 +863,89 @@ class Sip2:
             # reset the retry counter on successful send
             self._retryCount = 0
             self.log.info("--- Message from ACS passed CRC check ---")
+            if (self.timeoutPolicy != None):
+                self.timeoutPolicy.observe(code, time.monotonic() - started)
         else:
             # CRC check failed, request a resend
             self._retryCount += 1;
-            if (self._retryCount < self.maxretry):
+            maxretry = self.maxretry if self.timeoutPolicy == None else self.timeoutPolicy.retries(self.maxretry)
+            if (self._retryCount < maxretry):
                 # try again
                 self.log.warning("--- Message failed CRC check, retrying --- (%s)" % self._retryCount)
-                self.get_response(request)
+                return self._exchange(request)
             else:
                 # give up
                 self.log.critical("--- Failed to get valid CRC --- after (%s) retries." % self._retryCount)
+                self._retryCount = 0
                 # This might be a bit tricky should a CRC really ever fail.
                 # Most likely it's best to indicate that a reconnect probably is
                 # the best choice bei raising a ConnectionError.
-                raise ConnectionError('Connection error: Failed to get valid CRC for response') from e
+                raise Sip2CrcError('Connection error: Failed to get valid CRC for response')
                 #return False
 
         # Keep last message and response as property
-        self.last_request  = request
-        self.last_response = response
+        if self._settings.retainLast:
+            self.last_request  = request
+            self.last_response = response
+        self._lastExchange = time.monotonic()
 
         return response
 
 
+    def _broken_frame(self, request, received, sentAt, error):
+        """ Give up a response without message terminator: record it, close 
+        the socket (the stream is out of step) and raise
+        @param bytes  request      Request as sent
+        @param bytes  received     Part of the response received
+        @param tuple  sentAt       (time.time(), time.monotonic()) of sending
+        @param string error        What happened
+        @throws Sip2FramingError
+        """
+        self.log.warning("--- RESPONSE INCOMPLETE (%s) --- \n%s" % (error, received))
+        self._record(request, received, sentAt, error)
+        try:
+            self.disconnect()
+        except OSError:
+            # shutdown fails on a socket the ACS closed already
+            self._socket.close()
+            self._socket = None
+        raise Sip2FramingError('Connection error: %s' % error)
+
+
+    def _record(self, request, response, sentAt, error):
+        """ Add an exchange to the history, if historySize is set
+        @param bytes  request      Request as sent
+        @param bytes  response     Response as received
+        @param tuple  sentAt       (time.time(), time.monotonic()) of sending
+        @param string error        Error, None if a response arrived
+        """
+        size = self._settings.historySize
+        if (size <= 0):
+            return
+        if (self._history == None or self._history.size != size):
+            self._history = ExchangeHistory(size)
+        self._history.record(request, response, sentAt[0], time.monotonic() - sentAt[1], error, type(self))
+
+
+    def history(self):
+        """ The recent exchanges of this connection (historySize), oldest first
+        @return list of Exchange   Request and response bytes, timing, error; parsed on demand
+        """
+        if (self._history == None):
+            return []
+        return self._history.exchanges()
+
+
+    def dump_history(self, parse = False):
+        """ The recent exchanges for a crash report, passwords masked
+        @param  boolean parse      Include the parsed responses
+        @return list of dict       @see Sip2.history.Exchange.as_dict
+        """
+        if (self._history == None):
+            return []
+        return self._history.dump(parse)
+
+
     def sip_block_patron_request(self, blockedCardMsg, cardRetained = 'N'):
         """ Generate Block Patron (code 01) request messages in sip2 format
         @param  string blockedCardMsg  AJ field: message value for the required variable length AL field
@@ -1475,6 +1789,11 @@ class Sip2:
         return result;
 
 
+for _field in Sip2Settings._fields:
+    setattr(Sip2, _field, _setting(_field))
+del _field
+
+
 class Gossip(Sip2):
     """ Gossip Class
     Gossip is an SIP2 server implementation (Java) with an extension for enhanced
@@ -1520,6 +1839,8 @@ class Gossip(Sip2):
     @requires:  Python 3.4 (I think)
     """
 
+    __slots__ = ()
+
     def __init__(self):
         Sip2.__init__(self)
 
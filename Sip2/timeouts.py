@@ -0,0 +1,185 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Sip2BudgetExceeded(RuntimeError):
+    """ Raised instead of sending a request once the budget() of the thread is
+    used up. It is no OSError: nothing was sent, the connection is fine, so
+    connection error handling (offline queue, reconnects, broken pooled
+    connections) must not kick in.
+    """
+
+
+class TimeoutPolicy:
+    """ Adaptive socket timeouts per message code
+    Instead of one fixed socketTimeout for everything, the timeout of each
+    request is derived from the response times seen for its message code:
+    a smoothed mean plus four times the smoothed deviation (the way TCP
+    computes its retransmission timeout), between minimum and an upper bound.
+    The upper bound is the TimeoutPeriod the ACS sends in its SC Status
+    response (98), if known, otherwise maximum. RetriesAllowed limits the
+    number of resends after a CRC failure.
+
+    A request that times out doubles the timeout of its code until the next
+    response arrives. budget() sets an overall deadline for a multi-step flow
+    (login, checkout, ...) in the calling thread: each request gets at most
+    the remaining time, none is sent once the budget is used up.
+
+    Shared by all connections to the ACS: set it as timeoutPolicy in the
+    sip2Params of wrappers and pools. The wrapper feeds it the SC Status.
+
+    @example:
+        from Sip2.timeouts import TimeoutPolicy, Sip2BudgetExceeded
+        policy  = TimeoutPolicy(initial = 3, minimum = 0.5, maximum = 20)
+        wrapper = Sip2Wrapper(dict(sip2Params, timeoutPolicy = policy))
+        wrapper.login_device('user', 'pass')    # SC Status sets the ACS limits
+        try:
+            with policy.budget(8):
+                wrapper.login_patron('patron', 'pin')
+                wrapper.sip_item_checkout('itemBarcode')
+        except Sip2BudgetExceeded:
+            ...
+    """
+
+    def __init__(self, initial = 3.0, minimum = 0.5, maximum = 30.0, smoothing = 0.125, deviationSmoothing = 0.25):
+        """ Constructor
+        @param float initial               Timeout for codes without observations (and for connect)
+        @param float minimum               Lower bound of every timeout
+        @param float maximum               Upper bound unless the ACS sends a TimeoutPeriod
+        @param float smoothing             Weight of a new response time in the mean (0-1)
+        @param float deviationSmoothing    Weight of a new deviation in the mean deviation (0-1)
+        """
+        if (minimum <= 0 or maximum < minimum):
+            raise ValueError("TimeoutPolicy: invalid bounds: '%s' - '%s'" % (minimum, maximum))
+
+        self.initial        = initial
+        # @var float       Timeout without observations
+        self.minimum        = minimum
+        # @var float       Lower bound
+        self.maximum        = maximum
+        # @var float       Upper bound unless set by the ACS
+        self.smoothing      = smoothing
+        # @var float       EWMA weight of the mean
+        self.deviationSmoothing = deviationSmoothing
+        # @var float       EWMA weight of the deviation
+        self.acsTimeout     = None
+        # @var float       TimeoutPeriod of the ACS in seconds (None: unknown)
+        self.acsRetries     = None
+        # @var int         RetriesAllowed of the ACS (None: unknown)
+
+        self._estimates     = {}
+        # @var dict        Message code => [mean, deviation, backoff factor]
+        self._lock          = threading.Lock()
+        # @var Lock        Guards _estimates
+        self._local         = threading.local()
+        # @var local       Deadline of the budget of the current thread
+
+
+    def set_acs_limits(self, timeoutPeriod, retriesAllowed):
+        """ Take over the limits of a SC Status response (98)
+        @param string timeoutPeriod    Tenths of a second, 000 (ACS offline) and 999 (unknown) are ignored
+        @param string retriesAllowed   Number of retries, 999 (unknown) is ignored
+        """
+        try:
+            tenths = int(timeoutPeriod)
+            self.acsTimeout = None if tenths in (0, 999) else max(self.minimum, tenths / 10.0)
+        except ValueError:
+            self.acsTimeout = None
+        try:
+            retries = int(retriesAllowed)
+            self.acsRetries = None if retries == 999 else retries
+        except ValueError:
+            self.acsRetries = None
+
+
+    def timeout(self, code):
+        """ Socket timeout for a request
+        @param  string code        Message code of the request (e.g. '63') or 'connect'
+        @throws Sip2BudgetExceeded if the budget of the current thread is used up
+        @return float              Seconds
+        """
+        upper = self.maximum if self.acsTimeout is None else self.acsTimeout
+        with self._lock:
+            estimate = self._estimates.get(code)
+            if (estimate == None):
+                timeout = self.initial
+            else:
+                mean, deviation, backoff = estimate
+                timeout = (mean + max(0.01, 4 * deviation)) * backoff
+        timeout = min(upper, max(self.minimum, timeout))
+
+        remaining = self.remaining()
+        if (remaining is not None):
+            if (remaining <= 0):
+                raise Sip2BudgetExceeded('TimeoutPolicy: deadline budget used up before request %s' % code)
+            timeout = min(timeout, remaining)
+        return timeout
+
+
+    def retries(self, maxretry):
+        """ Resends allowed after a CRC failure
+        @param  int maxretry       Retries configured for the connection
+        @return int
+        """
+        return maxretry if self.acsRetries is None else min(maxretry, self.acsRetries)
+
+
+    def observe(self, code, seconds):
+        """ Record the response time of a request
+        @param string code         Message code of the request
+        @param float  seconds      Response time
+        """
+        with self._lock:
+            estimate = self._estimates.get(code)
+            if (estimate == None):
+                self._estimates[code] = [seconds, seconds / 2.0, 1]
+                return
+            mean, deviation, backoff = estimate
+            estimate[1] = (1 - self.deviationSmoothing) * deviation + self.deviationSmoothing * abs(mean - seconds)
+            estimate[0] = (1 - self.smoothing) * mean + self.smoothing * seconds
+            estimate[2] = 1
+
+
+    def observe_timeout(self, code):
+        """ Record a request that timed out: double its timeout until the next response
+        @param string code         Message code of the request
+        """
+        with self._lock:
+            estimate = self._estimates.setdefault(code, [self.initial, 0.0, 1])
+            estimate[2] = min(estimate[2] * 2, 64)
+
+
+    @contextmanager
+    def budget(self, seconds):
+        """ Overall deadline for the requests of the current thread in the with block.
+        Nested budgets can only shorten the deadline.
+        @param float seconds       Time for all requests of the block
+        """
+        previous = getattr(self._local, 'deadline', None)
+        deadline = time.monotonic() + seconds
+        self._local.deadline = deadline if previous is None else min(previous, deadline)
+        try:
+            yield self
+        finally:
+            self._local.deadline = previous
+
+
+    def remaining(self):
+        """ Seconds left of the budget of the current thread
+        @return float|None         None if no budget is set
+        """
+        deadline = getattr(self._local, 'deadline', None)
+        return None if deadline is None else deadline - time.monotonic()
+
+
+    def stats(self):
+        """ Current estimates
+        @return dict   Message code => {'mean', 'deviation', 'timeout'}
+        """
+        with self._lock:
+            codes = {code: list(estimate) for code, estimate in self._estimates.items()}
+        upper = self.maximum if self.acsTimeout is None else self.acsTimeout
+        return {code: {'mean': mean, 'deviation': deviation,
+                       'timeout': min(upper, max(self.minimum, (mean + max(0.01, 4 * deviation)) * backoff))}
+                for code, (mean, deviation, backoff) in codes.items()}
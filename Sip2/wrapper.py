@@ -1,3 +1,10 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from Sip2.capabilities import SupportedMessages, PatronRestrictions, deniedBy
+from Sip2.fees import fee_positions, fee_totals
+from Sip2.sip2 import Sip2CrcError, Sip2FramingError
+
 
 class Sip2Wrapper:
     """ A wrapper for the Sip2 class that makes sip requests more convenient.
@@ -79,12 +86,33 @@ class Sip2Wrapper:
 
     """
 
-    def __init__(self, sip2Params = {}, autoConnect = True, version = 'Sip2'):
+    __slots__ = ('_sip2', '_connected', '_inPatronSession', '_patronInfo', '_patronStatus', '_scStatus',
+                 '_itemCache', '_singleFlight', '_offlineQueue', '_deviceLogin', 'lock',
+                 '_supported', '_restrictions', '_sessionsEnded')
+    # No per instance __dict__, gateways keep many thousand wrappers
+
+    _patronItemFields = {
+        # infoType: (item field, count field in the fixed part of 64)
+        'hold':    ('AS', 'HoldItemsCount'),
+        'overdue': ('AT', 'OverdueItemsCount'),
+        'charged': ('AU', 'ChargedItemsCount'),
+        'fine':    ('AV', 'FineItemsCount'),
+        'recall':  ('BU', 'RecallItemsCount'),
+        'unavail': ('CD', 'UnavailableHoldsCount')
+    }
+    # @var dict      Patron information categories and their fields
+
+    def __init__(self, sip2Params = {}, autoConnect = True, version = 'Sip2', itemCache = None, singleFlight = None, offlineQueue = None):
         """ Constructor
         @param array sip2Params    Array of key value pairs that will set the 
                    corresponding member variables in the underlying sip2 class
         @param boolean autoConnect Defaults to True and automatically connects
         @param string version      Currently either Sip2 (default) or Gossip
+        @param ItemCache itemCache Optional cache for item information (@see Sip2.cache)
+        @param SingleFlight singleFlight Optional coalescing of identical read-only
+                   requests, usually shared by several wrappers (@see Sip2.coalesce)
+        @param OfflineQueue offlineQueue Optional journal for checkouts and checkins
+                   while the ACS is unreachable (@see Sip2.offline)
         """
         
         #set private     Class properties
@@ -95,12 +123,28 @@ class Sip2Wrapper:
 
         self._inPatronSession   = False
         # @var boolean   Patron session state toggle
+        self._sessionsEnded     = 0
+        # @var int       Patron sessions ended (35/36), lets a pool lease see one ended during a block
         self._patronInfo        = None
         # @var array     Patron information
         self._patronStatus      = None
         # @var array     Patron status
         self._scStatus          = None
         # @var array Acs status
+        self._supported         = None
+        # @var int       SupportedMessages bits of the Acs status (None = unknown)
+        self._restrictions      = 0
+        # @var int       PatronRestrictions bits of the patron status
+        self._itemCache         = itemCache
+        # @var object    ItemCache for item information responses (or None)
+        self._singleFlight      = singleFlight
+        # @var object    SingleFlight coalescing read-only requests (or None)
+        self._offlineQueue      = offlineQueue
+        # @var object    OfflineQueue for store-and-forward (or None)
+        self._deviceLogin       = None
+        # @var tuple     Arguments of the last login_device(), for reconnect()
+        self.lock               = threading.RLock()
+        # @var RLock     Held during each exchange, so a heartbeat never interleaves (@see Sip2.heartbeat); hold it across several requests to keep them together
 
         
         """ Begin initialization """
@@ -153,6 +197,25 @@ class Sip2Wrapper:
         return self._connected
 
 
+    def reconnect(self):
+        """ Replace a failed connection: connect again (with an EndpointSet
+        to a healthy endpoint, @see Sip2.endpoints) and repeat the device login.
+        A patron session of the wrapper is kept.
+        @throws Exception if connection or login fails
+        @return boolean returns true if connection succeeds
+        """
+        try:
+            self._sip2.disconnect()
+        except OSError:
+            self._sip2._socket = None
+        self._connected = False
+
+        self.connect()
+        if (self._deviceLogin != None):
+            self.login_device(*self._deviceLogin)
+        return self._connected
+
+
     def disconnect(self):
         """ Disconnect from the server
         @return Sip2Wrapper returns void
@@ -162,6 +225,7 @@ class Sip2Wrapper:
         self._inPatronSession   = False
         self._patronInfo        = None
         self._scStatus          = None
+        self._supported         = None
         return self
 
 
@@ -175,6 +239,7 @@ class Sip2Wrapper:
         @return Sip2Wrapper - returns $this if login successful
         """ 
         # login device
+        self._deviceLogin = (loginUserId, loginPassword, autoSelfCheck)
         self.sip_login(loginUserId, loginPassword)
         
         # Perform self check
@@ -196,10 +261,13 @@ class Sip2Wrapper:
         @param string $patronPass Patron password; may be empty. If you don't 
                                   want to accept logins without password then make
                                   sure that patronPass is never empty!
+        @note With an OfflineQueue the patron is accepted on good faith while
+        the ACS is unreachable (@see Sip2.offline).
         @return boolean returns true on successful login, false otherwise
         """
         # Always reset data from failed logins where no session was created
         self._patronStatus      = None
+        self._restrictions      = 0
         self._patronInfo        = None
         
         # Always end previous sessions (from successful login)
@@ -211,7 +279,13 @@ class Sip2Wrapper:
 
         # Set to true before call to getPatronIsValid since it will throw an exception otherwise
         self._inPatronSession = True
-        self._inPatronSession = self.get_patron_isValid()
+        try:
+            self._inPatronSession = self.get_patron_isValid()
+        except OSError:
+            if (self._offline_fallback() == False): raise
+            # ACS unreachable: keep the session, transactions are queued
+            self._patronStatus = None
+            self._restrictions = 0
         return self._inPatronSession
 
 
@@ -252,6 +326,160 @@ class Sip2Wrapper:
         
         return {}
 
+    def get_patron_full_account(self, pool = None):
+        """ Fetch all six item categories of the patron (hold, overdue, charged,
+        fine, recall, unavail) and merge them into one account view. The 
+        protocol allows only one category per Patron Information message, so
+        with a pool the six 63 requests are sent concurrently over pooled 
+        connections (about 1 round trip instead of 6). Without a pool they are
+        sent one after another on this connection.
+        @param  Sip2Pool pool      Optional pool for concurrent requests (@see Sip2.pool)
+        @throws Exception if patron session hasn't began
+        @return array              {'fixed': ..., 'variable': ..., 'items': {infoType: [items]}}
+                                   or False if Patron Information is not supported
+        """
+        if (self._command_available(7) == False): return False
+
+        if (self._inPatronSession == False):
+            raise RuntimeError('Must start patron session before calling get_patron_full_account')
+
+        categories = tuple(self._patronItemFields.keys())
+        if (pool == None):
+            infos = [self.sip_patron_information(infoType) for infoType in categories]
+        else:
+            patron, patronpwd = self._sip2.patron, self._sip2.patronpwd
+            def fetch(infoType):
+                if (isinstance(self._patronInfo, dict) and infoType in self._patronInfo):
+                    return self._patronInfo[infoType]
+                with pool.connection() as wrapper:
+                    return wrapper._fetch_patron_information(patron, patronpwd, infoType)
+
+            with ThreadPoolExecutor(len(categories)) as executor:
+                infos = list(executor.map(fetch, categories))
+
+            if (self._patronInfo == None):
+                self._patronInfo = {}
+            self._patronInfo.update(zip(categories, infos))
+
+        itemFields = [field for field, count in self._patronItemFields.values()]
+        account = {'fixed':    infos[0]['fixed'],
+                   'variable': {k: v for k, v in infos[0]['variable'].items() if k not in itemFields},
+                   'items':    {}
+                  }
+        for infoType, info in zip(categories, infos):
+            field = self._patronItemFields[infoType][0]
+            account['items'][infoType] = info['variable'].get(field, [])
+
+        return account
+
+    def iter_patron_items(self, infoType, pageSize = 5, prefetch = False, pool = None, pageSizer = None):
+        """ Iterate over all items of one category of the patron, e.g. all 80 
+        charged items instead of the first five. Walks the BP/BQ windows of 
+        Patron Information (63/64) page by page and yields each item as soon
+        as its page arrived. It stops at the count given in the fixed part of
+        the first response (e.g. ChargedItemsCount); if the ACS sends no count,
+        at the first empty or incomplete page.
+        With prefetch the next page is requested in the background while the
+        caller consumes the current one. Without a pool this happens on this
+        connection, so don't send other requests with this wrapper until the
+        iteration is finished (or the generator is closed).
+        If the ACS returns fewer items than requested although the count says
+        there are more (truncated frame), the next window starts after the 
+        last item received. With a PageSizer the window size adapts to the 
+        ACS and shrinks on truncated responses or CRC failures.
+        @param  string   infoType  One of 'hold', 'overdue', 'charged', 'fine', 'recall', 'unavail'
+        @param  int      pageSize  Number of items per request (BQ - BP + 1), ignored with a pageSizer
+        @param  boolean  prefetch  Request the next page while the current one is consumed
+        @param  Sip2Pool pool      Optional pool to send the requests on (@see Sip2.pool)
+        @param  PageSizer pageSizer Optional adaptive window sizing (@see Sip2.paging)
+        @throws Exception if patron session hasn't began
+        @return generator          Items (strings) or False if Patron Information is not supported
+        """
+        if (infoType not in self._patronItemFields):
+            raise ValueError("Invalid item category for iter_patron_items: '%s'" % infoType)
+        if (pageSize < 1):
+            raise ValueError("Invalid page size for iter_patron_items: '%s'" % pageSize)
+
+        if (self._command_available(7) == False): return False
+
+        if (self._inPatronSession == False):
+            raise RuntimeError('Must start patron session before calling iter_patron_items')
+
+        return self._patron_item_pages(infoType, pageSize, prefetch, pool, pageSizer)
+
+    def _patron_item_pages(self, infoType, pageSize, prefetch, pool, pageSizer):
+        """ Generator behind iter_patron_items() """
+        field, countField = self._patronItemFields[infoType]
+        patron, patronpwd = self._sip2.patron, self._sip2.patronpwd
+        acs = (self._sip2.hostName, self._sip2.hostPort)
+
+        def fetch(start, end):
+            if (pool == None):
+                return self._fetch_patron_information(patron, patronpwd, infoType, str(start), str(end))
+            with pool.connection() as wrapper:
+                return wrapper._fetch_patron_information(patron, patronpwd, infoType, str(start), str(end))
+
+        def window(start, total):
+            remaining = None if total == None else total - start + 1
+            size = pageSize if pageSizer == None else pageSizer.window(acs, remaining)
+            if (remaining != None):
+                size = min(size, remaining)
+            return (start, start + size - 1)
+
+        executor = ThreadPoolExecutor(1) if prefetch else None
+        try:
+            total   = None
+            current = window(1, total)
+            pending = None
+            while True:
+                start, end = current
+                try:
+                    info = fetch(*current) if pending == None else pending.result()
+                except (Sip2CrcError, Sip2FramingError) as e:
+                    # most likely a truncated frame, try again with a smaller window
+                    if (pageSizer == None or pageSizer.shrink(acs, end - start + 1) == False):
+                        raise
+                    if (pool == None and isinstance(e, Sip2FramingError)):
+                        # the socket is closed, a pooled connection was replaced already
+                        self.reconnect()
+                    pending = None
+                    current = window(start, total)
+                    continue
+
+                pending = None
+                if (total == None):
+                    count = info['fixed'].get(countField, '').strip()
+                    total = int(count) if count.isdigit() else None
+
+                items = info['variable'].get(field, [])
+                if (pageSizer != None):
+                    pageSizer.observe(acs, info, field)
+
+                if (total != None):
+                    more = (start + len(items) <= total)
+                    if (more and len(items) < end - start + 1):
+                        # truncated by the ACS, continue after the last item received
+                        shrunk = (pageSizer != None and pageSizer.shrink(acs, end - start + 1))
+                        if (len(items) == 0 and shrunk == False):
+                            more = False
+                else:
+                    more = (len(items) == end - start + 1)
+
+                if more:
+                    current = window(start + len(items), total)
+                    if (executor != None):
+                        pending = executor.submit(fetch, *current)
+
+                for item in items:
+                    yield item
+
+                if not more:
+                    break
+        finally:
+            # never leave a prefetch running on the connection
+            if (executor != None):
+                executor.shutdown(wait = True)
+
     def get_patron_feeItems(self):
         """ Gossip only: return patron fees by type
         @return array fees by type
@@ -265,6 +493,32 @@ class Sip2Wrapper:
 
         return {}
 
+    def get_patron_feePositions(self, startItem = '1', endItem = '99999'):
+        """ Gossip only: return patron fee positions as records
+        @param  string startItem   First position (BP)
+        @param  string endItem     Last position (BQ)
+        @throws Exception if patron session hasn't began
+        @return list of FeePosition  Decimal amounts, parsed dates (@see Sip2.fees)
+        """
+        if (self._sip2._version != 'Gossip'): return False
+
+        if (self._command_available(7) == False): return False
+
+        if (self._inPatronSession == False):
+            raise RuntimeError('Must start patron session before calling get_patron_feePositions')
+
+        info = self._fetch_patron_information(self._sip2.patron, self._sip2.patronpwd, 'feeItems', startItem, endItem)
+        return fee_positions(info)
+
+    def get_patron_feeTotals(self):
+        """ Gossip only: return patron fees summed up by cost type
+        @return array  {'amount', 'count', 'costTypes': {costType: {'description', 'amount', 'count'}}} (@see Sip2.fees.fee_totals)
+        """
+        positions = self.get_patron_feePositions()
+        if (positions == False): return False
+
+        return fee_totals(positions)
+
     def get_patron_fineItems(self):
         """ Return patron fine detail from patron info
         @return array fines
@@ -349,12 +603,47 @@ class Sip2Wrapper:
         """ getter for Sip2 class last_response_parsed """ 
         return self._sip2.last_response_parsed
 
+    def return_history(self):
+        """ getter for Sip2 class history (recent exchanges, needs historySize) """
+        return self._sip2.history()
+
+    def dump_history(self, parse = False):
+        """ Recent exchanges for a crash report, passwords masked (@see Sip2.dump_history) """
+        return self._sip2.dump_history(parse)
+
     def return_sc_status(self):
         """ Getter for scStatus
         @return Ambigous <NULL, multitype:string multitype:multitype:  >
         """
         return self._scStatus
 
+    def return_supported_messages(self):
+        """ Getter for the messages the ACS supports (BX of the SC Status)
+        @return SupportedMessages or None if sip_sc_status() was not called (@see Sip2.capabilities)
+        """
+        return None if self._supported == None else SupportedMessages(self._supported)
+
+    def return_patron_restrictions(self):
+        """ Getter for the restrictions of the patron (patron status)
+        @return PatronRestrictions, empty without patron status (@see Sip2.capabilities)
+        """
+        return PatronRestrictions(self._restrictions)
+
+    def command_available(self, message):
+        """ Check if the ACS supports a message and the patron may use it
+        @param  SupportedMessages|int message  The message, or its position in BX (0-15)
+        @return boolean    True if it may be sent (also if sip_sc_status() was not called)
+        """
+        if isinstance(message, SupportedMessages):
+            message = int(message).bit_length() - 1
+        return self._command_available(message)
+
+    def return_item_cache(self):
+        """ Getter for itemCache
+        @return ItemCache or None
+        """
+        return self._itemCache
+
     def return_sip2(self):
         """ Getter function for self._sip2
         @return sip2
@@ -367,57 +656,79 @@ class Sip2Wrapper:
         @note    
         This can't be checked without calling sip_sc_status() before. So if 
         login_device() is called without selfcheck parameter being True, we'll 
-        have to return True on good faith for everything here.
+        have to return True on good faith for everything here. The BX field and
+        the patron status are decoded into bits when they arrive, so this is a
+        bit test (@see Sip2.capabilities).
         
         @todo: 
-        - improve check by patron status
         - check by item status
         
         @param int sm_id           Position in BX "supported messages" (0-15)
         @return boolean    True or False (always True if self._scStatus is not set)
         """
-        if (self._scStatus == None): return True
-        
-        supported_messages = (
-        'Patron Status Request',
-        'Checkout',            'Checkin',                  'Block Patron',
-        'SC/ACS Status',       'Request SC/ACS Resend',    'Login',
-        'Patron Information',  'End Patron Session',       'Fee Paid',
-        'Item Information',    'Item Status Update',       'Patron Enable',
-        'Hold',                'Renew',                    'Renew All'
-        )
-        
-        patron_status = (
-        'charge privileges denied',
-        'renewal privileges denied',    'recall privileges denied',
-        'hold privileges denied',       'card reported lost',
-        'too many items charged',       'too many items overdue',
-        'too many renewals',            'too many claims of items returned',
-        'too many items lost',          'excessive outstanding fines',
-        'excessive outstanding fees',   'recall overdue',
-        'too many items billed'                         
-        )
-        
-        if self._scStatus['variable']['BX'][0][sm_id:sm_id + 1] != 'Y':
-            self._sip2.log.warning("Wrapper: Server does not support command %s (no message sent)" % supported_messages[sm_id])
+        if (self._supported == None): return True
+
+        if (self._supported & (1 << sm_id) == 0):
+            self._sip2.log.warning("Wrapper: Server does not support command %s (no message sent)" % SupportedMessages(1 << sm_id).name)
             return False
-        elif isinstance(self._patronStatus, dict) == True:
-            if sm_id == 1 and self._patronStatus['fixed']['PatronStatus'][0:0 + 1] != 'Y':   
-                # patron may not charge items
-                self._sip2.log.warning("Wrapper: Patron restriction: %s (no message sent)" % patron_status[0])
-                return False
-            elif sm_id == 13 and self._patronStatus['fixed']['PatronStatus'][3:3 + 1] != 'Y':
-                # patron may not hold items   
-                self._sip2.log.warning("Wrapper: Patron restriction: %s (no message sent)" % patron_status[3])
-                return False
-            elif sm_id in (14,15) and self._patronStatus['fixed']['PatronStatus'][1:1 + 1] != 'Y':
-                # patron may not renew items
-                self._sip2.log.warning("Wrapper: Patron restriction: %s (no message sent)" % patron_status[1])
-                return False
-        else:
-            return True
+        if (self._restrictions & deniedBy[sm_id] != 0):
+            self._sip2.log.warning("Wrapper: Patron restriction: %s (no message sent)" % PatronRestrictions(self._restrictions & deniedBy[sm_id]).name)
+            return False
+        return True
         
     
+    def _exchange_shared(self, key, exchange):
+        """ Run a read-only exchange, coalesced with identical ones in flight
+        if a SingleFlight is set. The key is extended by the ACS address and 
+        institution, so wrappers talking to different servers never share.
+        @param  tuple    key       identifies the request (message code first)
+        @param  callable exchange  sends the request and returns the parsed response
+        @return array              parsed response
+        """
+        if (self._singleFlight == None):
+            return exchange()
+        
+        key = (self._sip2.hostName, self._sip2.hostPort, self._sip2.institutionId) + key
+        return self._singleFlight.do(key, exchange)
+
+
+    def _offline_fallback(self):
+        """ Decide if a failed request may be queued offline. If so, close the 
+        dead connection, so further requests fail fast instead of waiting for
+        the socket timeout.
+        @return boolean    True if an OfflineQueue is set and the ACS allows offline operation
+        """
+        if (self._offlineQueue == None):
+            return False
+        if (self._scStatus != None and self._scStatus['fixed']['OfflineOk'] != 'Y'):
+            return False
+
+        try:
+            self._sip2.disconnect()
+        except OSError:
+            self._sip2._socket = None
+        self._connected = False
+        return True
+
+
+    def replay_offline(self, rate = 2.0):
+        """ Send the transactions queued while offline to the ACS (@see Sip2.offline)
+        Connect and login the device before.
+        @param  float rate     Maximum transactions per second
+        @return dict           Replay report or False if there is no OfflineQueue
+        """
+        if (self._offlineQueue == None): return False
+        return self._offlineQueue.replay(self, rate)
+
+
+    def _item_cache_invalidate(self, itemIdentifier):
+        """ Drop an item from the item cache after a circulation action changed it
+        @param string itemIdentifier   value of the AB field
+        """
+        if (self._itemCache != None):
+            self._itemCache.invalidate(self._sip2.institutionId, itemIdentifier)
+
+
     def sip_patron_block(self, blockedCardMsg, cardRetained = 'N'):
         """ Generate Block Patron (code 01) request messages in sip2 format
         Note: Even the protocol definition suggests, that this is pretty useless...
@@ -430,8 +741,9 @@ class Sip2Wrapper:
         if (self._inPatronSession == False):
             raise RuntimeError('Must start patron session before calling sip_patron_block')
 
-        msg  = self._sip2.sip_block_patron_request(blockedCardMsg, cardRetained)
-        info = self._sip2.sip_patron_status_response(self._sip2.get_response(msg))
+        with self.lock:
+            msg  = self._sip2.sip_block_patron_request(blockedCardMsg, cardRetained)
+            info = self._sip2.sip_patron_status_response(self._sip2.get_response(msg))
         return info    
     
 
@@ -443,11 +755,27 @@ class Sip2Wrapper:
         @param  string itemProperties  value for the variable length optional CH field (default '')
         @param  string noBlock         value for the blocking portion of the fixed length field (default N)
         @param  string cancel          value for the variable length optional BI field (default N)
-        @return array                  SIP2 checkin response
+        @return array                  SIP2 checkin response (synthetic if queued offline, @see Sip2.offline)
         """
         if (self._command_available(2) == False): return False
-        msg  = self._sip2.sip_checkin_request(itemIdentifier, returnDate, currentLocation, itemProperties, noBlock, cancel)
-        info = self._sip2.sip_checkin_response(self._sip2.get_response(msg))
+        try:
+            return self._checkin_raw(itemIdentifier, returnDate, currentLocation, itemProperties, noBlock, cancel)
+        except OSError:
+            # unknown state now, or changed offline
+            self._item_cache_invalidate(itemIdentifier)
+            if (cancel == 'Y' or self._offline_fallback() == False): raise
+            return self._offlineQueue.record_checkin(itemIdentifier)
+
+
+    def _checkin_raw(self, itemIdentifier, returnDate = None, currentLocation = '', itemProperties = '', noBlock = 'N', cancel = ''):
+        """ Checkin (09/10) without the offline fallback, a connection error is
+        raised. Used to replay the offline queue (@see Sip2.offline).
+        @return array                  SIP2 checkin response (@see sip_item_checkin)
+        """
+        with self.lock:
+            msg  = self._sip2.sip_checkin_request(itemIdentifier, returnDate, currentLocation, itemProperties, noBlock, cancel)
+            info = self._sip2.sip_checkin_response(self._sip2.get_response(msg))
+        self._item_cache_invalidate(itemIdentifier)
         return info
     
 
@@ -460,11 +788,109 @@ class Sip2Wrapper:
         @param  string feeAcknowledged value for the variable length optional BO field (default N)
         @param  string noBlock         value for the blocking portion of the fixed length field (default N)
         @param  string cancel          value for the variable length optional BI field (default N)
-        @return array                  SIP2 checkout response
+        @return array                  SIP2 checkout response (synthetic if queued offline, @see Sip2.offline)
         """
         if (self._command_available(1) == False): return False
-        msg  = self._sip2.sip_checkout_request(itemIdentifier, nbDueDate, scRenewalPolicy, itemProperties, feeAcknowledged, noBlock, cancel)
-        info = self._sip2.sip_checkout_response(self._sip2.get_response(msg))
+        try:
+            with self.lock:
+                msg  = self._sip2.sip_checkout_request(itemIdentifier, nbDueDate, scRenewalPolicy, itemProperties, feeAcknowledged, noBlock, cancel)
+                info = self._sip2.sip_checkout_response(self._sip2.get_response(msg))
+        except OSError:
+            # unknown state now, or changed offline
+            self._item_cache_invalidate(itemIdentifier)
+            if (cancel == 'Y' or self._offline_fallback() == False): raise
+            return self._offlineQueue.record_checkout(self._sip2.patron, itemIdentifier)
+        self._item_cache_invalidate(itemIdentifier)
+        return info
+
+
+    def checkout_many(self, itemIdentifiers, pool = None, rollback = False, feeAcknowledged = 'N', noBlock = 'N'):
+        """ Checkout several items for the patron of the session at once (code 11/12),
+        e.g. a stack of RFID tagged books on the pad. Availability is checked
+        once. With a pool the checkouts are sent concurrently over pooled 
+        connections (the patron is identified in each message), otherwise one
+        after another on this connection.
+        With rollback, a partial failure cancels the whole stack: each item 
+        that was checked out, or whose state is unknown after a connection 
+        error, is cancelled with a Checkin (09) with cancel set to Y.
+        @param  list     itemIdentifiers   Item barcodes (AB)
+        @param  Sip2Pool pool              Optional pool for concurrent checkouts (@see Sip2.pool)
+        @param  boolean  rollback          Cancel all checkouts if one item failed
+        @param  string   feeAcknowledged   value for the optional BO field (default N)
+        @param  string   noBlock           value for the blocking portion of the fixed length field (default N)
+        @throws Exception if patron session hasn't began
+        @return list       One dict per item in input order: {'item', 'ok', 'response', 'error', 'cancelled'}
+                           or False if Checkout is not supported
+        """
+        if (self._command_available(1) == False): return False
+
+        if (self._inPatronSession == False):
+            raise RuntimeError('Must start patron session before calling checkout_many')
+
+        patron, patronpwd = self._sip2.patron, self._sip2.patronpwd
+
+        def checkout(itemIdentifier):
+            result = {'item': itemIdentifier, 'ok': False, 'response': None, 'error': None, 'cancelled': False}
+            try:
+                if (pool == None):
+                    info = self._checkout_for(patron, patronpwd, itemIdentifier, feeAcknowledged, noBlock)
+                else:
+                    with pool.connection() as wrapper:
+                        info = wrapper._checkout_for(patron, patronpwd, itemIdentifier, feeAcknowledged, noBlock)
+                result['response'] = info
+                result['ok']       = (info['fixed']['Ok'] == '1')
+            except OSError as e:
+                result['error'] = '%s: %s' % (type(e).__name__, e)
+            # a pooled wrapper only updates its own cache, after an error the state is unknown
+            self._item_cache_invalidate(itemIdentifier)
+            return result
+
+        def cancel(result):
+            try:
+                if (pool == None):
+                    info = self.sip_item_checkin(result['item'], cancel = 'Y')
+                else:
+                    with pool.connection() as wrapper:
+                        info = wrapper.sip_item_checkin(result['item'], cancel = 'Y')
+                result['cancelled'] = (info != False and info['fixed']['Ok'] == '1')
+            except OSError as e:
+                result['error'] = '%s: %s' % (type(e).__name__, e)
+            self._item_cache_invalidate(result['item'])
+
+        itemIdentifiers = list(itemIdentifiers)
+        if (pool == None or len(itemIdentifiers) < 2):
+            results = [checkout(itemIdentifier) for itemIdentifier in itemIdentifiers]
+        else:
+            with ThreadPoolExecutor(min(len(itemIdentifiers), pool.size)) as executor:
+                results = list(executor.map(checkout, itemIdentifiers))
+
+        if (rollback and any(result['ok'] == False for result in results)):
+            for result in results:
+                if (result['ok'] or result['error'] != None):
+                    cancel(result)
+
+        return results
+
+
+    def _checkout_for(self, patron, patronpwd, itemIdentifier, feeAcknowledged = 'N', noBlock = 'N'):
+        """ Checkout (11/12) for the given patron credentials, without touching 
+        the patron session state of this wrapper. Used on pooled connections.
+        @param  string patron          Patron identifier (AA)
+        @param  string patronpwd       Patron password (AD)
+        @param  string itemIdentifier  value for the variable length required AB field
+        @param  string feeAcknowledged value for the optional BO field
+        @param  string noBlock         value for the blocking portion of the fixed length field
+        @return array                  SIP2 checkout response
+        """
+        with self.lock:
+            previous = (self._sip2.patron, self._sip2.patronpwd)
+            self._sip2.patron, self._sip2.patronpwd = patron, patronpwd
+            try:
+                msg  = self._sip2.sip_checkout_request(itemIdentifier, '', 'N', '', feeAcknowledged, noBlock)
+                info = self._sip2.sip_checkout_response(self._sip2.get_response(msg))
+            finally:
+                self._sip2.patron, self._sip2.patronpwd = previous
+        self._item_cache_invalidate(itemIdentifier)
         return info
 
 
@@ -473,14 +899,17 @@ class Sip2Wrapper:
         @throws Exception if patron session is not properly ended
         @return Sip2Wrapper returns $this
         """
-        msg  = self._sip2.sip_end_patron_session_request()
-        info = self._sip2.sip_end_patron_session_response(self._sip2.get_response(msg))
+        with self.lock:
+            msg  = self._sip2.sip_end_patron_session_request()
+            info = self._sip2.sip_end_patron_session_response(self._sip2.get_response(msg))
         if ((info['fixed']['EndSession'] > 'Y') - (info['fixed']['EndSession'] < 'Y')) != 0:
             raise RuntimeError('Error ending patron session')
         self._inPatronSession   = False
+        self._sessionsEnded    += 1
         # @todo: Might be a bit redundant because it is reset on each login. 
         #        Cleaner on the other hand, isn't it? 
         self._patronStatus      = None
+        self._restrictions      = 0
         self._patronInfo        = None
         return self
 
@@ -496,8 +925,9 @@ class Sip2Wrapper:
         @return array                  SIP2 payment response
         """
         if (self._command_available(9) == False): return False
-        msg  = self._sip2.sip_fee_paid_request(feeType, paymentType, feeAmount, feeIdentifier, transactionId, currencyType)
-        info = self._sip2.sip_fee_paid_response(self._sip2.get_response(msg))
+        with self.lock:
+            msg  = self._sip2.sip_fee_paid_request(feeType, paymentType, feeAmount, feeIdentifier, transactionId, currencyType)
+            info = self._sip2.sip_fee_paid_response(self._sip2.get_response(msg))
         return info
 
 
@@ -513,19 +943,36 @@ class Sip2Wrapper:
         @return array                    SIP2 hold response
         """
         if (self._command_available(13) == False): return False
-        msg  = self._sip2.sip_hold_request(holdMode, expirationDate, holdType, itemIdentifier, titleIdentifier, feeAcknowledged, pickupLocation)
-        info = self._sip2.sip_hold_response(self._sip2.get_response(msg))
+        with self.lock:
+            msg  = self._sip2.sip_hold_request(holdMode, expirationDate, holdType, itemIdentifier, titleIdentifier, feeAcknowledged, pickupLocation)
+            info = self._sip2.sip_hold_response(self._sip2.get_response(msg))
         return info
 
 
     def sip_item_information(self, itemIdentifier):
         """ Method to get Item Information (17/18)
+        If an ItemCache is set, cached responses are returned without asking
+        the ACS (@see Sip2.cache).
         @param  string itemIdentifier    value for the variable length required AB field
         @return array                  SIP2 item information response
         """
         if (self._command_available(10) == False): return False
-        msg  = self._sip2.sip_item_information_request(itemIdentifier)
-        info = self._sip2.sip_item_information_response(self._sip2.get_response(msg))
+
+        if (self._itemCache != None):
+            info = self._itemCache.get(self._sip2.institutionId, itemIdentifier)
+            if (info != None):
+                return info
+            generation = self._itemCache.generation()
+
+        def exchange():
+            with self.lock:
+                msg  = self._sip2.sip_item_information_request(itemIdentifier)
+                return self._sip2.sip_item_information_response(self._sip2.get_response(msg))
+
+        info = self._exchange_shared(('17', itemIdentifier), exchange)
+        if (self._itemCache != None):
+            # not if a checkin or checkout changed the item meanwhile
+            self._itemCache.put(self._sip2.institutionId, itemIdentifier, info, generation)
         return info
 
 
@@ -537,8 +984,10 @@ class Sip2Wrapper:
         @return array                  SIP2 checkin response
         """
         if (self._command_available(11) == False): return False
-        msg  = self._sip2.sip_item_status_update_request(itemIdentifier, itemProperties)
-        info = self._sip2.sip_item_status_update_response(self._sip2.get_response(msg))
+        with self.lock:
+            msg  = self._sip2.sip_item_status_update_request(itemIdentifier, itemProperties)
+            info = self._sip2.sip_item_status_update_response(self._sip2.get_response(msg))
+        self._item_cache_invalidate(itemIdentifier)
         return info
 
 
@@ -549,8 +998,9 @@ class Sip2Wrapper:
         @throws Exception if login failed
         @return Sip2Wrapper - returns $this if login successful
         """
-        msg  = self._sip2.sip_login_request(loginUserId, loginPassword)
-        info = self._sip2.sip_login_response(self._sip2.get_response(msg))
+        with self.lock:
+            msg  = self._sip2.sip_login_request(loginUserId, loginPassword)
+            info = self._sip2.sip_login_response(self._sip2.get_response(msg))
         if (info['fixed']['Ok'] != '1'):
             raise RuntimeError('Login failed')
 
@@ -564,8 +1014,9 @@ class Sip2Wrapper:
         @return array          SIP2 enable response
         """
         if (self._command_available(12) == False): return False
-        msg  = self._sip2.sip_patron_enable_request()
-        info = self._sip2.sip_patron_enable_response(self._sip2.get_response(msg))
+        with self.lock:
+            msg  = self._sip2.sip_patron_enable_request()
+            info = self._sip2.sip_patron_enable_response(self._sip2.get_response(msg))
         return info
 
 
@@ -586,14 +1037,39 @@ class Sip2Wrapper:
         if (isinstance(self._patronInfo, dict) and infoType in self._patronInfo):
             return self._patronInfo[infoType]
 
-        msg  = self._sip2.sip_patron_information_request(infoType)
-        info = self._sip2.sip_patron_information_response(self._sip2.get_response(msg))
+        def exchange():
+            with self.lock:
+                msg  = self._sip2.sip_patron_information_request(infoType)
+                return self._sip2.sip_patron_information_response(self._sip2.get_response(msg))
+
+        info = self._exchange_shared(('63', self._sip2.patron, self._sip2.patronpwd, infoType), exchange)
         if (self._patronInfo == None):
             self._patronInfo = {}
         self._patronInfo[infoType] = info
         return info
 
 
+    def _fetch_patron_information(self, patron, patronpwd, infoType, startItem = '1', endItem = '5'):
+        """ Patron Information (63/64) for the given patron credentials, without 
+        touching the patron session state of this wrapper. Used on pooled 
+        connections, where the patron session lives in another wrapper.
+        @param  string patron      Patron identifier (AA)
+        @param  string patronpwd   Patron password (AD)
+        @param  string infoType    One of 'none', 'hold', 'overdue', 'charged', 'fine', 'recall', 'unavail' (or 'feeItems' for Gossip)
+        @param  string startItem   value for BP field
+        @param  string endItem     value for BQ field
+        @return array              The parsed response from the server
+        """
+        with self.lock:
+            previous = (self._sip2.patron, self._sip2.patronpwd)
+            self._sip2.patron, self._sip2.patronpwd = patron, patronpwd
+            try:
+                msg  = self._sip2.sip_patron_information_request(infoType, startItem, endItem)
+                return self._sip2.sip_patron_information_response(self._sip2.get_response(msg))
+            finally:
+                self._sip2.patron, self._sip2.patronpwd = previous
+
+
     def sip_patron_status(self):
         """ Method to grab the patron status from the server and store it in _patronStatus 
         (code 63/64). Automatic fallback to Sip1 (code 23/24) 
@@ -607,12 +1083,18 @@ class Sip2Wrapper:
         info = self.sip_patron_information()
         if info != False:
             self._patronStatus = info
+            self._restrictions = int(PatronRestrictions.decode(info['fixed']['PatronStatus']))
             return info
         # Otherwise use Sip1 variant
         else: 
-            msg  = self._sip2.sip_patron_status_request()
-            info = self._sip2.sip_patron_status_response(self._sip2.get_response(msg))
+            def exchange():
+                with self.lock:
+                    msg  = self._sip2.sip_patron_status_request()
+                    return self._sip2.sip_patron_status_response(self._sip2.get_response(msg))
+
+            info = self._exchange_shared(('23', self._sip2.patron, self._sip2.patronpwd), exchange)
             self._patronStatus = info
+            self._restrictions = int(PatronRestrictions.decode(info['fixed']['PatronStatus']))
             return info
 
 
@@ -629,8 +1111,13 @@ class Sip2Wrapper:
         @return array              SIP2 checkin response
         """
         if (self._command_available(14) == False): return False
-        msg  = self._sip2.sip_renew_request(itemIdentifier, titleIdentifier, nbDuDate, itemProperties, feeAcknowledged, noBlock, thirdPartyAllowed)
-        info = self._sip2.sip_renew_all_response(self._sip2.get_response(msg))
+        with self.lock:
+            msg  = self._sip2.sip_renew_request(itemIdentifier, titleIdentifier, nbDuDate, itemProperties, feeAcknowledged, noBlock, thirdPartyAllowed)
+            info = self._sip2.sip_renew_response(self._sip2.get_response(msg))
+        if (itemIdentifier == ''):
+            # renewed by title, the response names the item
+            itemIdentifier = info['variable'].get('AB', [''])[0]
+        self._item_cache_invalidate(itemIdentifier)
         return info
 
 
@@ -641,8 +1128,11 @@ class Sip2Wrapper:
         @return array                      SIP2 checkin response
         """
         if (self._command_available(15) == False): return False
-        msg  = self._sip2.sip_renew_all_request(feeAcknowledged)
-        info = self._sip2.sip_renew_all_response(self._sip2.get_response(msg))
+        with self.lock:
+            msg  = self._sip2.sip_renew_all_request(feeAcknowledged)
+            info = self._sip2.sip_renew_all_response(self._sip2.get_response(msg))
+        for itemIdentifier in info['variable'].get('BM', []):
+            self._item_cache_invalidate(itemIdentifier)
         return info
 
 
@@ -652,9 +1142,17 @@ class Sip2Wrapper:
         @return Sip2Wrapper returns $this if successful
         """
         # execute self test
-        msg  = self._sip2.sip_sc_status_request(statusCode, maxPrintWidth, protocolVersion)
-        info = self._sip2.sip_sc_status_response(self._sip2.get_response(msg))
+        def exchange():
+            with self.lock:
+                msg  = self._sip2.sip_sc_status_request(statusCode, maxPrintWidth, protocolVersion)
+                return self._sip2.sip_sc_status_response(self._sip2.get_response(msg))
+
+        info = self._exchange_shared(('99', statusCode, maxPrintWidth, protocolVersion), exchange)
         self._scStatus = info
+        self._supported = int(SupportedMessages.decode(info['variable']['BX'][0])) if 'BX' in info['variable'] else None
+        # the ACS limits bound the adaptive timeouts
+        if (self._sip2.timeoutPolicy != None):
+            self._sip2.timeoutPolicy.set_acs_limits(info['fixed']['TimeoutPeriod'], info['fixed']['RetriesAllowed'])
 
         return info
         